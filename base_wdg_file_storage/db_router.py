@@ -0,0 +1,76 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Set by ReplicaRoutingMiddleware for requests to read-only endpoints
+use_replica = ContextVar("use_replica", default=False)
+# Set by the router when the current request writes to the primary
+wrote_primary = ContextVar("wrote_primary", default=False)
+
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_replica_lag_cache = {}
+
+
+def get_replica_lag(alias: str):
+    """
+    Replication lag of a replica in seconds, cached for a few seconds.
+    Returns None when the replica can not be reached.
+    """
+    now = time.monotonic()
+    cached = _replica_lag_cache.get(alias)
+    if cached and now - cached[0] < settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL:
+        return cached[1]
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        logger.error(f"Replica {alias} unavailable: {e}")
+        lag = None
+
+    _replica_lag_cache[alias] = (now, lag)
+    return lag
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads of read-only endpoints to a healthy replica, everything else to the primary.
+
+    A replica is only used while its replication lag is under
+    DATABASE_REPLICA_MAX_LAG, otherwise reads fall back to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not use_replica.get() or wrote_primary.get():
+            return settings.DEFAULT_DB
+
+        replicas = [
+            alias
+            for alias in settings.DATABASE_REPLICAS
+            if (lag := get_replica_lag(alias)) is not None
+            and lag <= settings.DATABASE_REPLICA_MAX_LAG
+        ]
+        return random.choice(replicas) if replicas else settings.DEFAULT_DB
+
+    def db_for_write(self, model, **hints):
+        wrote_primary.set(True)
+        return settings.DEFAULT_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == settings.DEFAULT_DB
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+
+from base_wdg_file_storage.db_router import use_replica, wrote_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Routes the reads of views flagged ``use_read_replica = True`` to the replicas.
+
+    After a client writes, its reads stay on the primary for
+    DATABASE_PRIMARY_STICKY_SECONDS (tracked with a cookie) so it always reads
+    its own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrote_token = wrote_primary.set(False)
+        replica_token = use_replica.set(False)
+        try:
+            response = self.get_response(request)
+
+            if wrote_primary.get() or request.method not in SAFE_METHODS:
+                sticky_seconds = settings.DATABASE_PRIMARY_STICKY_SECONDS
+                response.set_cookie(
+                    PRIMARY_STICKY_COOKIE,
+                    str(int(time.time()) + sticky_seconds),
+                    max_age=sticky_seconds,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+        finally:
+            use_replica.reset(replica_token)
+            wrote_primary.reset(wrote_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "cls", None) or getattr(
+            view_func, "view_class", None
+        )
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and getattr(view_class, "use_read_replica", False)
+            and not self._is_sticky(request)
+        ):
+            use_replica.set(True)
+
+    @staticmethod
+    def _is_sticky(request):
+        try:
+            return int(request.COOKIES.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Apps
     'base',
     'storages',
@@ -67,6 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'base_wdg_file_storage.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'base_wdg_file_storage.urls'
@@ -106,10 +108,34 @@ DATABASES = {
     },
 }
 
+# Read replicas, used by the read-only endpoints (see db_router.py)
+DATABASE_REPLICAS = []
+for index, host in enumerate(env.list("POSTGRES_REPLICA_SERVERS", default=[]), start=1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES[DEFAULT_DB],
+        "HOST": host,
+        "DATABASE": alias,
+        "TEST": {"MIRROR": DEFAULT_DB},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["base_wdg_file_storage.db_router.PrimaryReplicaRouter"]
+DATABASE_REPLICA_MAX_LAG = 5  # seconds
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = 5  # seconds
+DATABASE_PRIMARY_STICKY_SECONDS = 15
+
+# Shared cache (idempotency keys), e.g. CACHE_URL=redis://redis:6379/1
+# The local memory default is per process, use a shared backend with several workers
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 STATIC_ASSET_URL = "/static/"
 STATIC_ASSET_ROOT = os.path.join(BASE_DIR, "static")
 STATIC_URL = "/static/"
 
+# Location of the "local" storage provider
+MEDIA_ROOT = env.str("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+
 # Files Storages
 STORAGES = {
     "s3": {
@@ -147,7 +173,113 @@ S3_SECRET_ACCESS_KEY = env.str("S3_SECRET_ACCESS_KEY", None)
 S3_STORAGE_BUCKET_NAME = env.str("S3_STORAGE_BUCKET_NAME", None)
 S3_ENDPOINT_URL = env.str("S3_ENDPOINT_URL", None)
 S3_REGION_NAME = None
+# Tenant -> bucket, e.g. S3_TENANT_BUCKETS=acme=acme-files,globex=globex-files
+S3_TENANT_BUCKETS = env.dict("S3_TENANT_BUCKETS", default={})
+# Bucket -> endpoint for buckets not served by S3_ENDPOINT_URL
+S3_BUCKET_ENDPOINTS = env.dict("S3_BUCKET_ENDPOINTS", default={})
+# Spread object keys over hashed prefixes (temps/ab/cd/<tenant>/...)
+S3_HASHED_KEY_PREFIX = env.bool("S3_HASHED_KEY_PREFIX", False)
+DEFAULT_TENANT = "public"
+# Throttling: adaptive retries and a per process cap on in-flight S3 calls
+S3_MAX_ATTEMPTS = env.int("S3_MAX_ATTEMPTS", 8)
+S3_MAX_CONCURRENCY = env.int("S3_MAX_CONCURRENCY", 64)
+S3_MIN_CONCURRENCY = env.int("S3_MIN_CONCURRENCY", 4)
+S3_THROTTLE_COOLDOWN = 1.0  # seconds between two decreases of the cap
 S3_PRESIGNED_EXPIRE = 3600
+# Responses of requests sent with an Idempotency-Key, kept no longer than the
+# presigned URLs they contain stay valid
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", S3_PRESIGNED_EXPIRE)
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+# Upper bound of the per file size a presigned POST policy may allow
+S3_PRESIGNED_POST_MAX_FILE_SIZE = env.int("S3_PRESIGNED_POST_MAX_FILE_SIZE", 100 * 1024 * 1024)
+# Shared secret sent by the bucket notification target in X-Event-Token,
+# ObjectCreated events are refused while it is unset
+S3_EVENT_WEBHOOK_TOKEN = env.str("S3_EVENT_WEBHOOK_TOKEN", None)
+# Validate and move completed temps/ uploads to uploaded/ on ObjectCreated events
+S3_EVENT_PROMOTE = env.bool("S3_EVENT_PROMOTE", True)
+
+# Deferred purge of soft deleted files
+S3_PURGE_BATCH_SIZE = 1000
+S3_PURGE_MAX_RETRIES = 3
+
+# Opt-in compression of S3Client uploads (FileField saves are stored as is),
+# content type prefix -> encoding.
+# zstd needs the zstandard package and falls back to gzip without it
+S3_COMPRESSION_ENABLED = env.bool("S3_COMPRESSION_ENABLED", False)
+S3_COMPRESSION_TYPES = {
+    "text/": "gzip",
+    "text/csv": "zstd",
+    "application/json": "gzip",
+    "application/x-ndjson": "zstd",
+    "application/xml": "gzip",
+    "image/svg+xml": "gzip",
+}
+S3_COMPRESSION_GZIP_LEVEL = 6
+S3_COMPRESSION_ZSTD_LEVEL = 3
+S3_COMPRESSION_SPOOL_BYTES = 16 * 1024 * 1024
+# Ranged GET size and concurrency of S3Client.download
+S3_DOWNLOAD_CHUNK_SIZE = env.int("S3_DOWNLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+S3_DOWNLOAD_CONCURRENCY = env.int("S3_DOWNLOAD_CONCURRENCY", 8)
+# Objects downloaded at once by the prefix mirror (mirror_prefix)
+MIRROR_WORKERS = env.int("MIRROR_WORKERS", 8)
+# In-memory existence index of the bucket keys under S3_KEY_INDEX_PREFIX, bulk checks
+# passing allow_stale (emit_object_created_events --pending) skip the HEAD of keys it
+# does not hold. About 9 bytes per key, rebuilt from a listing every
+# S3_KEY_INDEX_REFRESH seconds
+S3_KEY_INDEX_ENABLED = env.bool("S3_KEY_INDEX_ENABLED", False)
+S3_KEY_INDEX_PREFIX = env.str("S3_KEY_INDEX_PREFIX", "")
+S3_KEY_INDEX_REFRESH = env.int("S3_KEY_INDEX_REFRESH", 3600)
+S3_KEY_INDEX_FALSE_POSITIVE_RATE = 0.01
+# Content validation of uploads: bytes sniffed with a ranged GET and the
+# policy of each module, allowed_types None accepts any type that is not blocked
+FILE_VALIDATION_SNIFF_BYTES = 4096
+FILE_VALIDATION_WORKERS = 8
+FILE_VALIDATION_POLICIES = {
+    "generic": {"allowed_types": None, "max_size": 100 * 1024 * 1024},
+}
+FILE_VALIDATION_BLOCKED_TYPES = [
+    "application/x-msdownload",
+    "application/x-executable",
+    "application/x-mach-binary",
+]
+# Rows fetched per server-side cursor round trip by the metadata export
+FILE_EXPORT_CHUNK_SIZE = 2000
+# Bulk ingest of a local directory (ingest_directory): concurrent uploads, rows
+# saved per bulk_create and the size from which a file is uploaded multipart
+INGEST_WORKERS = env.int("INGEST_WORKERS", 32)
+INGEST_CHUNK_SIZE = 5000
+INGEST_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+# Local storage provider serving: "sendfile", "x-accel-redirect" or "x-sendfile"
+LOCAL_STORAGE_SERVE_MODE = env.str("LOCAL_STORAGE_SERVE_MODE", "sendfile")
+# Internal nginx location aliased to MEDIA_ROOT, used by "x-accel-redirect"
+LOCAL_STORAGE_ACCEL_PREFIX = env.str("LOCAL_STORAGE_ACCEL_PREFIX", "/protected-media/")
+LOCAL_STORAGE_SIGNING_KEY = env.str("LOCAL_STORAGE_SIGNING_KEY", SECRET_KEY)
+
+# Local disk read-through cache of hot objects for the preview endpoint
+OBJECT_CACHE_ENABLED = env.bool("OBJECT_CACHE_ENABLED", False)
+OBJECT_CACHE_DIR = env.str("OBJECT_CACHE_DIR", os.path.join(BASE_DIR, "cache", "objects"))
+OBJECT_CACHE_MAX_BYTES = env.int("OBJECT_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+OBJECT_CACHE_MAX_OBJECT_BYTES = env.int("OBJECT_CACHE_MAX_OBJECT_BYTES", 50 * 1024 * 1024)
+# Only immutable prefixes may be cached
+OBJECT_CACHE_PREFIXES = ["uploaded/"]
+
+# Buffered access statistics of previews and downloads
+ACCESS_STATS_ENABLED = env.bool("ACCESS_STATS_ENABLED", True)
+ACCESS_STATS_FLUSH_INTERVAL = 30  # seconds
+ACCESS_STATS_MAX_KEYS = 10000
+
+# Storage class tiering of cold files
+STORAGE_TIERING_MIN_AGE_DAYS = 90
+STORAGE_TIERING_COLD_DAYS = 60
+STORAGE_TIERING_BATCH_SIZE = 1000
+STORAGE_TIERING_WORKERS = 8
+
+# Concurrent copies of the prefix move service
+PREFIX_MOVE_WORKERS = 16
+
+# Rows written per statement when upserting file metadata
+FILE_META_UPSERT_BATCH_SIZE = 1000
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -0,0 +1,75 @@
+"""
+Startup benchmark: measures app import time and ``manage.py check`` wall time.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import django
+django.setup()
+import base_wdg_file_storage.urls
+print(time.perf_counter() - start, "boto3" in sys.modules)
+"""
+
+
+def run_import(env):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True"
+
+
+def run_check(env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "manage.py", "check"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def summary(label, timings):
+    print(
+        f"{label:<28} median {statistics.median(timings) * 1000:8.1f} ms"
+        f"   min {min(timings) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "base_wdg_file_storage.settings"}
+
+    imports = [run_import(env) for _ in range(args.runs)]
+    checks = [run_check(env) for _ in range(args.runs)]
+
+    summary("django.setup() + urls", [timing for timing, _ in imports])
+    summary("manage.py check", checks)
+    print(f"boto3 imported at startup: {imports[0][1]}")
+
+
+if __name__ == "__main__":
+    main()
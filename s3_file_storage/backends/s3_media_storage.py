@@ -0,0 +1,17 @@
+from django.conf import settings
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from s3_file_storage.utils.s3_helpers import get_bucket_endpoint
+
+
+class S3MediaStorage(S3Boto3Storage):
+    default_acl = "public-read"
+    file_overwrite = False
+
+    def __init__(self, *args, bucket_name=None, **kwargs):
+        self.access_key = settings.S3_ACCESS_KEY_ID
+        self.secret_key = settings.S3_SECRET_ACCESS_KEY
+        self.bucket_name = bucket_name or settings.S3_STORAGE_BUCKET_NAME
+        self.endpoint_url = f"https://{get_bucket_endpoint(self.bucket_name)}"
+
+        super().__init__(*args, **kwargs)
@@ -1,44 +1,76 @@
+import threading
+
 from django.conf import settings
-from django.core.files.storage import FileSystemStorage
-from storages.backends.s3boto3 import S3Boto3Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
 
 
+@deconstructible
 class MultiStorage:
+    """
+    Proxy to a storage backend selected by name.
+
+    The backend (and boto3 for S3) is only imported and built on first use, and the
+    instance is shared by every MultiStorage using the same backend name.
+    """
+
     BACKENDS = {
-        "local": FileSystemStorage,
-        "s3": S3Boto3Storage,
+        "local": "django.core.files.storage.FileSystemStorage",
+        "s3": "storages.backends.s3boto3.S3Boto3Storage",
     }
 
+    _instances = {}
+    _lock = threading.Lock()
+
     def __init__(self, backend_name="s3"):
-        backend_class = self.BACKENDS.get(backend_name)
-        if not backend_class:
+        if backend_name not in self.BACKENDS:
             raise ValueError(f"Unsupported storage backend: {backend_name}")
-        self.storage = backend_class()
+        self.backend_name = backend_name
+
+    @classmethod
+    def get_backend(cls, backend_name):
+        """
+        Return the shared backend instance, building it on first access.
+        """
+        backend = cls._instances.get(backend_name)
+        if backend is None:
+            with cls._lock:
+                backend = cls._instances.get(backend_name)
+                if backend is None:
+                    backend = cls._build_backend(backend_name)
+                    cls._instances[backend_name] = backend
+        return backend
+
+    @classmethod
+    def _build_backend(cls, backend_name):
+        backend_class = import_string(cls.BACKENDS[backend_name])
 
         # Pass additional parameters for S3
         if backend_name == "s3":
-            self.storage = backend_class(
+            return backend_class(
                 access_key=settings.S3_ACCESS_KEY_ID,
                 secret_key=settings.S3_SECRET_ACCESS_KEY,
                 endpoint_url=f"https://{settings.S3_ENDPOINT_URL}",
                 bucket_name=settings.S3_STORAGE_BUCKET_NAME,
             )
-        else:
-            self.storage = backend_class()
+        return backend_class()
+
+    @cached_property
+    def storage(self):
+        return self.get_backend(self.backend_name)
 
     def __getattr__(self, name):
+        # Avoid building the backend for dunder lookups (copy, pickle) or before __init__
+        if name.startswith("__") or name in ("backend_name", "storage"):
+            raise AttributeError(name)
         return getattr(self.storage, name)
 
 
-class S3MediaStorage(S3Boto3Storage):
-    default_acl = "public-read"
-    file_overwrite = False
-
-    def __init__(self, *args, **kwargs):
-        self.access_key = settings.S3_ACCESS_KEY_ID
-        self.secret_key = settings.S3_SECRET_ACCESS_KEY
-        self.bucket_name = settings.S3_STORAGE_BUCKET_NAME
-        self.endpoint_url = f"https://{settings.S3_ENDPOINT_URL}"
-
-        super().__init__(*args, **kwargs)
+def __getattr__(name):
+    # S3MediaStorage subclasses S3Boto3Storage, import it only when it is asked for
+    if name == "S3MediaStorage":
+        from s3_file_storage.backends.s3_media_storage import S3MediaStorage
 
+        return S3MediaStorage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,20 @@
 class StorageModule:
     GENERIC = "generic"
-    
+
+    CHOICES = [
+        (GENERIC, "Generic"),
+    ]
+
+
 class StorageClassify:
     TEMPS = "temps"
     UPLOADED = "uploaded"
+    QUARANTINE = "quarantine"
 
     CHOICES = [
         (TEMPS, "Temp"),
         (UPLOADED, "Uploaded"),
+        (QUARANTINE, "Quarantine"),
     ]
 
 
@@ -19,13 +26,87 @@ class StorageProvider:
         (LOCAL, "Local"),
         (S3, "S3"),
     ]
+
+
+class StorageTier:
+    STANDARD = "STANDARD"
+    STANDARD_IA = "STANDARD_IA"
+    GLACIER_IR = "GLACIER_IR"
+    GLACIER = "GLACIER"
+    DEEP_ARCHIVE = "DEEP_ARCHIVE"
+
+    # Classes that must be restored before the object can be read
+    ARCHIVED = [GLACIER, DEEP_ARCHIVE]
+
+    CHOICES = [
+        (STANDARD, "Standard"),
+        (STANDARD_IA, "Standard-IA"),
+        (GLACIER_IR, "Glacier Instant Retrieval"),
+        (GLACIER, "Glacier Flexible Retrieval"),
+        (DEEP_ARCHIVE, "Glacier Deep Archive"),
+    ]
+
+
+class MoveJobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    ]
+
+
+class LocalServeMode:
+    SENDFILE = "sendfile"
+    X_ACCEL_REDIRECT = "x-accel-redirect"
+    X_SENDFILE = "x-sendfile"
+
+    CHOICES = [
+        (SENDFILE, "Sendfile"),
+        (X_ACCEL_REDIRECT, "X-Accel-Redirect"),
+        (X_SENDFILE, "X-Sendfile"),
+    ]
     
 
 class UploadStatus:
     PENDING = "pending"
     COMPLETED = "completed"
+    QUARANTINED = "quarantined"
 
     CHOICES = [
         (PENDING, "Pending"),
         (COMPLETED, "Completed"),
+        (QUARANTINED, "Quarantined"),
+    ]
+
+
+class ExportFormat:
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    CHOICES = [
+        (NDJSON, "NDJSON"),
+        (CSV, "CSV"),
+    ]
+
+    CONTENT_TYPES = {
+        NDJSON: "application/x-ndjson",
+        CSV: "text/csv",
+    }
+
+
+class Discrepancy:
+    MISSING_OBJECT = "missing_object"
+    ORPHAN_OBJECT = "orphan_object"
+    SIZE_MISMATCH = "size_mismatch"
+
+    CHOICES = [
+        (MISSING_OBJECT, "Missing object"),
+        (ORPHAN_OBJECT, "Orphan object"),
+        (SIZE_MISMATCH, "Size mismatch"),
     ]
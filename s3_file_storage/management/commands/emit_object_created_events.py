@@ -0,0 +1,128 @@
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from urllib.parse import quote_plus
+
+from s3_file_storage.constants import UploadStatus
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.services.upload_event_service import EVENT_TOKEN_HEADER
+from s3_file_storage.utils.key_index import KeyIndexRegistry
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import get_bucket_name
+
+
+def build_object_created_record(bucket_name: str, key: str, size=None, etag=None) -> dict:
+    """
+    An ObjectCreated:Put record shaped like the ones S3 and MinIO notifications send.
+    """
+    obj = {"key": quote_plus(key, safe="/")}
+    if size is not None:
+        obj["size"] = size
+    if etag:
+        obj["eTag"] = etag.strip('"')
+    return {
+        "eventVersion": "2.1",
+        "eventSource": "aws:s3",
+        "eventName": "ObjectCreated:Put",
+        "s3": {"bucket": {"name": bucket_name}, "object": obj},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Local stand-in for bucket notifications: post ObjectCreated events for the "
+        "given keys, for the objects listed under a prefix, or for the pending rows "
+        "whose objects exist (missed notifications), to the event endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("keys", nargs="*")
+        parser.add_argument("--prefix", default=None, help="List the keys to send.")
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="Send the keys of the pending rows that exist in the bucket.",
+        )
+        parser.add_argument("--bucket-name", default=None)
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--token", default=None, help="Defaults to S3_EVENT_WEBHOOK_TOKEN.")
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        if not options["keys"] and options["prefix"] is None and not options["pending"]:
+            raise CommandError("Give object keys, --prefix or --pending.")
+
+        bucket_name = options["bucket_name"] or get_bucket_name()
+        url = options["base_url"].rstrip("/") + reverse("file_storage_object_created_event")
+        token = options["token"] or settings.S3_EVENT_WEBHOOK_TOKEN or ""
+
+        records = [build_object_created_record(bucket_name, key) for key in options["keys"]]
+        if options["prefix"] is not None:
+            storage = S3Client(bucket_name)
+            for page in storage.list_object_pages(options["prefix"], bucket_name=bucket_name):
+                records.extend(
+                    build_object_created_record(
+                        bucket_name, obj["Key"], size=obj["Size"], etag=obj.get("ETag")
+                    )
+                    for obj in page
+                )
+        if options["pending"]:
+            records.extend(
+                build_object_created_record(bucket_name, key)
+                for key in self.existing_pending_keys(
+                    bucket_name, max(1, options["batch_size"])
+                )
+            )
+
+        batch_size = max(1, options["batch_size"])
+        for start in range(0, len(records), batch_size):
+            response = requests.post(
+                url,
+                json={"Records": records[start : start + batch_size]},
+                headers={EVENT_TOKEN_HEADER: token},
+                timeout=30,
+            )
+            if response.status_code != 200:
+                raise CommandError(
+                    f"Event endpoint answered HTTP {response.status_code}: {response.text}"
+                )
+            self.stdout.write(response.text)
+
+        self.stderr.write(self.style.SUCCESS(f"Sent {len(records)} events."))
+
+    @classmethod
+    def existing_pending_keys(cls, bucket_name: str, batch_size: int):
+        """
+        Keys of the pending rows of a bucket whose objects exist. The key index may
+        miss recent uploads, such rows just stay pending until a later run, the keys
+        it holds are confirmed with a HEAD.
+        """
+        if settings.S3_KEY_INDEX_ENABLED:
+            # One listing instead of a HEAD per pending row
+            KeyIndexRegistry.get_instance().refresh(bucket_name, wait=True)
+
+        storage = S3Client(bucket_name)
+        keys = (
+            FileStorageModel.objects.filter(
+                FileStorageModel.bucket_filter(bucket_name),
+                upload_status=UploadStatus.PENDING,
+                deleted=False,
+            )
+            .exclude(file_path="")
+            .values_list("file_path", flat=True)
+        )
+        chunk = []
+        for key in keys.iterator(chunk_size=batch_size):
+            chunk.append(key)
+            if len(chunk) >= batch_size:
+                yield from cls._existing(storage, bucket_name, chunk)
+                chunk = []
+        yield from cls._existing(storage, bucket_name, chunk)
+
+    @staticmethod
+    def _existing(storage: S3Client, bucket_name: str, keys: list):
+        if not keys:
+            return
+        exists = storage.check_files_exist_in_bucket(bucket_name, keys, allow_stale=True)
+        yield from (key for key in keys if exists[key])
@@ -0,0 +1,63 @@
+import argparse
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from s3_file_storage.constants import ExportFormat
+from s3_file_storage.services.file_export_service import FileExportService
+
+
+def datetime_argument(value: str):
+    """
+    argparse type for ISO 8601 datetimes, rejects values parse_datetime can't read.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"Invalid datetime: {value}")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Stream file metadata as NDJSON or CSV, to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            default=ExportFormat.NDJSON,
+            choices=[choice for choice, _ in ExportFormat.CHOICES],
+        )
+        parser.add_argument("--output", default=None, help="Defaults to stdout.")
+        parser.add_argument("--company-id", default=None)
+        parser.add_argument("--ref-type", default=None)
+        parser.add_argument("--ref-id", default=None)
+        parser.add_argument("--date-from", type=datetime_argument, default=None)
+        parser.add_argument("--date-to", type=datetime_argument, default=None)
+        parser.add_argument("--include-deleted", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        queryset = FileExportService.get_queryset(
+            company_id=options["company_id"],
+            ref_type=options["ref_type"],
+            ref_id=options["ref_id"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+            include_deleted=options["include_deleted"],
+        )
+        chunks = FileExportService.stream(
+            queryset, options["format"], chunk_size=options["chunk_size"]
+        )
+
+        if not options["output"]:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}."))
@@ -0,0 +1,64 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from s3_file_storage.constants import StorageModule
+from s3_file_storage.services.bulk_ingest_service import BulkIngestService
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload every file of a local directory tree to uploaded/ and create their "
+        "rows. Progress is kept in a manifest, run the command again with the same "
+        "manifest to resume an interrupted ingest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory")
+        parser.add_argument(
+            "--manifest",
+            default=None,
+            help="Defaults to <directory>.ingest.ndjson next to the directory.",
+        )
+        parser.add_argument("--module", default=StorageModule.GENERIC)
+        parser.add_argument("--tenant", default=None)
+        parser.add_argument("--bucket-name", default=None)
+        parser.add_argument("--ref-type", default=None)
+        parser.add_argument("--ref-id", default=None)
+        parser.add_argument("--company-id", default=None)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options["directory"])
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory.")
+        manifest_path = options["manifest"] or f"{directory.rstrip(os.sep)}.ingest.ndjson"
+
+        try:
+            result = BulkIngestService.ingest(
+                directory,
+                manifest_path,
+                module=options["module"],
+                tenant=options["tenant"],
+                bucket_name=options["bucket_name"],
+                ref_type=options["ref_type"],
+                ref_id=options["ref_id"],
+                company_id=options["company_id"],
+                workers=options["workers"],
+                chunk_size=options["chunk_size"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Uploaded {result['uploaded']} files, skipped {result['skipped']} "
+                f"already ingested, {result['failed']} failed, saved {result['saved']} "
+                f"rows. Manifest: {manifest_path}"
+            )
+        )
+        if result["failed"]:
+            raise CommandError(
+                f"{result['failed']} files failed, run the command again to retry them."
+            )
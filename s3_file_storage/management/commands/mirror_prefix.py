@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from s3_file_storage.services.bucket_mirror_service import BucketMirrorService
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror the objects under a bucket prefix to a local directory. Objects whose "
+        "ETag and size match the state index of the last run are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("prefix", help='Key prefix, e.g. "uploaded/public/".')
+        parser.add_argument("destination")
+        parser.add_argument("--bucket-name", default=None)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Remove the local copies of objects deleted from the bucket.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = BucketMirrorService.mirror(
+                options["prefix"],
+                options["destination"],
+                bucket_name=options["bucket_name"],
+                workers=options["workers"],
+                delete=options["delete"],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Downloaded {result['downloaded']} objects, {result['unchanged']} "
+                f"unchanged, {result['deleted']} deleted, {result['failed']} failed."
+            )
+        )
+        if result["failed"]:
+            raise CommandError(
+                f"{result['failed']} objects failed, run the command again to retry them."
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from s3_file_storage.constants import MoveJobStatus
+from s3_file_storage.services.prefix_move_service import PrefixMoveService
+
+
+class Command(BaseCommand):
+    help = (
+        "Move every object under a prefix to another prefix and rewrite file_path. "
+        "An interrupted move resumes from its checkpoint when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source_prefix")
+        parser.add_argument("destination_prefix")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--bucket-name", default=None)
+
+    def handle(self, *args, **options):
+        try:
+            job = PrefixMoveService.get_or_create_job(
+                options["source_prefix"],
+                options["destination_prefix"],
+                bucket_name=options["bucket_name"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if job.last_key:
+            self.stdout.write(f"Resuming job {job.id} after {job.last_key}")
+
+        job = PrefixMoveService.run(job, workers=options["workers"])
+
+        if job.status != MoveJobStatus.COMPLETED:
+            raise CommandError(
+                f"Job {job.id} stopped after {job.moved_count} objects: {job.error}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Moved {job.moved_count} objects (job {job.id}).")
+        )
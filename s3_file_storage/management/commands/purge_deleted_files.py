@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from s3_file_storage.services.purge_deleted_file_service import PurgeDeletedFileService
+
+
+class Command(BaseCommand):
+    help = "Delete the objects of soft deleted files from the bucket and purge their rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--max-retries", type=int, default=None)
+        parser.add_argument(
+            "--keep-rows",
+            action="store_true",
+            help="Archive the rows (clear file_path) instead of deleting them.",
+        )
+        parser.add_argument(
+            "--bucket-name",
+            default=None,
+            help="Only purge the files of this bucket, by default every bucket.",
+        )
+
+    def handle(self, *args, **options):
+        result = PurgeDeletedFileService.purge_deleted_files(
+            batch_size=options["batch_size"],
+            max_retries=options["max_retries"],
+            keep_rows=options["keep_rows"],
+            bucket_name=options["bucket_name"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purged {result['purged']} files, {result['failed']} failed."
+            )
+        )
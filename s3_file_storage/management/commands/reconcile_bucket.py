@@ -0,0 +1,40 @@
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from s3_file_storage.services.bucket_reconcile_service import BucketReconcileService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the file rows with the bucket listing and write the missing objects, "
+        "orphan objects and size mismatches as NDJSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="")
+        parser.add_argument("--bucket-name", default=None)
+        parser.add_argument("--output", default=None, help="Defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        output = open(options["output"], "w") if options["output"] else sys.stdout
+        counts = Counter()
+        try:
+            for discrepancy in BucketReconcileService.reconcile(
+                prefix=options["prefix"],
+                bucket_name=options["bucket_name"],
+                chunk_size=options["chunk_size"],
+            ):
+                counts[discrepancy["type"]] += 1
+                output.write(json.dumps(discrepancy) + "\n")
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        summary = ", ".join(f"{count} {name}" for name, count in sorted(counts.items()))
+        self.stderr.write(self.style.SUCCESS(f"Reconciled: {summary or 'no discrepancies'}."))
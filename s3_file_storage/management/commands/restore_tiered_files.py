@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from s3_file_storage.services.storage_tiering_service import StorageTieringService
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring tiered files back to the standard storage class. "
+        "Archived files are restored first, run again once the restore completed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="+")
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument(
+            "--retrieval-tier",
+            default="Standard",
+            choices=["Expedited", "Standard", "Bulk"],
+        )
+
+    def handle(self, *args, **options):
+        result = StorageTieringService.restore_files(
+            ids=options["ids"],
+            days=options["days"],
+            retrieval_tier=options["retrieval_tier"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Restored {result['restored']} files, {result['ongoing']} restores "
+                f"in progress, {result['failed']} failed."
+            )
+        )
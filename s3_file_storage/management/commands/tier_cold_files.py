@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from s3_file_storage.constants import StorageTier
+from s3_file_storage.services.storage_tiering_service import StorageTieringService
+
+
+class Command(BaseCommand):
+    help = "Move files that are old and not read recently to a cheaper storage class."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--storage-class",
+            default=StorageTier.STANDARD_IA,
+            choices=[choice for choice, _ in StorageTier.CHOICES],
+        )
+        parser.add_argument("--min-age-days", type=int, default=None)
+        parser.add_argument("--cold-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--bucket-name",
+            default=None,
+            help="Only tier the files of this bucket, by default every bucket.",
+        )
+
+    def handle(self, *args, **options):
+        result = StorageTieringService.tier_cold_files(
+            storage_class=options["storage_class"],
+            min_age_days=options["min_age_days"],
+            cold_days=options["cold_days"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            bucket_name=options["bucket_name"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Moved {result['moved']} files to {options['storage_class']}, "
+                f"{result['failed']} failed."
+            )
+        )
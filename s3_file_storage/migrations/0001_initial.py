@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.comparison
+import s3_file_storage.backends.storages
+import uuid
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='FileAccessStatModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_key', models.CharField(max_length=1024, unique=True)),
+                ('access_count', models.BigIntegerField(default=0)),
+                ('last_access_date', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'file_access_stat',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrefixMoveJobModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('bucket_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('source_prefix', models.CharField(max_length=1024)),
+                ('destination_prefix', models.CharField(max_length=1024)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('last_key', models.CharField(blank=True, max_length=1024, null=True)),
+                ('moved_count', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('create_date', models.DateTimeField(auto_now_add=True, null=True)),
+                ('write_date', models.DateTimeField(auto_now=True, null=True)),
+            ],
+            options={
+                'db_table': 'file_storage_move_job',
+            },
+        ),
+        migrations.CreateModel(
+            name='UploadBatchModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('bucket_name', models.CharField(max_length=63)),
+                ('key_prefix', models.CharField(max_length=1024, unique=True)),
+                ('module', models.CharField(choices=[('generic', 'Generic')], default='generic', max_length=50)),
+                ('ref_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('ref_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('create_date', models.DateTimeField(auto_now_add=True, null=True)),
+                ('write_date', models.DateTimeField(auto_now=True, null=True)),
+                ('create_uid', models.IntegerField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'db_table': 'file_storage_upload_batch',
+            },
+        ),
+        migrations.CreateModel(
+            name='FileStorageModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('file_path', models.FileField(max_length=1024, null=True, storage=s3_file_storage.backends.storages.MultiStorage(backend_name='s3'), upload_to='')),
+                ('file_type', models.CharField(max_length=255, null=True)),
+                ('description', models.TextField(null=True)),
+                ('ref_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('ref_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('file_name', models.CharField(max_length=250, null=True)),
+                ('original_file_name', models.CharField(max_length=255, null=True)),
+                ('file_size', models.CharField(max_length=250, null=True)),
+                ('bucket_name', models.CharField(blank=True, max_length=63, null=True)),
+                ('checksum_sha256', models.CharField(blank=True, max_length=64, null=True)),
+                ('checksum_crc32', models.CharField(blank=True, max_length=16, null=True)),
+                ('content_encoding', models.CharField(blank=True, max_length=20, null=True)),
+                ('original_file_size', models.BigIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(blank=True, default=False, null=True)),
+                ('storage_provider', models.CharField(blank=True, choices=[('local', 'Local'), ('s3', 'S3')], default='s3', null=True)),
+                ('upload_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('completed', 'Completed'), ('quarantined', 'Quarantined')], default='pending', null=True)),
+                ('storage_class', models.CharField(blank=True, choices=[('STANDARD', 'Standard'), ('STANDARD_IA', 'Standard-IA'), ('GLACIER_IR', 'Glacier Instant Retrieval'), ('GLACIER', 'Glacier Flexible Retrieval'), ('DEEP_ARCHIVE', 'Glacier Deep Archive')], default='STANDARD', max_length=50, null=True)),
+                ('create_date', models.DateTimeField(auto_now_add=True, null=True)),
+                ('write_date', models.DateTimeField(auto_now=True, null=True)),
+                ('create_uid', models.IntegerField(blank=True, editable=False, null=True)),
+                ('write_uid', models.IntegerField(blank=True, editable=False, null=True)),
+                ('company_id', models.CharField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'db_table': 'file_storage',
+                'indexes': [models.Index(fields=['storage_class', 'id'], name='file_storage_class_id_idx'), models.Index(fields=['checksum_sha256'], name='file_storage_sha256_idx'), models.Index(fields=['company_id', 'ref_type'], name='file_storage_company_ref_idx'), django.contrib.postgres.indexes.GinIndex(fields=['original_file_name'], name='file_storage_name_trgm_idx', opclasses=['gin_trgm_ops']), django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('description', config='simple'), name='file_storage_desc_fts_idx'), models.Index(django.db.models.functions.comparison.Collate('file_path', 'C'), name='file_storage_path_c_idx')],
+            },
+        ),
+    ]
@@ -1 +1,4 @@
-from . import file_storage_model
\ No newline at end of file
+from . import file_storage_model
+from . import file_access_stat_model
+from . import prefix_move_job_model
+from . import upload_batch_model
\ No newline at end of file
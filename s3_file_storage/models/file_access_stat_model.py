@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class FileAccessStatModel(models.Model):
+    file_key = models.CharField(max_length=1024, unique=True)
+    access_count = models.BigIntegerField(default=0)
+    last_access_date = models.DateTimeField(blank=True, null=True)
+
+    model_description = "File Access Statistic"
+
+    class Meta:
+        db_table = "file_access_stat"
+
+    def __str__(self):
+        return self.file_key
@@ -1,14 +1,19 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Collate
 
 from s3_file_storage.backends.storages import MultiStorage
-from s3_file_storage.constants import StorageProvider, UploadStatus
+from s3_file_storage.constants import StorageProvider, StorageTier, UploadStatus
 
 
 class FileStorageModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    file_id = models.UUIDField(default=uuid.uuid4, editable=False)
+    file_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     file_path = models.FileField(
         max_length=1024, blank=False, null=True, storage=MultiStorage(backend_name="s3")
     )
@@ -19,6 +24,13 @@ class FileStorageModel(models.Model):
     file_name = models.CharField(max_length=250, blank=False, null=True)
     original_file_name = models.CharField(max_length=255, blank=False, null=True)
     file_size = models.CharField(max_length=250, blank=False, null=True)
+    # Bucket holding the object, None for rows saved in the default bucket
+    bucket_name = models.CharField(max_length=63, blank=True, null=True)
+    checksum_sha256 = models.CharField(max_length=64, blank=True, null=True)
+    checksum_crc32 = models.CharField(max_length=16, blank=True, null=True)
+    # Set when the object is stored compressed (gzip, zstd), with its size before
+    content_encoding = models.CharField(max_length=20, blank=True, null=True)
+    original_file_size = models.BigIntegerField(blank=True, null=True)
     deleted = models.BooleanField(default=False, blank=True, null=True)
     storage_provider = models.CharField(
         blank=True,
@@ -32,6 +44,13 @@ class FileStorageModel(models.Model):
         default=UploadStatus.PENDING,
         choices=UploadStatus.CHOICES,
     )
+    storage_class = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        default=StorageTier.STANDARD,
+        choices=StorageTier.CHOICES,
+    )
     create_date = models.DateTimeField(auto_now_add=True, blank=True, null=True)
     write_date = models.DateTimeField(auto_now=True, blank=True, null=True)
     create_uid = models.IntegerField(blank=True, null=True, editable=False)
@@ -43,6 +62,37 @@ class FileStorageModel(models.Model):
     
     class Meta:
         db_table = "file_storage"
+        indexes = [
+            # Keyset paging of the tiering candidates
+            models.Index(fields=["storage_class", "id"], name="file_storage_class_id_idx"),
+            # Deduplication lookups by content digest
+            models.Index(fields=["checksum_sha256"], name="file_storage_sha256_idx"),
+            # Search filters
+            models.Index(fields=["company_id", "ref_type"], name="file_storage_company_ref_idx"),
+            # Name search, pg_trgm is enabled ahead of this index in 0001_initial
+            GinIndex(
+                fields=["original_file_name"],
+                name="file_storage_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                SearchVector("description", config="simple"),
+                name="file_storage_desc_fts_idx",
+            ),
+            # Keys in S3 listing (byte) order for the bucket reconciliation
+            models.Index(Collate("file_path", "C"), name="file_storage_path_c_idx"),
+        ]
 
     def __str__(self):
         return self.original_file_name or self.file_name
+
+    @staticmethod
+    def bucket_filter(bucket_name: str = None) -> Q:
+        """
+        Filter of the rows whose object is stored in a bucket (default: the default
+        bucket), rows without bucket_name belong to the default bucket.
+        """
+        bucket_name = bucket_name or settings.S3_STORAGE_BUCKET_NAME
+        if bucket_name == settings.S3_STORAGE_BUCKET_NAME:
+            return Q(bucket_name=bucket_name) | Q(bucket_name__isnull=True)
+        return Q(bucket_name=bucket_name)
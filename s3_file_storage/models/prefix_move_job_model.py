@@ -0,0 +1,29 @@
+import uuid
+
+from django.db import models
+
+from s3_file_storage.constants import MoveJobStatus
+
+
+class PrefixMoveJobModel(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    bucket_name = models.CharField(max_length=255, blank=True, null=True)
+    source_prefix = models.CharField(max_length=1024)
+    destination_prefix = models.CharField(max_length=1024)
+    status = models.CharField(
+        max_length=20, default=MoveJobStatus.PENDING, choices=MoveJobStatus.CHOICES
+    )
+    # Checkpoint: every key up to this one has been moved
+    last_key = models.CharField(max_length=1024, blank=True, null=True)
+    moved_count = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    create_date = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+    write_date = models.DateTimeField(auto_now=True, blank=True, null=True)
+
+    model_description = "Prefix Move Job"
+
+    class Meta:
+        db_table = "file_storage_move_job"
+
+    def __str__(self):
+        return f"{self.source_prefix} -> {self.destination_prefix}"
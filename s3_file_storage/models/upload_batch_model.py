@@ -0,0 +1,29 @@
+import uuid
+
+from django.db import models
+
+from s3_file_storage.constants import StorageModule
+
+
+class UploadBatchModel(models.Model):
+    # The batch_id returned with the presigned POST policy
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    bucket_name = models.CharField(max_length=63)
+    # Every key uploaded with the policy starts with it
+    key_prefix = models.CharField(max_length=1024, unique=True)
+    module = models.CharField(
+        max_length=50, default=StorageModule.GENERIC, choices=StorageModule.CHOICES
+    )
+    ref_type = models.CharField(max_length=100, blank=True, null=True)
+    ref_id = models.CharField(max_length=100, blank=True, null=True)
+    create_date = models.DateTimeField(auto_now_add=True, blank=True, null=True)
+    write_date = models.DateTimeField(auto_now=True, blank=True, null=True)
+    create_uid = models.IntegerField(blank=True, null=True, editable=False)
+
+    model_description = "Upload Batch"
+
+    class Meta:
+        db_table = "file_storage_upload_batch"
+
+    def __str__(self):
+        return self.key_prefix
@@ -0,0 +1,91 @@
+import base64
+import json
+import uuid
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from s3_file_storage.models.file_storage_model import FileStorageModel
+
+# Must match the expression of the description GIN index on FileStorageModel
+DESCRIPTION_SEARCH_VECTOR = SearchVector("description", config="simple")
+
+
+def encode_search_cursor(rank: float, file_id) -> str:
+    payload = json.dumps([rank, str(file_id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_search_cursor(cursor: str):
+    try:
+        rank, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), uuid.UUID(file_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+
+def search_files(
+    query: str,
+    company_id: str,
+    ref_type: str = None,
+    page_size: int = 20,
+    cursor: str = None,
+):
+    """
+    Ranked search over file names (trigram) and descriptions (full-text).
+
+    Both predicates are served by GIN indexes and the search is always scoped to one
+    company. Results are ordered by rank then id and paged with a keyset cursor on
+    the computed rank, so every page still ranks all matches of the company, the
+    cursor only spares returning the earlier pages.
+
+    Args:
+        query (str): the search text
+        company_id (str): company of the caller, the files searched
+        ref_type (str): restrict to a reference type
+        page_size (int): number of results
+        cursor (str): cursor of the previous page
+
+    Returns:
+        tuple: (list of FileStorageModel with a rank attribute, next cursor or None)
+    """
+    search_query = SearchQuery(query, config="simple", search_type="websearch")
+
+    queryset = FileStorageModel.objects.filter(deleted=False, company_id=company_id)
+    if ref_type:
+        queryset = queryset.filter(ref_type=ref_type)
+
+    queryset = (
+        queryset.annotate(description_vector=DESCRIPTION_SEARCH_VECTOR)
+        .filter(
+            Q(original_file_name__trigram_word_similar=query)
+            | Q(description_vector=search_query)
+        )
+        .annotate(
+            rank=Greatest(
+                TrigramWordSimilarity(query, "original_file_name"),
+                SearchRank(F("description_vector"), search_query),
+            )
+        )
+    )
+
+    if cursor:
+        last_rank, last_id = decode_search_cursor(cursor)
+        queryset = queryset.filter(
+            Q(rank__lt=last_rank) | Q(rank=last_rank, id__lt=last_id)
+        )
+
+    results = list(queryset.order_by("-rank", "-id")[: page_size + 1])
+
+    next_cursor = None
+    if len(results) > page_size:
+        results = results[:page_size]
+        next_cursor = encode_search_cursor(results[-1].rank, results[-1].id)
+
+    return results, next_cursor
@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from s3_file_storage.backends.storages import MultiStorage
+from s3_file_storage.constants import ExportFormat, StorageModule
 from s3_file_storage.models.file_storage_model import FileStorageModel
 
 
@@ -14,6 +16,9 @@ class FileSerializer(serializers.Serializer):
     original_file_name = serializers.CharField(max_length=255)
     file_size = serializers.IntegerField()
     content_type = serializers.CharField(max_length=50)
+    checksum_sha256 = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$", required=False, allow_null=True
+    )
 
 
 class PreSingedUploadSerializer(serializers.Serializer):
@@ -24,6 +29,25 @@ class PreSingedUploadSerializer(serializers.Serializer):
     files = FileSerializer(many=True, required=True)
 
 
+class PreSignedPostUploadSerializer(serializers.Serializer):
+    ref_type = serializers.CharField(max_length=50)
+    ref_id = serializers.IntegerField(required=False)
+    hr_employee = serializers.IntegerField()
+    module = serializers.ChoiceField(choices=StorageModule.CHOICES, required=False)
+    content_type_prefix = serializers.CharField(
+        max_length=100, required=False, allow_blank=True
+    )
+    max_file_size = serializers.IntegerField(required=False, min_value=1)
+    expiry = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_max_file_size(self, value):
+        if value > settings.S3_PRESIGNED_POST_MAX_FILE_SIZE:
+            raise serializers.ValidationError(
+                f"Ensure this value is less than or equal to {settings.S3_PRESIGNED_POST_MAX_FILE_SIZE}."
+            )
+        return value
+
+
 class FileInfoSerializer(serializers.Serializer):
     original_file_name = serializers.CharField(required=True, allow_blank=False)
     file_size = serializers.IntegerField(required=True)
@@ -50,6 +74,29 @@ class FileStorageValidateByRefSerializer(serializers.Serializer):
     ref_id = serializers.IntegerField(required=False)
 
 
+class FileStorageBatchDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+
+class FileStorageSearchValidateSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=255)
+    ref_type = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=100)
+    cursor = serializers.CharField(required=False)
+
+
+class FileStorageExportValidateSerializer(serializers.Serializer):
+    # Not "format", DRF reads that query parameter for content negotiation
+    export_format = serializers.ChoiceField(
+        choices=ExportFormat.CHOICES, default=ExportFormat.NDJSON
+    )
+    ref_type = serializers.CharField(required=False)
+    ref_id = serializers.CharField(required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+    include_deleted = serializers.BooleanField(required=False, default=False)
+
+
 class FileUploadValidateSerializer(serializers.Serializer):
     id = serializers.CharField()
     file_path = serializers.CharField()
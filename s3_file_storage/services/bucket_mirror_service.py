@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import get_bucket_name
+
+logger = logging.getLogger(__name__)
+
+# State index kept at the root of the mirror, object key -> ETag and size
+STATE_FILE_NAME = ".mirror-state.json"
+# Downloads between two saves of the state index
+STATE_SAVE_INTERVAL = 1000
+
+
+class BucketMirrorService:
+    """
+    Keep a local directory in sync with a bucket prefix.
+
+    The ETag and size of every mirrored object are kept in a state index, a run
+    only downloads the objects whose listing entry differs from the index (or
+    whose local copy is gone), so repeated runs transfer the delta. Objects are
+    mirrored as stored, compressed objects keep their Content-Encoding bytes.
+    """
+
+    @staticmethod
+    def load_state(destination: str, prefix: str) -> dict:
+        path = os.path.join(destination, STATE_FILE_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as state_file:
+            state = json.load(state_file)
+        # Local paths are relative to the prefix, another prefix starts over
+        if state.get("prefix") != prefix:
+            return {}
+        return state.get("objects", {})
+
+    @staticmethod
+    def save_state(destination: str, prefix: str, objects: dict):
+        """
+        Write the state index through a temporary file so a crash never leaves it torn.
+        """
+        path = os.path.join(destination, STATE_FILE_NAME)
+        with open(f"{path}.tmp", "w") as state_file:
+            json.dump({"prefix": prefix, "objects": objects}, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def local_path(destination: str, prefix: str, key: str):
+        """
+        Path of an object in the mirror, None for keys escaping the destination.
+        """
+        relative_path = key[len(prefix) :].lstrip("/")
+        path = os.path.normpath(os.path.join(destination, relative_path))
+        if not relative_path or not path.startswith(destination + os.sep):
+            return None
+        return path
+
+    @staticmethod
+    def download(storage: S3Client, bucket_name: str, key: str, path: str):
+        """
+        Download an object next to its local path and move it in place once complete.
+
+        Returns:
+            str: the ETag of the downloaded object, None on failure
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial_path = f"{path}.part"
+        try:
+            etag = storage.download(key, partial_path, bucket_name=bucket_name)
+        except OSError as e:
+            logger.error(f"Failed to mirror {key}: {e}")
+            etag = None
+        if etag is None:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return None
+        os.replace(partial_path, path)
+        return etag
+
+    @classmethod
+    def mirror(
+        cls,
+        prefix: str,
+        destination: str,
+        bucket_name: str = None,
+        workers: int = None,
+        delete: bool = False,
+    ) -> dict:
+        """
+        Mirror the objects under a prefix to a local directory.
+
+        Args:
+            prefix (str): key prefix to mirror, e.g. "uploaded/public/"
+            destination (str): local directory of the mirror
+            bucket_name (str): define name of bucket
+            workers (int): number of objects downloaded at once, each one with
+                S3_DOWNLOAD_CONCURRENCY ranged GETs
+            delete (bool): remove the local copies of objects gone from the bucket
+
+        Returns:
+            dict: counts of downloaded, unchanged, failed and deleted objects
+        """
+        destination = os.path.abspath(destination)
+        os.makedirs(destination, exist_ok=True)
+        bucket_name = bucket_name or get_bucket_name()
+        workers = workers or settings.MIRROR_WORKERS
+        storage = S3Client(bucket_name)
+        result = {"downloaded": 0, "unchanged": 0, "failed": 0, "deleted": 0}
+
+        state = cls.load_state(destination, prefix)
+        listed = set()
+        in_flight = {}
+
+        def record(future, key, size):
+            etag = future.result()
+            if etag is None:
+                result["failed"] += 1
+                # Downloaded again on the next run
+                state.pop(key, None)
+                return
+            state[key] = {"etag": etag, "size": size}
+            result["downloaded"] += 1
+            if result["downloaded"] % STATE_SAVE_INTERVAL == 0:
+                cls.save_state(destination, prefix, state)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page in storage.list_object_pages(prefix, bucket_name=bucket_name):
+                    for obj in page:
+                        key, size = obj["Key"], obj["Size"]
+                        path = cls.local_path(destination, prefix, key)
+                        if path is None or key.endswith("/"):
+                            continue
+                        listed.add(key)
+
+                        known = state.get(key)
+                        if (
+                            known
+                            and known["etag"] == obj["ETag"].strip('"')
+                            and known["size"] == size
+                            and os.path.isfile(path)
+                            and os.path.getsize(path) == size
+                        ):
+                            result["unchanged"] += 1
+                            continue
+
+                        future = executor.submit(cls.download, storage, bucket_name, key, path)
+                        in_flight[future] = (key, size)
+                        if len(in_flight) >= workers * 2:
+                            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                record(future, *in_flight.pop(future))
+
+                for future in list(in_flight):
+                    record(future, *in_flight.pop(future))
+        finally:
+            cls.save_state(destination, prefix, state)
+
+        if delete:
+            for key in set(state) - listed:
+                path = cls.local_path(destination, prefix, key)
+                if path and os.path.exists(path):
+                    os.remove(path)
+                del state[key]
+                result["deleted"] += 1
+            cls.save_state(destination, prefix, state)
+
+        return result
@@ -0,0 +1,111 @@
+import logging
+
+from django.conf import settings
+from django.db.models.functions import Collate
+
+from s3_file_storage.constants import Discrepancy, StorageProvider
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.utils.s3 import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+class BucketReconcileService:
+    @staticmethod
+    def get_sorted_rows(prefix: str = "", bucket_name: str = None):
+        """
+        S3 file rows of a bucket under a prefix ordered like a bucket listing.
+
+        S3 lists keys by their UTF-8 bytes, ordering with the "C" collation gives the
+        same order in Postgres whatever the database collation is.
+
+        Args:
+            prefix (str): key prefix
+            bucket_name (str): define name of bucket
+
+        Returns:
+            QuerySet: values_list of (file_path, file_size, id, deleted)
+        """
+        return (
+            FileStorageModel.objects.filter(
+                FileStorageModel.bucket_filter(bucket_name),
+                storage_provider=StorageProvider.S3,
+                file_path__startswith=prefix,
+            )
+            .order_by(Collate("file_path", "C"))
+            .values_list("file_path", "file_size", "id", "deleted")
+        )
+
+    @staticmethod
+    def _iter_objects(storage: S3Client, prefix: str, bucket_name: str):
+        for page in storage.list_object_pages(prefix, bucket_name=bucket_name):
+            for obj in page:
+                # Folder markers have no row
+                if not obj["Key"].endswith("/"):
+                    yield obj
+
+    @classmethod
+    def reconcile(cls, prefix: str = "", bucket_name: str = None, chunk_size: int = None):
+        """
+        Compare the rows of the database with the objects of the bucket.
+
+        Both sides are streamed in key order (bucket listing pages and a server-side
+        cursor) and merged like a sort-merge join, so memory does not depend on the
+        number of keys and no HEAD request is sent per key.
+
+        Rows of soft deleted files are only used to not report their objects as
+        orphans, their objects may already be purged.
+
+        Args:
+            prefix (str): key prefix to reconcile
+            bucket_name (str): define name of bucket
+            chunk_size (int): rows fetched per cursor round trip
+
+        Returns:
+            Iterator[dict]: discrepancies with type, key and the sizes on each side
+        """
+        chunk_size = chunk_size or settings.FILE_EXPORT_CHUNK_SIZE
+        storage = S3Client(bucket_name)
+        if storage.client is None:
+            raise ValueError(storage.s3_client_init)
+
+        objects = cls._iter_objects(storage, prefix, bucket_name)
+        rows = cls.get_sorted_rows(prefix, bucket_name).iterator(chunk_size=chunk_size)
+
+        obj = next(objects, None)
+        row = next(rows, None)
+        while obj is not None or row is not None:
+            if row is None or (obj is not None and obj["Key"] < row[0]):
+                yield {
+                    "type": Discrepancy.ORPHAN_OBJECT,
+                    "key": obj["Key"],
+                    "s3_size": obj["Size"],
+                }
+                obj = next(objects, None)
+                continue
+
+            if obj is None or row[0] < obj["Key"]:
+                if not row[3]:
+                    yield {
+                        "type": Discrepancy.MISSING_OBJECT,
+                        "key": row[0],
+                        "id": str(row[2]),
+                        "db_size": row[1],
+                    }
+                row = next(rows, None)
+                continue
+
+            # Same key, several rows may point at the same object
+            key = obj["Key"]
+            while row is not None and row[0] == key:
+                file_path, file_size, row_id, deleted = row
+                if not deleted and file_size and str(file_size) != str(obj["Size"]):
+                    yield {
+                        "type": Discrepancy.SIZE_MISMATCH,
+                        "key": key,
+                        "id": str(row_id),
+                        "db_size": file_size,
+                        "s3_size": obj["Size"],
+                    }
+                row = next(rows, None)
+            obj = next(objects, None)
@@ -0,0 +1,247 @@
+import json
+import logging
+import mimetypes
+import os
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from s3_file_storage.constants import StorageClassify, StorageModule, UploadStatus
+from s3_file_storage.services.save_file_meta_service import SaveFileMetaService
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import build_object_key, get_bucket_name
+from s3_file_storage.utils.utils import unique_file_name_by_original
+
+logger = logging.getLogger(__name__)
+
+# Manifest line written once the rows of every upload listed above it are saved
+CHECKPOINT_KEY = "checkpoint"
+
+
+class BulkIngestService:
+    """
+    Upload a local directory tree to the bucket and register each file.
+
+    Every uploaded file is appended to an NDJSON manifest, and a checkpoint line
+    follows each saved chunk of rows. A run started again with the same manifest
+    skips the files it lists and saves the rows of the uploads after the last
+    checkpoint, nothing is uploaded twice.
+    """
+
+    @staticmethod
+    def iter_files(root: str, exclude: set = frozenset()):
+        """
+        Walk a directory tree without listing it whole first.
+
+        Args:
+            root (str): directory to walk
+            exclude (set): absolute paths to skip
+
+        Returns:
+            Iterator[tuple]: (absolute path, path relative to root, size)
+        """
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and entry.path not in exclude:
+                        yield (
+                            entry.path,
+                            os.path.relpath(entry.path, root),
+                            entry.stat(follow_symlinks=False).st_size,
+                        )
+
+    @staticmethod
+    def read_manifest(manifest_path: str):
+        """
+        Load the progress of an earlier run.
+
+        Args:
+            manifest_path (str): NDJSON manifest of the run
+
+        Returns:
+            tuple: (relative paths already uploaded, uploads whose rows may be unsaved)
+        """
+        done, unsaved = set(), []
+        if not os.path.exists(manifest_path):
+            return done, unsaved
+
+        with open(manifest_path) as manifest:
+            for line in manifest:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut by an interrupted write, that file is uploaded again
+                    continue
+                if CHECKPOINT_KEY in entry:
+                    unsaved = []
+                    continue
+                done.add(entry["path"])
+                unsaved.append(entry)
+        return done, unsaved
+
+    @staticmethod
+    def upload(storage: S3Client, bucket_name: str, path: str, key: str, size: int):
+        """
+        Upload one file, small ones with a single PUT and large ones multipart.
+
+        Returns:
+            dict: checksums, size and encoding returned by the upload, None on failure
+        """
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        try:
+            with open(path, "rb") as file_obj:
+                if size < settings.INGEST_MULTIPART_THRESHOLD:
+                    result = storage.upload_file(
+                        bucket_name, key, file_obj, content_type=content_type
+                    )
+                else:
+                    result = storage.save_file_in_bucket(
+                        bucket_name, key, file_obj, content_type=content_type
+                    )
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to ingest {path}: {e}")
+            return None
+        if result:
+            result["content_type"] = content_type
+        return result
+
+    @classmethod
+    def ingest(
+        cls,
+        root: str,
+        manifest_path: str,
+        module: str = StorageModule.GENERIC,
+        tenant: str = None,
+        bucket_name: str = None,
+        ref_type: str = None,
+        ref_id: str = None,
+        company_id: str = None,
+        workers: int = None,
+        chunk_size: int = None,
+    ) -> dict:
+        """
+        Upload every file under a directory and bulk create their rows.
+
+        At most twice ``workers`` uploads are in flight, so memory does not grow with
+        the number of files, and rows are saved ``chunk_size`` at a time.
+
+        Args:
+            root (str): directory to ingest
+            manifest_path (str): NDJSON manifest, resumes the run it belongs to
+            module (str): module of the object keys
+            tenant (str): tenant of the object keys (default: DEFAULT_TENANT)
+            bucket_name (str): define name of bucket
+            ref_type (str): reference type of the rows
+            ref_id (str): reference id of the rows
+            company_id (str): company of the rows
+            workers (int): number of concurrent uploads
+            chunk_size (int): rows saved per bulk_create
+
+        Returns:
+            dict: counts of uploaded, skipped and failed files and saved rows
+        """
+        root = os.path.abspath(root)
+        tenant = tenant or settings.DEFAULT_TENANT
+        bucket_name = bucket_name or get_bucket_name(tenant)
+        workers = workers or settings.INGEST_WORKERS
+        chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+        storage = S3Client(bucket_name)
+        result = {"uploaded": 0, "skipped": 0, "failed": 0, "saved": 0}
+
+        done, pending_rows = cls.read_manifest(manifest_path)
+
+        with open(manifest_path, "a") as manifest:
+            # End a line cut by an interruption, the next entry must start its own
+            if manifest.tell():
+                with open(manifest_path, "rb") as tail:
+                    tail.seek(-1, os.SEEK_END)
+                    if tail.read(1) != b"\n":
+                        manifest.write("\n")
+
+            def save_rows():
+                if not pending_rows:
+                    return
+                SaveFileMetaService.create_files_meta_ref_id(
+                    ref_type=ref_type,
+                    ref_id=ref_id,
+                    company_id=company_id,
+                    file_metadata_list=pending_rows,
+                    batch_size=chunk_size,
+                )
+                result["saved"] += len(pending_rows)
+                pending_rows.clear()
+                manifest.write(json.dumps({CHECKPOINT_KEY: result["saved"]}) + "\n")
+                manifest.flush()
+                os.fsync(manifest.fileno())
+
+            def record(future, entry, save=True):
+                upload = future.result()
+                if not upload:
+                    result["failed"] += 1
+                    return
+                entry.update(
+                    file_size=str(upload["size"]),
+                    content_type=upload["content_type"],
+                    checksum_sha256=upload["checksum_sha256"],
+                    checksum_crc32=upload["checksum_crc32"],
+                    content_encoding=upload["content_encoding"],
+                    original_file_size=upload["original_file_size"],
+                    upload_status=UploadStatus.COMPLETED,
+                )
+                manifest.write(json.dumps(entry) + "\n")
+                pending_rows.append(entry)
+                result["uploaded"] += 1
+                if save and len(pending_rows) >= chunk_size:
+                    save_rows()
+
+            # Uploads of an interrupted run whose rows were not saved yet
+            save_rows()
+
+            in_flight = {}
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    files = cls.iter_files(root, exclude={os.path.abspath(manifest_path)})
+                    for path, relative_path, size in files:
+                        if relative_path in done:
+                            result["skipped"] += 1
+                            continue
+
+                        file_name = unique_file_name_by_original(os.path.basename(path))
+                        key = build_object_key(
+                            StorageClassify.UPLOADED, tenant, module, file_name
+                        )
+                        entry = {
+                            "path": relative_path,
+                            "file_id": str(uuid.uuid4()),
+                            "file_key": key,
+                            "bucket_name": bucket_name,
+                            "file_name": file_name,
+                            "original_file_name": os.path.basename(path),
+                        }
+                        future = executor.submit(
+                            cls.upload, storage, bucket_name, path, key, size
+                        )
+                        in_flight[future] = entry
+
+                        if len(in_flight) >= workers * 2:
+                            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                record(future, in_flight.pop(future))
+
+                    for future in list(in_flight):
+                        record(future, in_flight.pop(future))
+            finally:
+                # Interrupted: the executor let the running uploads finish, list them
+                # in the manifest so the next run saves their rows instead of
+                # uploading them again
+                for future, entry in in_flight.items():
+                    if future.done() and not future.exception() and future.result():
+                        record(future, entry, save=False)
+
+            save_rows()
+        return result
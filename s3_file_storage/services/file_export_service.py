@@ -0,0 +1,121 @@
+import csv
+import io
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from s3_file_storage.constants import ExportFormat
+from s3_file_storage.models.file_storage_model import FileStorageModel
+
+EXPORT_FIELDS = [
+    "id",
+    "file_id",
+    "file_path",
+    "bucket_name",
+    "file_name",
+    "original_file_name",
+    "file_type",
+    "file_size",
+    "checksum_sha256",
+    "content_encoding",
+    "original_file_size",
+    "storage_provider",
+    "storage_class",
+    "upload_status",
+    "ref_type",
+    "ref_id",
+    "company_id",
+    "deleted",
+    "create_date",
+    "write_date",
+]
+
+
+class FileExportService:
+    @staticmethod
+    def get_queryset(
+        company_id: str = None,
+        ref_type: str = None,
+        ref_id: str = None,
+        date_from=None,
+        date_to=None,
+        include_deleted: bool = False,
+    ):
+        """
+        File metadata rows to export, as tuples in EXPORT_FIELDS order.
+
+        Args:
+            company_id (str): restrict to the files of a company
+            ref_type (str): restrict to a reference type
+            ref_id (str): restrict to a reference id
+            date_from (datetime): created at or after
+            date_to (datetime): created before
+            include_deleted (bool): also export soft deleted files
+
+        Returns:
+            QuerySet: values_list of EXPORT_FIELDS
+        """
+        queryset = FileStorageModel.objects.all()
+        if not include_deleted:
+            queryset = queryset.filter(deleted=False)
+        if company_id:
+            queryset = queryset.filter(company_id=company_id)
+        if ref_type:
+            queryset = queryset.filter(ref_type=ref_type)
+        if ref_id:
+            queryset = queryset.filter(ref_id=ref_id)
+        if date_from:
+            queryset = queryset.filter(create_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(create_date__lt=date_to)
+        return queryset.values_list(*EXPORT_FIELDS)
+
+    @classmethod
+    def stream(cls, queryset, export_format: str, chunk_size: int = None):
+        """
+        Yield the export as text chunks of about ``chunk_size`` rows.
+
+        Rows are read through a server-side cursor (``iterator``) so memory only ever
+        holds one chunk, whatever the size of the table.
+
+        Args:
+            queryset (QuerySet): rows returned by get_queryset
+            export_format (str): ExportFormat.NDJSON or ExportFormat.CSV
+            chunk_size (int): rows fetched from the cursor and yielded at once
+
+        Returns:
+            Iterator[str]: the export
+        """
+        chunk_size = chunk_size or settings.FILE_EXPORT_CHUNK_SIZE
+        rows = queryset.iterator(chunk_size=chunk_size)
+
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            format_row = writer.writerow
+        else:
+            buffer = io.StringIO()
+            encoder = DjangoJSONEncoder()
+
+            def format_row(row):
+                buffer.write(encoder.encode(dict(zip(EXPORT_FIELDS, row))))
+                buffer.write("\n")
+
+        count = 0
+        for row in rows:
+            format_row(row)
+            count += 1
+            if count % chunk_size == 0:
+                yield cls._drain(buffer)
+
+        chunk = cls._drain(buffer)
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
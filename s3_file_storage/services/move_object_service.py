@@ -1,4 +1,4 @@
-from wdg_file_storage.backends.s3 import S3Client
+from s3_file_storage.utils.s3 import S3Client
 
 class MoveObjectService:
     
@@ -19,7 +19,7 @@ class MoveObjectService:
         source_folder = source
         destination_folder = destination
 
-        storage = S3Client()
+        storage = S3Client(bucket)
         storage.copy_objects_and_delete_by_key(
             bucket, source_folder, destination_folder, keys_to_copy
         )
@@ -0,0 +1,181 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from s3_file_storage.constants import MoveJobStatus
+from s3_file_storage.models.file_access_stat_model import FileAccessStatModel
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.models.prefix_move_job_model import PrefixMoveJobModel
+from s3_file_storage.utils.object_cache import ObjectDiskCache
+from s3_file_storage.utils.s3 import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixMoveService:
+    @staticmethod
+    def get_or_create_job(
+        source_prefix: str, destination_prefix: str, bucket_name: str = None
+    ) -> PrefixMoveJobModel:
+        """
+        Return the unfinished job moving source to destination, or create one.
+
+        Args:
+            source_prefix (str): define from source folder
+            destination_prefix (str): define destination folder
+            bucket_name (str): define name of bucket
+
+        Returns:
+            PrefixMoveJobModel: the job to run or resume
+        """
+        if destination_prefix.startswith(source_prefix):
+            raise ValueError("Destination prefix can not be inside the source prefix.")
+
+        job = (
+            PrefixMoveJobModel.objects.filter(
+                source_prefix=source_prefix,
+                destination_prefix=destination_prefix,
+                bucket_name=bucket_name,
+            )
+            .exclude(status=MoveJobStatus.COMPLETED)
+            .order_by("create_date")
+            .first()
+        )
+        return job or PrefixMoveJobModel.objects.create(
+            source_prefix=source_prefix,
+            destination_prefix=destination_prefix,
+            bucket_name=bucket_name,
+        )
+
+    @classmethod
+    def run(cls, job: PrefixMoveJobModel, workers: int = None) -> PrefixMoveJobModel:
+        """
+        Move every object of the job's source prefix to its destination prefix.
+
+        Objects are listed in key order from the checkpoint, each listing page is
+        copied by parallel workers, the file_path of the matching rows and the keys of
+        their access stats are rewritten in the checkpoint's transaction, the sources
+        are removed with batched DeleteObjects and cached copies are moved to the new
+        keys. When a copy fails the checkpoint stops before it and the job is marked
+        failed, running it again resumes there. A resumed job first removes the
+        sources a stopped run left behind its checkpoint.
+
+        Args:
+            job (PrefixMoveJobModel): the job to run
+            workers (int): number of concurrent copies
+
+        Returns:
+            PrefixMoveJobModel: the updated job
+        """
+        workers = workers or settings.PREFIX_MOVE_WORKERS
+        storage = S3Client(job.bucket_name)
+
+        job.status = MoveJobStatus.RUNNING
+        job.error = None
+        job.save(update_fields=["status", "error", "write_date"])
+
+        if job.last_key:
+            cls._delete_moved_sources(storage, job)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for page in storage.list_object_pages(
+                job.source_prefix, bucket_name=job.bucket_name, start_after=job.last_key
+            ):
+                keys = [obj["Key"] for obj in page]
+                results = list(
+                    executor.map(
+                        lambda key: storage.copy_object(
+                            key, cls._destination_key(job, key), job.bucket_name
+                        ),
+                        keys,
+                    )
+                )
+
+                # Only the keys before the first failure are checkpointed
+                copied = []
+                for key, ok in zip(keys, results):
+                    if not ok:
+                        break
+                    copied.append(key)
+
+                if copied:
+                    cls._commit_moved_keys(storage, job, copied)
+
+                if len(copied) < len(keys):
+                    job.status = MoveJobStatus.FAILED
+                    job.error = f"Failed to copy {keys[len(copied)]}"
+                    job.save(update_fields=["status", "error", "write_date"])
+                    return job
+
+        job.status = MoveJobStatus.COMPLETED
+        job.save(update_fields=["status", "write_date"])
+        return job
+
+    @staticmethod
+    def _destination_key(job: PrefixMoveJobModel, key: str) -> str:
+        return f"{job.destination_prefix}{key[len(job.source_prefix):]}"
+
+    @staticmethod
+    def _destination_expression(job: PrefixMoveJobModel, field: str):
+        # SQL counterpart of _destination_key
+        return Concat(
+            Value(job.destination_prefix), Substr(field, len(job.source_prefix) + 1)
+        )
+
+    @classmethod
+    def _commit_moved_keys(cls, storage: S3Client, job: PrefixMoveJobModel, keys: list):
+        with transaction.atomic():
+            FileStorageModel.objects.filter(
+                FileStorageModel.bucket_filter(job.bucket_name), file_path__in=keys
+            ).update(file_path=cls._destination_expression(job, "file_path"))
+            # Stats of objects stored earlier at the destination keys are replaced
+            FileAccessStatModel.objects.filter(
+                file_key__in=[cls._destination_key(job, key) for key in keys]
+            ).delete()
+            FileAccessStatModel.objects.filter(file_key__in=keys).update(
+                file_key=cls._destination_expression(job, "file_key")
+            )
+            job.last_key = keys[-1]
+            job.moved_count += len(keys)
+            job.save(update_fields=["last_key", "moved_count", "write_date"])
+
+        # Sources are removed once the rows point at the copies, a crash before this
+        # leaves both copies and the next run removes them before resuming
+        cls._delete_sources(storage, job, keys)
+
+    @classmethod
+    def _delete_sources(cls, storage: S3Client, job: PrefixMoveJobModel, keys: list):
+        _, failed = storage.delete_objects_by_keys(keys, bucket_name=job.bucket_name)
+        if failed:
+            logger.error(f"Failed to delete {len(failed)} moved source objects.")
+
+        cache = ObjectDiskCache.get_instance()
+        if cache:
+            for key in keys:
+                cache.move(key, cls._destination_key(job, key), bucket_name=job.bucket_name)
+
+    @classmethod
+    def _delete_moved_sources(cls, storage: S3Client, job: PrefixMoveJobModel):
+        """
+        Remove the sources left at or before the checkpoint by a run that stopped
+        between its commit and the deletes. They are listed first since every older
+        source is gone, and only removed once their copy is confirmed.
+        """
+        leftovers = []
+        for page in storage.list_object_pages(job.source_prefix, bucket_name=job.bucket_name):
+            leftovers.extend(obj["Key"] for obj in page if obj["Key"] <= job.last_key)
+            if page[-1]["Key"] > job.last_key:
+                break
+        if not leftovers:
+            return
+
+        copies = storage.check_files_exist_in_bucket(
+            job.bucket_name, [cls._destination_key(job, key) for key in leftovers]
+        )
+        moved = [key for key in leftovers if copies[cls._destination_key(job, key)]]
+        if moved:
+            cls._delete_sources(storage, job, moved)
@@ -0,0 +1,135 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import get_bucket_name
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeDeletedFileService:
+    @staticmethod
+    def soft_delete_files(ids: list) -> int:
+        """
+        Mark file records as deleted with a single UPDATE, objects are purged later.
+
+        Args:
+            ids (list): the file storage ids to mark as deleted
+
+        Returns:
+            int: number of records marked as deleted
+        """
+        return FileStorageModel.objects.filter(id__in=ids, deleted=False).update(
+            deleted=True, write_date=timezone.now()
+        )
+
+    @classmethod
+    def purge_deleted_files(
+        cls,
+        batch_size: int = None,
+        max_retries: int = None,
+        keep_rows: bool = False,
+        bucket_name: str = None,
+    ) -> dict:
+        """
+        Remove the objects of soft deleted files from the bucket, then hard delete the rows.
+
+        Records are paged by id so a batch with failed keys does not block the next one.
+        Each object is deleted from the bucket its row was saved in, with one batched
+        delete per bucket. Failed keys are retried with backoff; rows whose object still
+        could not be deleted stay soft deleted and are picked up again on the next run.
+
+        Args:
+            batch_size (int): number of records handled per batch
+            max_retries (int): retries for keys that failed to delete
+            keep_rows (bool): archive the rows (clear file_path) instead of deleting them
+            bucket_name (str): only purge the files of this bucket (default: all)
+
+        Returns:
+            dict: counts of purged and failed records
+        """
+        batch_size = batch_size or settings.S3_PURGE_BATCH_SIZE
+        max_retries = (
+            settings.S3_PURGE_MAX_RETRIES if max_retries is None else max_retries
+        )
+
+        queryset = FileStorageModel.objects.filter(
+            deleted=True, file_path__isnull=False
+        ).exclude(file_path="")
+        if bucket_name:
+            queryset = queryset.filter(FileStorageModel.bucket_filter(bucket_name))
+        storages = {}
+
+        last_id = None
+        purged = failed = 0
+
+        while True:
+            batch = queryset.order_by("id")
+            if last_id is not None:
+                batch = batch.filter(id__gt=last_id)
+            rows = list(batch.values_list("id", "file_path", "bucket_name")[:batch_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            # Bucket -> object key -> ids, rows without bucket_name are in the default one
+            ids_by_key = {}
+            for row_id, key, row_bucket_name in rows:
+                ids_by_key.setdefault(row_bucket_name or get_bucket_name(), {}).setdefault(
+                    key, []
+                ).append(row_id)
+
+            purged_ids = []
+            for key_bucket_name, bucket_ids_by_key in ids_by_key.items():
+                if key_bucket_name not in storages:
+                    storages[key_bucket_name] = S3Client(key_bucket_name)
+                deleted_keys = cls._delete_keys_with_retry(
+                    storages[key_bucket_name],
+                    list(bucket_ids_by_key),
+                    max_retries,
+                    key_bucket_name,
+                )
+                purged_ids.extend(
+                    row_id for key in deleted_keys for row_id in bucket_ids_by_key[key]
+                )
+
+            with transaction.atomic():
+                purged_rows = FileStorageModel.objects.filter(id__in=purged_ids)
+                if keep_rows:
+                    purged_rows.update(file_path=None, write_date=timezone.now())
+                else:
+                    purged_rows.delete()
+
+            purged += len(purged_ids)
+            failed += len(rows) - len(purged_ids)
+
+        return {"purged": purged, "failed": failed}
+
+    @staticmethod
+    def _delete_keys_with_retry(
+        storage: S3Client, keys: list, max_retries: int, bucket_name: str = None
+    ) -> list:
+        deleted_keys = []
+        pending = keys
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                time.sleep(min(2**attempt * 0.1, 5))
+
+            deleted, errors = storage.delete_objects_by_keys(
+                pending, bucket_name=bucket_name
+            )
+            deleted_keys.extend(deleted)
+            pending = list(errors)
+            if not pending:
+                break
+
+        if pending:
+            logger.error(f"Failed to purge {len(pending)} objects: {pending[:10]}")
+
+        return deleted_keys
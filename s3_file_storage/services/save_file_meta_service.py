@@ -1,6 +1,28 @@
 from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+
 from s3_file_storage.models.file_storage_model import FileStorageModel
 
+# Metadata keys mapped to the model fields they are saved into. On a repeated
+# file_id only the fields whose key was supplied are refreshed, so a partial
+# re-save keeps the stored status, digests and encoding.
+FILE_META_FIELDS = {
+    "original_file_name": "original_file_name",
+    "file_name": "file_name",
+    "file_key": "file_path",
+    "bucket_name": "bucket_name",
+    "file_size": "file_size",
+    "content_type": "file_type",
+    "checksum_sha256": "checksum_sha256",
+    "checksum_crc32": "checksum_crc32",
+    "content_encoding": "content_encoding",
+    "original_file_size": "original_file_size",
+    "description": "description",
+    "upload_status": "upload_status",
+}
+
 
 class SaveFileMetaService:
     @classmethod
@@ -11,13 +33,19 @@ class SaveFileMetaService:
         user_id: str = None,
         company_id=None,
         file_metadata_list: list = [],
+        batch_size: int = None,
     ):
         """
         Bulk creates FileStorageModel instances from a list of file metadata.
 
+        Records are upserted on file_id, saving the same metadata again updates the
+        existing rows instead of creating duplicates. Only the fields a record supplies
+        are updated, missing or None values keep what is stored.
+
         Args:
             file_metadata_list (list): List of dictionaries containing file metadata.
                 Example: [{"name": "file1.txt", "file_path": "/path/file1.txt", "size": 1024}, ...]
+            batch_size (int): number of rows written per statement
 
         Returns:
             list: file_metadata_list
@@ -25,29 +53,49 @@ class SaveFileMetaService:
         if not file_metadata_list:
             raise ValueError("File metadata list cannot be empty.")
 
-        # Prepare model instances
-        file_instances = [
-            FileStorageModel(
+        # Reference fields given by the caller apply to every record
+        ref_fields = {
+            name: value
+            for name, value in (
+                ("ref_id", ref_id),
+                ("ref_type", ref_type),
+                ("company_id", company_id),
+            )
+            if value is not None
+        }
+
+        # Prepare model instances, grouped by the fields each record supplies
+        created_files = []
+        records_by_fields = {}
+        for file in file_metadata_list:
+            fields = {
+                field: file[key]
+                for key, field in FILE_META_FIELDS.items()
+                if file.get(key) is not None
+            }
+            fields.update(ref_fields)
+            record = FileStorageModel(
                 file_id=file.get("file_id"),
                 create_date=datetime.now(),
                 create_uid=user_id,
-                ref_id=ref_id,
-                ref_type=ref_type,
-                company_id=company_id,
-                original_file_name=file.get("original_file_name"),
-                file_name=file.get("file_name"),
-                file_path=file.get("file_key"),
-                file_size=file.get("file_size"),
-                file_type=file.get("content_type"),
-                description=file.get("description"),
+                **fields,
             )
-            # Mapping through file meta data list
-            for file in file_metadata_list
-        ]
+            created_files.append(record)
+            records_by_fields.setdefault(frozenset(fields), []).append(record)
+
+        batch_size = batch_size or settings.FILE_META_UPSERT_BATCH_SIZE
+
+        # Perform bulk upsert, an update only touches the fields it was given
+        with transaction.atomic():
+            for fields, records in records_by_fields.items():
+                FileStorageModel.objects.bulk_create(
+                    records,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=["file_id"],
+                    update_fields=sorted(fields | {"write_date"}),
+                )
 
-        # Perform bulk create
-        created_files = FileStorageModel.objects.bulk_create(file_instances)
-        
         # Convert to JSON-like structure
         created_files_json = [
             {
@@ -0,0 +1,167 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from s3_file_storage.constants import StorageClassify, StorageTier
+from s3_file_storage.models.file_access_stat_model import FileAccessStatModel
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.utils.s3 import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+class StorageTieringService:
+    @staticmethod
+    def get_cold_files(min_age_days: int, cold_days: int):
+        """
+        Files still in the standard class that are old enough and not read recently.
+
+        Args:
+            min_age_days (int): minimum age of the file in days
+            cold_days (int): days without any recorded access
+
+        Returns:
+            QuerySet: the candidate files
+        """
+        now = timezone.now()
+        recently_read = FileAccessStatModel.objects.filter(
+            file_key=OuterRef("file_path"),
+            last_access_date__gte=now - timedelta(days=cold_days),
+        )
+        return FileStorageModel.objects.filter(
+            storage_class=StorageTier.STANDARD,
+            deleted=False,
+            create_date__lt=now - timedelta(days=min_age_days),
+            file_path__startswith=f"{StorageClassify.UPLOADED}/",
+        ).exclude(Exists(recently_read))
+
+    @classmethod
+    def tier_cold_files(
+        cls,
+        storage_class: str = StorageTier.STANDARD_IA,
+        min_age_days: int = None,
+        cold_days: int = None,
+        batch_size: int = None,
+        workers: int = None,
+        bucket_name: str = None,
+    ) -> dict:
+        """
+        Move cold files to a cheaper storage class with copy-in-place.
+
+        Candidates are paged by id (keyset) so every batch is an index range scan,
+        the copies of a batch run concurrently and the rows that were moved are
+        updated with a single UPDATE.
+
+        Args:
+            storage_class (str): target storage class
+            min_age_days (int): minimum age of the file in days
+            cold_days (int): days without any recorded access
+            batch_size (int): number of files handled per batch
+            workers (int): number of concurrent copies
+            bucket_name (str): only tier the files of this bucket (default: all, each
+                file is moved in the bucket it was saved in)
+
+        Returns:
+            dict: counts of moved and failed files
+        """
+        min_age_days = min_age_days or settings.STORAGE_TIERING_MIN_AGE_DAYS
+        cold_days = cold_days or settings.STORAGE_TIERING_COLD_DAYS
+        batch_size = batch_size or settings.STORAGE_TIERING_BATCH_SIZE
+        workers = workers or settings.STORAGE_TIERING_WORKERS
+
+        candidates = cls.get_cold_files(min_age_days, cold_days).order_by("id")
+        if bucket_name:
+            candidates = candidates.filter(FileStorageModel.bucket_filter(bucket_name))
+
+        last_id = None
+        moved = failed = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = candidates
+                if last_id is not None:
+                    batch = batch.filter(id__gt=last_id)
+                rows = list(
+                    batch.values_list("id", "file_path", "bucket_name")[:batch_size]
+                )
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                results = executor.map(
+                    lambda row: S3Client(row[2]).change_storage_class(
+                        row[1], storage_class, bucket_name=row[2]
+                    ),
+                    rows,
+                )
+                moved_ids = [row[0] for row, ok in zip(rows, results) if ok]
+
+                FileStorageModel.objects.filter(id__in=moved_ids).update(
+                    storage_class=storage_class, write_date=timezone.now()
+                )
+                moved += len(moved_ids)
+                failed += len(rows) - len(moved_ids)
+
+        return {"moved": moved, "failed": failed}
+
+    @staticmethod
+    def restore_files(
+        ids: list,
+        days: int = 7,
+        retrieval_tier: str = "Standard",
+        workers: int = None,
+    ) -> dict:
+        """
+        Bring tiered files back to the standard storage class.
+
+        Files in an archive class (Glacier, Deep Archive) first need a restore request;
+        calling this again once the restore completed copies them back in place.
+
+        Args:
+            ids (list): the file storage ids to restore
+            days (int): days the temporary restored copy is kept
+            retrieval_tier (str): Expedited, Standard or Bulk
+            workers (int): number of concurrent requests
+
+        Returns:
+            dict: counts of restored, in-progress and failed files
+        """
+        workers = workers or settings.STORAGE_TIERING_WORKERS
+        rows = list(
+            FileStorageModel.objects.filter(id__in=ids)
+            .exclude(storage_class=StorageTier.STANDARD)
+            .values_list("id", "file_path", "storage_class", "bucket_name")
+        )
+
+        def restore(row):
+            _, file_key, storage_class, bucket_name = row
+            # Each file is restored in the bucket it was saved in
+            storage = S3Client(bucket_name)
+            if storage_class in StorageTier.ARCHIVED:
+                state = storage.restore_object(
+                    file_key, days=days, tier=retrieval_tier, bucket_name=bucket_name
+                )
+                if state != "completed":
+                    return state
+            moved = storage.change_storage_class(
+                file_key, StorageTier.STANDARD, bucket_name=bucket_name
+            )
+            return "restored" if moved else None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            states = list(executor.map(restore, rows))
+
+        restored_ids = [row[0] for row, state in zip(rows, states) if state == "restored"]
+        FileStorageModel.objects.filter(id__in=restored_ids).update(
+            storage_class=StorageTier.STANDARD, write_date=timezone.now()
+        )
+
+        return {
+            "restored": len(restored_ids),
+            "ongoing": states.count("ongoing"),
+            "failed": states.count(None),
+        }
@@ -0,0 +1,248 @@
+import logging
+import mimetypes
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_plus
+
+from django.conf import settings
+from django.utils import timezone
+
+from s3_file_storage.constants import StorageClassify, UploadStatus
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.models.upload_batch_model import UploadBatchModel
+from s3_file_storage.services.upload_validation_service import UploadValidationService
+from s3_file_storage.utils.key_index import KeyIndexRegistry
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import get_key_module
+from s3_file_storage.utils.utils import split_first_path
+
+logger = logging.getLogger(__name__)
+
+EVENT_TOKEN_HEADER = "X-Event-Token"
+OBJECT_CREATED_EVENT_PREFIX = "ObjectCreated:"
+
+
+class UploadEventService:
+    @staticmethod
+    def parse_object_created_records(records: list) -> dict:
+        """
+        Extract the created objects of S3 event notification records.
+
+        Args:
+            records (list): the "Records" of S3 (or MinIO) event notifications
+
+        Returns:
+            dict: bucket name -> {object key: size}
+        """
+        objects = defaultdict(dict)
+        for record in records:
+            if not str(record.get("eventName", "")).startswith(OBJECT_CREATED_EVENT_PREFIX):
+                continue
+            s3 = record.get("s3") or {}
+            bucket_name = (s3.get("bucket") or {}).get("name")
+            obj = s3.get("object") or {}
+            if not bucket_name or not obj.get("key"):
+                continue
+            # Keys are URL encoded in notifications, spaces as "+"
+            objects[bucket_name][unquote_plus(obj["key"])] = obj.get("size")
+        return objects
+
+    @staticmethod
+    def register_batch_uploads(bucket_name: str, objects: dict) -> list:
+        """
+        Create the pending rows of objects uploaded with a presigned POST policy.
+
+        A key belongs to the batch whose key_prefix it starts with. The file_id of a
+        row is derived from its batch and key, a redelivered event creates nothing.
+
+        Args:
+            bucket_name (str): define name of bucket
+            objects (dict): object key -> size of keys without a pending row
+
+        Returns:
+            list: the pending rows of the keys uploaded in a batch
+        """
+        prefixes = {
+            key[: index + 1]
+            for key in objects
+            for index, char in enumerate(key)
+            if char == "/"
+        }
+        batches = {
+            batch.key_prefix: batch
+            for batch in UploadBatchModel.objects.filter(
+                bucket_name=bucket_name, key_prefix__in=prefixes
+            )
+        }
+        if not batches:
+            return []
+
+        rows = []
+        for key, size in objects.items():
+            prefix = key[: key.rfind("/") + 1]
+            while prefix and prefix not in batches:
+                prefix = prefix[: prefix.rfind("/", 0, -1) + 1]
+            if not prefix:
+                continue
+            batch = batches[prefix]
+            file_name = key.rsplit("/", 1)[-1]
+            rows.append(
+                FileStorageModel(
+                    file_id=uuid.uuid5(batch.id, key),
+                    file_path=key,
+                    bucket_name=bucket_name,
+                    file_name=file_name,
+                    original_file_name=file_name,
+                    file_size=None if size is None else str(size),
+                    file_type=mimetypes.guess_type(file_name)[0],
+                    ref_type=batch.ref_type,
+                    ref_id=batch.ref_id,
+                    create_uid=batch.create_uid,
+                    upload_status=UploadStatus.PENDING,
+                )
+            )
+        if not rows:
+            return []
+
+        FileStorageModel.objects.bulk_create(rows, ignore_conflicts=True)
+        return list(
+            FileStorageModel.objects.filter(
+                file_id__in=[row.file_id for row in rows],
+                upload_status=UploadStatus.PENDING,
+            )
+        )
+
+    @classmethod
+    def ingest(cls, records: list, promote: bool = None) -> dict:
+        """
+        Complete the uploads announced by ObjectCreated event notifications.
+
+        The pending rows of all the keys of a batch are matched with one query, keys
+        without a row that were uploaded with a presigned POST policy get their rows
+        created from the batch. Uploads still under temps/ are validated against the
+        policy of their module and copied to uploaded/ first, then every accepted row
+        is flipped to completed (and repointed when moved) with one UPDATE, using the
+        size carried by the event so no HEAD request is needed. Rejected uploads are
+        quarantined and never show as completed.
+
+        Args:
+            records (list): the "Records" of S3 event notifications
+            promote (bool): promote the completed temps/ uploads (default: S3_EVENT_PROMOTE)
+
+        Returns:
+            dict: counts of completed, promoted and rejected files and unmatched keys
+        """
+        promote = settings.S3_EVENT_PROMOTE if promote is None else promote
+        result = {"completed": 0, "promoted": 0, "rejected": 0, "unmatched": 0}
+
+        for bucket_name, objects in cls.parse_object_created_records(records).items():
+            # Uploads made with presigned URLs never go through S3Client
+            KeyIndexRegistry.get_instance().record_write(bucket_name, list(objects))
+            rows = list(
+                FileStorageModel.objects.filter(
+                    FileStorageModel.bucket_filter(bucket_name),
+                    file_path__in=list(objects),
+                    upload_status=UploadStatus.PENDING,
+                )
+            )
+            matched_keys = {row.file_path.name for row in rows}
+            missing = {key: objects[key] for key in set(objects) - matched_keys}
+            if missing:
+                batch_rows = cls.register_batch_uploads(bucket_name, missing)
+                rows.extend(batch_rows)
+                result["unmatched"] += len(missing) - len(batch_rows)
+            if not rows:
+                continue
+
+            temps = [
+                row
+                for row in rows
+                if row.file_path.name.startswith(f"{StorageClassify.TEMPS}/")
+            ]
+            rejected_keys, moved_keys = set(), set()
+            if promote and temps:
+                rejected_keys, moved_keys = cls.promote(temps, bucket_name=bucket_name)
+
+            completed = [row for row in rows if row.file_path.name not in rejected_keys]
+            now = timezone.now()
+            for row in completed:
+                source_key = row.file_path.name
+                row.upload_status = UploadStatus.COMPLETED
+                if objects[source_key] is not None:
+                    row.file_size = str(objects[source_key])
+                if source_key in moved_keys:
+                    row.file_path = cls._uploaded_key(source_key)
+                row.write_date = now
+            FileStorageModel.objects.bulk_update(
+                completed, ["upload_status", "file_size", "file_path", "write_date"]
+            )
+
+            if moved_keys:
+                # Sources are removed once the rows point at the copies
+                _, failed = S3Client(bucket_name).delete_objects_by_keys(
+                    list(moved_keys), bucket_name=bucket_name
+                )
+                if failed:
+                    logger.error(f"Failed to delete {len(failed)} promoted temp objects.")
+
+            result["completed"] += len(completed)
+            result["promoted"] += len(moved_keys)
+            result["rejected"] += len(rejected_keys)
+
+        return result
+
+    @staticmethod
+    def _uploaded_key(key: str) -> str:
+        return f"{StorageClassify.UPLOADED}/{split_first_path(key)}"
+
+    @classmethod
+    def promote(cls, rows: list, bucket_name: str = None, workers: int = None):
+        """
+        Validate uploads under temps/ and copy the valid ones to uploaded/.
+
+        Each upload is checked against the policy of the module of its key, the
+        invalid ones are quarantined. Copies run concurrently, the rows are left
+        untouched for the caller to update and the sources to delete.
+
+        Args:
+            rows (list): FileStorageModel rows whose file_path is under temps/
+            bucket_name (str): define name of bucket
+            workers (int): number of concurrent copies
+
+        Returns:
+            tuple: (keys of the rejected files, keys of the files copied to uploaded/)
+        """
+        workers = workers or settings.FILE_VALIDATION_WORKERS
+        storage = S3Client(bucket_name)
+
+        files_by_module = defaultdict(list)
+        for row in rows:
+            files_by_module[get_key_module(row.file_path.name)].append(
+                {"file_key": row.file_path.name, "content_type": row.file_type}
+            )
+        rejected_keys = {
+            file["file_key"]
+            for module, files in files_by_module.items()
+            for file in UploadValidationService.validate_uploads(
+                files=files, module=module, bucket_name=bucket_name, workers=workers
+            )
+        }
+
+        keys = [row.file_path.name for row in rows if row.file_path.name not in rejected_keys]
+        if not keys:
+            return rejected_keys, set()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(keys)))) as executor:
+            results = list(
+                executor.map(
+                    lambda key: storage.copy_object(
+                        key, cls._uploaded_key(key), bucket_name=bucket_name
+                    ),
+                    keys,
+                )
+            )
+        failed = [key for key, ok in zip(keys, results) if not ok]
+        if failed:
+            # Completed in place, the object is valid but stays under temps/
+            logger.error(f"Failed to promote {len(failed)} uploads: {failed[:10]}")
+        return rejected_keys, {key for key, ok in zip(keys, results) if ok}
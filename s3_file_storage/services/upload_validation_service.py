@@ -0,0 +1,88 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from s3_file_storage.constants import StorageClassify, UploadStatus
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.utils import split_first_path
+from s3_file_storage.validators.content_validator import validate_file_content
+
+logger = logging.getLogger(__name__)
+
+
+class UploadValidationService:
+    @classmethod
+    def validate_uploads(
+        cls,
+        files: list,
+        module: str = None,
+        bucket_name: str = None,
+        workers: int = None,
+    ) -> list:
+        """
+        Check the real content of uploaded objects and quarantine the invalid ones.
+
+        Only the first FILE_VALIDATION_SNIFF_BYTES of each object are read with a
+        ranged GET, the cost does not depend on the file size. Invalid objects are
+        moved under the quarantine/ prefix and their rows marked quarantined.
+
+        Args:
+            files (list): dicts with the file_key and the declared content_type
+            module (str): module whose policy applies
+            bucket_name (str): define name of bucket
+            workers (int): number of concurrent reads
+
+        Returns:
+            list: the rejected files, dicts with file_key and reason
+        """
+        if not files:
+            return []
+
+        workers = workers or settings.FILE_VALIDATION_WORKERS
+        storage = S3Client(bucket_name)
+
+        def check(file):
+            result = storage.read_object_head(
+                file["file_key"],
+                settings.FILE_VALIDATION_SNIFF_BYTES,
+                bucket_name=bucket_name,
+            )
+            if result is None:
+                return False, "File was not uploaded."
+            head, size = result
+            _, error = validate_file_content(
+                head, size, declared_type=file.get("content_type"), module=module
+            )
+            return True, error
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            results = list(executor.map(check, files))
+
+        rejected = []
+        for file, (exists, error) in zip(files, results):
+            if not error:
+                continue
+            rejected.append({"file_key": file["file_key"], "reason": error})
+            if exists:
+                cls.quarantine(storage, file["file_key"], bucket_name=bucket_name)
+        return rejected
+
+    @staticmethod
+    def quarantine(storage: S3Client, file_key: str, bucket_name: str = None):
+        quarantine_key = f"{StorageClassify.QUARANTINE}/{split_first_path(file_key)}"
+        if not storage.copy_object(file_key, quarantine_key, bucket_name=bucket_name):
+            logger.error(f"Failed to quarantine {file_key}.")
+            return
+        storage.delete_file_from_bucket(file_key, bucket_name=bucket_name)
+
+        FileStorageModel.objects.filter(
+            FileStorageModel.bucket_filter(bucket_name), file_path=file_key
+        ).update(
+            file_path=quarantine_key,
+            upload_status=UploadStatus.QUARANTINED,
+            write_date=timezone.now(),
+        )
+        logger.warning(f"Quarantined {file_key} as {quarantine_key}.")
@@ -0,0 +1,10 @@
+from s3_file_storage.services.purge_deleted_file_service import PurgeDeletedFileService
+
+
+def purge_deleted_files(batch_size: int = None, keep_rows: bool = False):
+    """
+    Background job removing the objects of soft deleted files and their rows.
+    """
+    return PurgeDeletedFileService.purge_deleted_files(
+        batch_size=batch_size, keep_rows=keep_rows
+    )
@@ -1,3 +1,1444 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import json
+import re
+import shutil
+import tempfile
+import uuid
+from collections import Counter
+from unittest import mock, skipUnless
+from urllib.parse import quote_plus
 
-# Create your tests here.
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from s3_file_storage.constants import Discrepancy, MoveJobStatus, UploadStatus
+from s3_file_storage.management.commands.emit_object_created_events import (
+    Command as EmitObjectCreatedEventsCommand,
+)
+from s3_file_storage.models.file_access_stat_model import FileAccessStatModel
+from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.services.bucket_mirror_service import BucketMirrorService
+from s3_file_storage.services.bucket_reconcile_service import BucketReconcileService
+from s3_file_storage.services.bulk_ingest_service import BulkIngestService
+from s3_file_storage.services.prefix_move_service import PrefixMoveService
+from s3_file_storage.services.purge_deleted_file_service import PurgeDeletedFileService
+from s3_file_storage.services.save_file_meta_service import SaveFileMetaService
+from s3_file_storage.services.upload_event_service import UploadEventService
+from s3_file_storage.utils.access_tracker import AccessTracker
+from s3_file_storage.utils.compression import (
+    accepts_encoding,
+    compress_stream,
+    decompress_chunks,
+    get_content_encoding,
+    zstd_available,
+)
+from s3_file_storage.utils.idempotency import IDEMPOTENCY_HEADER, IdempotencyStore
+from s3_file_storage.utils.key_index import KeyIndexRegistry
+from s3_file_storage.utils.local_storage import LocalStorageClient
+from s3_file_storage.utils.object_cache import ObjectDiskCache
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_governor import S3ConcurrencyGovernor
+from s3_file_storage.validators.content_validator import (
+    OFFICE_OPEN_XML_PREFIX,
+    sniff_content_type,
+    validate_file_content,
+)
+from s3_file_storage.utils.s3_helpers import get_boto3_client
+
+OBJECT_BODY = b"%PDF-1.4 query budget"
+
+# Literals and IN lists are replaced so the same statement with other values matches
+SQL_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\bIN \((?:\?|%s)(?:, ?(?:\?|%s))*\)"), "IN (...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_sql(sql: str) -> str:
+    for pattern, replacement in SQL_NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fake_s3_api_call(client, operation_name, params):
+    """
+    Stand-in for botocore's API call, answers like an S3 bucket holding OBJECT_BODY.
+    """
+    if operation_name == "HeadObject":
+        return {
+            "ContentLength": len(OBJECT_BODY),
+            "ContentType": "application/pdf",
+            "ETag": '"query-budget"',
+        }
+    if operation_name == "GetObject":
+        return {
+            "Body": StreamingBody(io.BytesIO(OBJECT_BODY), len(OBJECT_BODY)),
+            "ContentLength": len(OBJECT_BODY),
+            "ContentType": "application/pdf",
+            "ETag": '"query-budget"',
+        }
+    if operation_name == "DeleteObjects":
+        return {"Deleted": [{"Key": obj["Key"]} for obj in params["Delete"]["Objects"]]}
+    return {}
+
+
+class FakeBucket:
+    """
+    In-memory bucket answering botocore's API calls, for the flows that list, read
+    and write objects. Patch ``BaseClient._make_api_call`` with ``api_call``.
+    """
+
+    def __init__(self, objects: dict = None):
+        self.objects = dict(objects or {})
+        self.calls = Counter()
+        self.requests = []
+        # key -> number of DeleteObjects calls that report it as failed
+        self.delete_errors = Counter()
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+    def head(self, key: str) -> dict:
+        body = self.objects[key]
+        return {
+            "ContentLength": len(body),
+            "ContentType": "application/octet-stream",
+            "ETag": self.etag(body),
+        }
+
+    def api_call(self, client, operation_name, params):
+        self.calls[operation_name] += 1
+        self.requests.append((operation_name, params))
+        key = params.get("Key")
+        if operation_name in ("HeadObject", "GetObject") and key not in self.objects:
+            code = "404" if operation_name == "HeadObject" else "NoSuchKey"
+            raise ClientError(
+                {"Error": {"Code": code, "Message": "Not Found"}}, operation_name
+            )
+
+        if operation_name == "HeadObject":
+            return self.head(key)
+        if operation_name == "GetObject":
+            response = self.head(key)
+            body = self.objects[key]
+            if params.get("Range"):
+                start, end = params["Range"].removeprefix("bytes=").split("-")
+                response["ContentRange"] = f"bytes {start}-{end}/{len(body)}"
+                body = body[int(start) : int(end) + 1 if end else None]
+            return dict(
+                response,
+                Body=StreamingBody(io.BytesIO(body), len(body)),
+                ContentLength=len(body),
+            )
+        if operation_name == "PutObject":
+            body = params["Body"]
+            body = body.read() if hasattr(body, "read") else bytes(body)
+            self.objects[key] = body
+            return {"ETag": self.etag(body)}
+        if operation_name == "CopyObject":
+            source = params["CopySource"]
+            if not isinstance(source, dict):
+                source = {"Key": source.split("/", 1)[1]}
+            source_key = source["Key"]
+            self.objects[key] = self.objects[source_key]
+            return {"CopyObjectResult": {"ETag": self.etag(self.objects[key])}}
+        if operation_name == "DeleteObject":
+            self.objects.pop(key, None)
+            return {}
+        if operation_name == "DeleteObjects":
+            keys = [obj["Key"] for obj in params["Delete"]["Objects"]]
+            failed = [failed_key for failed_key in keys if self.delete_errors[failed_key]]
+            self.delete_errors.subtract(failed)
+            deleted = [deleted_key for deleted_key in keys if deleted_key not in failed]
+            for deleted_key in deleted:
+                self.objects.pop(deleted_key, None)
+            return {
+                "Deleted": [{"Key": deleted_key} for deleted_key in deleted],
+                "Errors": [
+                    {"Key": failed_key, "Code": "InternalError"} for failed_key in failed
+                ],
+            }
+        if operation_name == "ListObjectsV2":
+            after = params.get("ContinuationToken") or params.get("StartAfter") or ""
+            keys = sorted(
+                listed_key
+                for listed_key in self.objects
+                if listed_key.startswith(params.get("Prefix", "")) and listed_key > after
+            )
+            max_keys = params.get("MaxKeys", 1000)
+            page, rest = keys[:max_keys], keys[max_keys:]
+            response = {
+                "Contents": [
+                    {
+                        "Key": listed_key,
+                        "Size": len(self.objects[listed_key]),
+                        "ETag": self.etag(self.objects[listed_key]),
+                    }
+                    for listed_key in page
+                ],
+                "IsTruncated": bool(rest),
+            }
+            if rest:
+                response["NextContinuationToken"] = page[-1]
+            return response
+        raise NotImplementedError(operation_name)
+
+
+FAKE_BUCKET_SETTINGS = dict(
+    S3_ENDPOINT_URL="s3.fake-bucket.test",
+    S3_STORAGE_BUCKET_NAME="fake-bucket",
+    S3_ACCESS_KEY_ID="fake-bucket",
+    S3_SECRET_ACCESS_KEY="fake-bucket",
+    S3_TENANT_BUCKETS={},
+    S3_BUCKET_ENDPOINTS={},
+    ACCESS_STATS_ENABLED=False,
+    OBJECT_CACHE_ENABLED=False,
+)
+
+
+class FakeBucketTestCase(APITestCase):
+    """
+    Test case whose S3 calls are answered by ``self.bucket``.
+    """
+
+    objects = {}
+
+    def setUp(self):
+        get_boto3_client.cache_clear()
+        self.addCleanup(get_boto3_client.cache_clear)
+        settings_override = override_settings(**FAKE_BUCKET_SETTINGS)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.bucket = FakeBucket(self.objects)
+        patcher = mock.patch(
+            "botocore.client.BaseClient._make_api_call",
+            autospec=True,
+            side_effect=self.bucket.api_call,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(
+    S3_ENDPOINT_URL="s3.query-budget.test",
+    S3_STORAGE_BUCKET_NAME="query-budget",
+    S3_ACCESS_KEY_ID="query-budget",
+    S3_SECRET_ACCESS_KEY="query-budget",
+    S3_TENANT_BUCKETS={},
+    S3_BUCKET_ENDPOINTS={},
+    ACCESS_STATS_ENABLED=False,
+    OBJECT_CACHE_ENABLED=False,
+)
+class EndpointQueryBudgetTest(APITestCase):
+    """
+    Every endpoint of s3_file_storage/urls.py must issue the same number of SQL
+    queries and S3 calls whether the table holds 1, 10 or 1000 rows.
+
+    S3 is replaced by a fake at botocore's API call level, so each call an endpoint
+    makes (HEAD, GET, DELETE, ...) is counted without a bucket. A failure lists the
+    statements that ran more often with more rows.
+
+    Not covered: file-storage/put-direct-upload (uploads a local file over HTTP).
+    """
+
+    ROW_COUNTS = (1, 10, 1000)
+    REF_TYPE = "query_budget"
+    REF_ID = "1"
+
+    def setUp(self):
+        get_boto3_client.cache_clear()
+        self.addCleanup(get_boto3_client.cache_clear)
+
+        patcher = mock.patch(
+            "botocore.client.BaseClient._make_api_call",
+            autospec=True,
+            side_effect=fake_s3_api_call,
+        )
+        self.s3_api_call = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client.force_authenticate(
+            user=User(id=1, username="query-budget"), token={"company_id": "1"}
+        )
+
+    def create_rows(self, count: int) -> list:
+        return FileStorageModel.objects.bulk_create(
+            FileStorageModel(
+                file_path=f"uploaded/public/generic/file_{index}.pdf",
+                file_name=f"file_{index}.pdf",
+                original_file_name=f"file {index}.pdf",
+                file_type="application/pdf",
+                file_size=str(len(OBJECT_BODY)),
+                description=f"query budget file {index}",
+                ref_type=self.REF_TYPE,
+                ref_id=self.REF_ID,
+                company_id="1",
+            )
+            for index in range(count)
+        )
+
+    def measure(self, send_request, rows: list):
+        self.s3_api_call.reset_mock()
+        with CaptureQueriesContext(connection) as queries:
+            response = send_request(rows)
+            # Streaming responses run their queries while being consumed
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+
+        self.assertLess(
+            response.status_code,
+            400,
+            f"Request failed with {response.status_code}: "
+            f"{getattr(response, 'data', None)}",
+        )
+        s3_calls = [call.args[1] for call in self.s3_api_call.call_args_list]
+        return [query["sql"] for query in queries.captured_queries], s3_calls
+
+    def assertConstantBudget(self, send_request):
+        """
+        Run the request against each row count and compare with the smallest one.
+        """
+        baseline = None
+        for count in self.ROW_COUNTS:
+            FileStorageModel.objects.all().delete()
+            rows = self.create_rows(count)
+            queries, s3_calls = self.measure(send_request, rows)
+
+            if baseline is None:
+                baseline = (count, queries, s3_calls)
+                continue
+
+            base_count, base_queries, base_s3_calls = baseline
+            if len(queries) != len(base_queries):
+                grown = Counter(map(normalize_sql, queries))
+                grown.subtract(Counter(map(normalize_sql, base_queries)))
+                offending = "\n".join(
+                    f"  +{extra} x {sql}" for sql, extra in grown.most_common() if extra > 0
+                )
+                self.fail(
+                    f"{len(base_queries)} SQL queries with {base_count} rows but "
+                    f"{len(queries)} with {count} rows, statements that grew:\n{offending}"
+                )
+            if len(s3_calls) != len(base_s3_calls):
+                grown = Counter(s3_calls)
+                grown.subtract(Counter(base_s3_calls))
+                offending = ", ".join(
+                    f"+{extra} x {name}" for name, extra in grown.most_common() if extra > 0
+                )
+                self.fail(
+                    f"{len(base_s3_calls)} S3 calls with {base_count} rows but "
+                    f"{len(s3_calls)} with {count} rows: {offending}"
+                )
+
+    def test_file_storage_list(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.get(
+                reverse("filestoragemodel-list"), {"page_size": len(rows)}
+            )
+        )
+
+    def test_file_storage_detail(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.get(
+                reverse("filestoragemodel-detail", args=[rows[0].id])
+            )
+        )
+
+    def test_file_storage_by_ref(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.get(
+                reverse("file_storage_by_ref"),
+                {"ref_type": self.REF_TYPE, "ref_id": self.REF_ID},
+            )
+        )
+
+    def test_file_storage_search(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Search uses PostgreSQL trigram and full-text lookups.")
+        self.assertConstantBudget(
+            lambda rows: self.client.get(
+                reverse("file_storage_search"), {"q": "budget", "page_size": 100}
+            )
+        )
+
+    def test_file_storage_export(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.get(
+                reverse("file_storage_export"),
+                {"export_format": "csv", "ref_type": self.REF_TYPE},
+            )
+        )
+
+    def test_file_storage_preview(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.generic(
+                "GET",
+                reverse("file_storage_preview"),
+                data=f'{{"id": "{rows[0].id}", "file_name": "{rows[0].file_name}"}}',
+                content_type="application/json",
+            )
+        )
+
+    def test_file_storage_delete(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.delete(
+                reverse("file_storage_delete"),
+                {"id": str(rows[0].id), "file_path": rows[0].file_path.name},
+                format="json",
+            )
+        )
+
+    def test_file_storage_batch_delete(self):
+        # Deleting every row must stay a fixed number of statements
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file_storage_batch_delete"),
+                {"ids": [str(row.id) for row in rows]},
+                format="json",
+            )
+        )
+
+    def test_file_storage_create(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file_storage_create"),
+                {
+                    "ref_type": self.REF_TYPE,
+                    "ref_id": self.REF_ID,
+                    "file_info": [
+                        {
+                            "original_file_name": "upload.pdf",
+                            "file_name": "upload.pdf",
+                            "file_size": len(OBJECT_BODY),
+                            "content_type": "application/pdf",
+                            "file_key": "temps/public/generic/upload.pdf",
+                        }
+                    ],
+                },
+                format="json",
+            )
+        )
+
+    def test_generate_upload_presigned_url(self):
+        files = [
+            {
+                "original_file_name": f"upload {index}.pdf",
+                "file_size": 1024,
+                "content_type": "application/pdf",
+            }
+            for index in range(3)
+        ]
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file_storage_generate_presigned_url"),
+                {
+                    "ref_type": self.REF_TYPE,
+                    "ref_id": self.REF_ID,
+                    "hr_employee": 1,
+                    "files": files,
+                },
+                format="json",
+            )
+        )
+
+    def test_generate_upload_presigned_post(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file_storage_generate_presigned_post"),
+                {"ref_type": self.REF_TYPE, "hr_employee": 1},
+                format="json",
+            )
+        )
+
+    def test_generate_download_presigned_url(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file_storage_generate_download_presigned_url"),
+                {"file_key": rows[0].file_path.name},
+                format="json",
+            )
+        )
+
+    def test_generate_delete_presigned_url(self):
+        self.assertConstantBudget(
+            lambda rows: self.client.post(
+                reverse("file-storage_generate_delete_presigned_url"),
+                {"file_key": rows[0].file_path.name},
+                format="json",
+            )
+        )
+
+    def test_local_file_serve(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with open(f"{media_root}/budget.pdf", "wb") as file_obj:
+            file_obj.write(OBJECT_BODY)
+
+        with override_settings(MEDIA_ROOT=media_root):
+            url = LocalStorageClient().generate_download_presigned_url("budget.pdf")
+            self.assertConstantBudget(lambda rows: self.client.get(url))
+
+
+class SaveFileMetaServiceTest(TestCase):
+    """
+    Saving metadata is an upsert on file_id that only touches the supplied fields.
+    """
+
+    def test_saving_the_same_file_id_twice_keeps_one_row(self):
+        file_id = uuid.uuid4()
+        file_meta = {
+            "file_id": file_id,
+            "original_file_name": "report.pdf",
+            "file_name": "report_1.pdf",
+            "file_key": "uploaded/public/generic/report_1.pdf",
+            "file_size": "10",
+            "content_type": "application/pdf",
+        }
+
+        SaveFileMetaService.create_files_meta_ref_id(
+            ref_type="report", ref_id="1", file_metadata_list=[dict(file_meta)]
+        )
+        SaveFileMetaService.create_files_meta_ref_id(
+            ref_type="report",
+            ref_id="1",
+            file_metadata_list=[dict(file_meta, file_size="20")],
+        )
+
+        row = FileStorageModel.objects.get(file_id=file_id)
+        self.assertEqual(FileStorageModel.objects.count(), 1)
+        self.assertEqual(row.file_size, "20")
+
+    def test_partial_resave_keeps_status_and_digests(self):
+        file_id = uuid.uuid4()
+        SaveFileMetaService.create_files_meta_ref_id(
+            ref_type="report",
+            ref_id="1",
+            company_id="7",
+            file_metadata_list=[
+                {
+                    "file_id": file_id,
+                    "file_name": "report_1.pdf",
+                    "file_key": "uploaded/public/generic/report_1.pdf",
+                    "checksum_sha256": "a" * 64,
+                    "checksum_crc32": "AAAAAA==",
+                    "content_encoding": "gzip",
+                    "original_file_size": 100,
+                    "upload_status": UploadStatus.COMPLETED,
+                }
+            ],
+        )
+
+        SaveFileMetaService.create_files_meta_ref_id(
+            file_metadata_list=[{"file_id": file_id, "description": "renamed"}]
+        )
+
+        row = FileStorageModel.objects.get(file_id=file_id)
+        self.assertEqual(row.description, "renamed")
+        self.assertEqual(row.upload_status, UploadStatus.COMPLETED)
+        self.assertEqual(row.checksum_sha256, "a" * 64)
+        self.assertEqual(row.checksum_crc32, "AAAAAA==")
+        self.assertEqual(row.content_encoding, "gzip")
+        self.assertEqual(row.original_file_size, 100)
+        self.assertEqual((row.ref_type, row.ref_id, row.company_id), ("report", "1", "7"))
+
+
+class FileStorageSearchScopeTest(APITestCase):
+    """
+    Search only returns the files of the caller's company, whatever the parameters.
+    """
+
+    def setUp(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("Search uses PostgreSQL trigram and full-text lookups.")
+        for company_id in ("1", "2"):
+            FileStorageModel.objects.create(
+                file_path=f"uploaded/public/generic/contract_{company_id}.pdf",
+                original_file_name=f"contract {company_id}.pdf",
+                description="signed contract",
+                company_id=company_id,
+            )
+
+    def test_search_is_scoped_to_the_callers_company(self):
+        self.client.force_authenticate(
+            user=User(id=1, username="search"), token={"company_id": "1"}
+        )
+
+        response = self.client.get(
+            reverse("file_storage_search"), {"q": "contract", "company_id": "2"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["original_file_name"] for row in response.data["results"]],
+            ["contract 1.pdf"],
+        )
+
+    def test_search_without_a_company_is_forbidden(self):
+        self.client.force_authenticate(user=User(id=1, username="search"))
+
+        response = self.client.get(reverse("file_storage_search"), {"q": "contract"})
+
+        self.assertEqual(response.status_code, 403)
+
+
+class FileStorageExportScopeTest(APITestCase):
+    """
+    Exports only contain the files of the caller's company.
+    """
+
+    def setUp(self):
+        for company_id in ("1", "2"):
+            FileStorageModel.objects.create(
+                file_path=f"uploaded/public/generic/invoice_{company_id}.pdf",
+                original_file_name=f"invoice {company_id}.pdf",
+                company_id=company_id,
+            )
+
+    def test_export_is_scoped_to_the_callers_company(self):
+        self.client.force_authenticate(
+            user=User(id=1, username="export"), token={"company_id": "1"}
+        )
+
+        response = self.client.get(
+            reverse("file_storage_export"),
+            {"export_format": "ndjson", "company_id": "2"},
+        )
+
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual([row["company_id"] for row in rows], ["1"])
+
+    def test_export_command_rejects_invalid_dates(self):
+        with self.assertRaises(CommandError):
+            call_command("export_file_meta", "--date-from", "yesterday")
+
+
+class AccessTrackerTest(APITestCase):
+    """
+    Reads are buffered in memory and only the keys of saved files are counted.
+    """
+
+    def setUp(self):
+        self.tracker = AccessTracker(flush_interval=0, max_keys=100)
+        patcher = mock.patch.object(
+            AccessTracker, "get_instance", return_value=self.tracker
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_record_does_not_write_on_the_request_path(self):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                AccessTracker.record_access("uploaded/public/generic/a.pdf")
+
+        self.assertEqual(len(queries), 0)
+        self.tracker.flush()
+        stat = FileAccessStatModel.objects.get(file_key="uploaded/public/generic/a.pdf")
+        self.assertEqual(stat.access_count, 3)
+
+    @override_settings(
+        S3_ENDPOINT_URL="s3.access-stats.test",
+        S3_STORAGE_BUCKET_NAME="access-stats",
+        S3_ACCESS_KEY_ID="access-stats",
+        S3_SECRET_ACCESS_KEY="access-stats",
+        S3_TENANT_BUCKETS={},
+        S3_BUCKET_ENDPOINTS={},
+    )
+    def test_download_presign_only_tracks_saved_files(self):
+        get_boto3_client.cache_clear()
+        self.addCleanup(get_boto3_client.cache_clear)
+        saved_key = "uploaded/public/generic/saved.pdf"
+        FileStorageModel.objects.create(file_path=saved_key)
+
+        for file_key in (saved_key, "uploaded/public/generic/unknown.pdf"):
+            response = self.client.post(
+                reverse("file_storage_generate_download_presigned_url"),
+                {"file_key": file_key},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+
+        self.tracker.flush()
+        self.assertEqual(
+            list(FileAccessStatModel.objects.values_list("file_key", flat=True)),
+            [saved_key],
+        )
+
+
+class PendingUploadEventsTest(FakeBucketTestCase):
+    """
+    emit_object_created_events --pending only reports pending rows whose object
+    exists, keys missing from the key index are answered without a HEAD.
+    """
+
+    objects = {"temps/public/generic/uploaded.pdf": OBJECT_BODY}
+
+    def setUp(self):
+        super().setUp()
+        for key in ("temps/public/generic/uploaded.pdf", "temps/public/generic/missing.pdf"):
+            FileStorageModel.objects.create(file_path=key)
+
+    def existing_pending_keys(self):
+        return list(EmitObjectCreatedEventsCommand.existing_pending_keys("fake-bucket", 100))
+
+    def test_only_existing_objects_are_reported(self):
+        self.assertEqual(self.existing_pending_keys(), ["temps/public/generic/uploaded.pdf"])
+        self.assertEqual(self.bucket.calls["HeadObject"], 2)
+
+    @override_settings(S3_KEY_INDEX_ENABLED=True, S3_KEY_INDEX_PREFIX="")
+    def test_key_index_skips_the_head_of_missing_keys(self):
+        registry = KeyIndexRegistry()
+        with mock.patch.object(KeyIndexRegistry, "get_instance", return_value=registry):
+            self.assertEqual(
+                self.existing_pending_keys(), ["temps/public/generic/uploaded.pdf"]
+            )
+        self.assertEqual(self.bucket.calls["HeadObject"], 1)
+
+
+class FileStorageCreateTest(FakeBucketTestCase):
+    """
+    The deprecated completion endpoint checks the real content of the uploads before
+    it registers and promotes them.
+    """
+
+    objects = {
+        "temps/public/generic/report.pdf": OBJECT_BODY,
+        "temps/public/generic/setup.pdf": b"MZ\x90\x00" + b"\x00" * 60,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(
+            user=User(id=1, username="create"), token={"company_id": "1"}
+        )
+
+    def create(self, file_key: str):
+        return self.client.post(
+            reverse("file_storage_create"),
+            {
+                "ref_type": "report",
+                "ref_id": "1",
+                "file_info": [
+                    {
+                        "original_file_name": "report.pdf",
+                        "file_name": file_key.rsplit("/", 1)[1],
+                        "file_size": 64,
+                        "content_type": "application/pdf",
+                        "file_key": file_key,
+                    }
+                ],
+            },
+            format="json",
+        )
+
+    def test_valid_upload_is_registered_and_promoted(self):
+        response = self.create("temps/public/generic/report.pdf")
+
+        self.assertEqual(response.status_code, 200, response.data)
+        row = FileStorageModel.objects.get()
+        self.assertEqual(row.file_path.name, "uploaded/public/generic/report.pdf")
+        self.assertEqual(row.upload_status, UploadStatus.COMPLETED)
+        self.assertEqual(row.company_id, "1")
+        self.assertIn("uploaded/public/generic/report.pdf", self.bucket.objects)
+        self.assertNotIn("temps/public/generic/report.pdf", self.bucket.objects)
+
+    def test_spoofed_content_is_rejected_and_quarantined(self):
+        response = self.create("temps/public/generic/setup.pdf")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["files"][0]["file_key"], "temps/public/generic/setup.pdf"
+        )
+        self.assertFalse(FileStorageModel.objects.exists())
+        self.assertIn("quarantine/public/generic/setup.pdf", self.bucket.objects)
+        self.assertNotIn("temps/public/generic/setup.pdf", self.bucket.objects)
+
+
+class PrefixMoveServiceTest(FakeBucketTestCase):
+    """
+    A prefix move carries the rows, access stats and cached copies over to the new
+    keys, and a resumed job removes the sources a stopped run left behind.
+    """
+
+    objects = {
+        f"uploaded/public/old/file_{index}.pdf": OBJECT_BODY for index in range(3)
+    }
+
+    def setUp(self):
+        super().setUp()
+        for key in self.objects:
+            FileStorageModel.objects.create(file_path=key)
+        FileAccessStatModel.objects.create(
+            file_key="uploaded/public/old/file_0.pdf", access_count=5
+        )
+        self.job = PrefixMoveService.get_or_create_job(
+            "uploaded/public/old/", "uploaded/public/new/"
+        )
+
+    def assertMoved(self):
+        moved_keys = [f"uploaded/public/new/file_{index}.pdf" for index in range(3)]
+        self.assertEqual(sorted(self.bucket.objects), moved_keys)
+        self.assertEqual(
+            sorted(FileStorageModel.objects.values_list("file_path", flat=True)),
+            moved_keys,
+        )
+
+    def test_rows_stats_and_cache_follow_the_move(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = ObjectDiskCache(cache_dir, max_bytes=1 << 20, max_object_bytes=1 << 20)
+        with override_settings(OBJECT_CACHE_PREFIXES=["uploaded/"]):
+            cache.fetch("uploaded/public/old/file_0.pdf")
+
+            with mock.patch.object(ObjectDiskCache, "get_instance", return_value=cache):
+                job = PrefixMoveService.run(self.job, workers=2)
+
+        self.assertEqual(job.status, MoveJobStatus.COMPLETED)
+        self.assertMoved()
+        stat = FileAccessStatModel.objects.get()
+        self.assertEqual(
+            (stat.file_key, stat.access_count), ("uploaded/public/new/file_0.pdf", 5)
+        )
+        self.assertIsNone(cache.get("uploaded/public/old/file_0.pdf"))
+        with open(cache.get("uploaded/public/new/file_0.pdf"), "rb") as cached:
+            self.assertEqual(cached.read(), OBJECT_BODY)
+
+    def test_resume_removes_sources_left_behind_the_checkpoint(self):
+        # A run committed the first key, then stopped before deleting its source
+        with mock.patch.object(PrefixMoveService, "_delete_sources"):
+            storage = S3Client()
+            storage.copy_object(
+                "uploaded/public/old/file_0.pdf", "uploaded/public/new/file_0.pdf"
+            )
+            PrefixMoveService._commit_moved_keys(
+                storage, self.job, ["uploaded/public/old/file_0.pdf"]
+            )
+        self.assertIn("uploaded/public/old/file_0.pdf", self.bucket.objects)
+
+        job = PrefixMoveService.run(self.job, workers=2)
+
+        self.assertEqual(job.status, MoveJobStatus.COMPLETED)
+        self.assertEqual(job.moved_count, 3)
+        self.assertMoved()
+
+
+class PurgeDeletedFileServiceTest(FakeBucketTestCase):
+    """
+    Soft deleted files are purged from the bucket they were saved in, failed keys are
+    retried and their rows kept for the next run.
+    """
+
+    objects = {
+        "uploaded/public/generic/default.pdf": OBJECT_BODY,
+        "uploaded/public/generic/tenant.pdf": OBJECT_BODY,
+        "uploaded/public/generic/kept.pdf": OBJECT_BODY,
+    }
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("s3_file_storage.services.purge_deleted_file_service.time.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.default_row = FileStorageModel.objects.create(
+            file_path="uploaded/public/generic/default.pdf"
+        )
+        self.tenant_row = FileStorageModel.objects.create(
+            file_path="uploaded/public/generic/tenant.pdf", bucket_name="tenant-bucket"
+        )
+        self.kept_row = FileStorageModel.objects.create(
+            file_path="uploaded/public/generic/kept.pdf"
+        )
+        PurgeDeletedFileService.soft_delete_files([self.default_row.id, self.tenant_row.id])
+
+    def deleted_keys_by_bucket(self):
+        deleted = {}
+        for operation_name, params in self.bucket.requests:
+            if operation_name == "DeleteObjects":
+                deleted.setdefault(params["Bucket"], []).extend(
+                    obj["Key"] for obj in params["Delete"]["Objects"]
+                )
+        return deleted
+
+    def test_each_file_is_purged_from_its_bucket(self):
+        result = PurgeDeletedFileService.purge_deleted_files()
+
+        self.assertEqual(result, {"purged": 2, "failed": 0})
+        self.assertEqual(
+            self.deleted_keys_by_bucket(),
+            {
+                "fake-bucket": ["uploaded/public/generic/default.pdf"],
+                "tenant-bucket": ["uploaded/public/generic/tenant.pdf"],
+            },
+        )
+        self.assertEqual(list(FileStorageModel.objects.all()), [self.kept_row])
+        self.assertIn("uploaded/public/generic/kept.pdf", self.bucket.objects)
+
+    def test_failed_keys_are_retried(self):
+        self.bucket.delete_errors["uploaded/public/generic/default.pdf"] = 2
+
+        result = PurgeDeletedFileService.purge_deleted_files(max_retries=2)
+
+        self.assertEqual(result, {"purged": 2, "failed": 0})
+        self.assertEqual(self.bucket.calls["DeleteObjects"], 4)
+
+    def test_rows_whose_object_was_not_deleted_are_kept(self):
+        self.bucket.delete_errors["uploaded/public/generic/default.pdf"] = 5
+
+        result = PurgeDeletedFileService.purge_deleted_files(max_retries=1)
+
+        self.assertEqual(result, {"purged": 1, "failed": 1})
+        self.assertTrue(
+            FileStorageModel.objects.filter(id=self.default_row.id, deleted=True).exists()
+        )
+        self.assertFalse(FileStorageModel.objects.filter(id=self.tenant_row.id).exists())
+
+
+class S3ConcurrencyGovernorTest(SimpleTestCase):
+    """
+    The in-flight cap halves on throttling, once per cooldown, and grows back by one
+    per ``limit`` successful calls.
+    """
+
+    def setUp(self):
+        self.governor = S3ConcurrencyGovernor(max_limit=16, min_limit=2, cooldown=1.0)
+        patcher = mock.patch("s3_file_storage.utils.s3_governor.time.monotonic")
+        self.monotonic = patcher.start()
+        self.monotonic.return_value = 100.0
+        self.addCleanup(patcher.stop)
+
+    def test_throttle_halves_the_limit_once_per_cooldown(self):
+        self.governor.on_throttle()
+        self.governor.on_throttle()
+        self.assertEqual(self.governor.limit, 8)
+
+        self.monotonic.return_value = 101.5
+        self.governor.on_throttle()
+        self.assertEqual(self.governor.limit, 4)
+
+    def test_limit_never_drops_below_the_minimum(self):
+        for attempt in range(10):
+            self.monotonic.return_value = 100.0 + attempt * 2
+            self.governor.on_throttle()
+        self.assertEqual(self.governor.limit, 2)
+
+    def test_successes_raise_the_limit_by_one(self):
+        self.governor.on_throttle()
+        for _ in range(8):
+            self.governor.on_success()
+        self.assertEqual(self.governor.limit, 9)
+
+    def test_slow_down_responses_count_as_throttling(self):
+        self.governor._needs_retry(
+            response=(mock.Mock(status_code=503), {"Error": {"Code": "SlowDown"}})
+        )
+        self.assertEqual(self.governor.limit, 8)
+
+        self.monotonic.return_value = 102.0
+        self.governor._needs_retry(
+            response=(mock.Mock(status_code=404), {"Error": {"Code": "NoSuchKey"}})
+        )
+        self.assertEqual(self.governor.limit, 8)
+
+
+class PresignUploadIdempotencyTest(FakeBucketTestCase):
+    """
+    A presign-upload retried with the same Idempotency-Key replays the first
+    response, a different body is rejected and a retry racing the first is told
+    to wait.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def presign(self, file_size: int = 1024, key: str = "upload-1"):
+        return self.client.post(
+            reverse("file_storage_generate_presigned_url"),
+            {
+                "ref_type": "report",
+                "hr_employee": 1,
+                "files": [
+                    {
+                        "original_file_name": "report.pdf",
+                        "file_size": file_size,
+                        "content_type": "application/pdf",
+                    }
+                ],
+            },
+            format="json",
+            headers={IDEMPOTENCY_HEADER: key},
+        )
+
+    def test_retry_replays_the_first_response(self):
+        first = self.presign()
+        retry = self.presign()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(
+            retry.data["files"][0]["file_key"], first.data["files"][0]["file_key"]
+        )
+        self.assertEqual(FileStorageModel.objects.count(), 1)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.presign()
+
+        response = self.presign(file_size=2048)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(FileStorageModel.objects.count(), 1)
+
+    def test_retry_while_the_first_is_processed_conflicts(self):
+        IdempotencyStore.lock(f"presign-upload:{settings.DEFAULT_TENANT}", "upload-1")
+
+        response = self.presign()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(FileStorageModel.objects.exists())
+
+
+def object_created_record(key: str, size: int = None, event_name="ObjectCreated:Put"):
+    return {
+        "eventName": event_name,
+        "s3": {
+            "bucket": {"name": "fake-bucket"},
+            "object": {"key": quote_plus(key, safe="/"), "size": size},
+        },
+    }
+
+
+class UploadEventServiceTest(FakeBucketTestCase):
+    """
+    ObjectCreated events complete the pending rows of their keys, uploads under
+    temps/ are validated and promoted first.
+    """
+
+    objects = {
+        "temps/public/generic/my report.pdf": OBJECT_BODY,
+        "temps/public/generic/setup.pdf": b"MZ\x90\x00" + b"\x00" * 60,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.report = FileStorageModel.objects.create(
+            file_path="temps/public/generic/my report.pdf", file_type="application/pdf"
+        )
+
+    def test_events_complete_the_matching_pending_rows(self):
+        result = UploadEventService.ingest(
+            [
+                object_created_record("temps/public/generic/my report.pdf", size=22),
+                object_created_record("temps/public/generic/unknown.pdf", size=1),
+                object_created_record(
+                    "temps/public/generic/setup.pdf", event_name="ObjectRemoved:Delete"
+                ),
+            ],
+            promote=False,
+        )
+
+        self.assertEqual(
+            result, {"completed": 1, "promoted": 0, "rejected": 0, "unmatched": 1}
+        )
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.upload_status, UploadStatus.COMPLETED)
+        self.assertEqual(self.report.file_size, "22")
+
+    def test_promotion_moves_valid_uploads_and_quarantines_the_rest(self):
+        spoofed = FileStorageModel.objects.create(
+            file_path="temps/public/generic/setup.pdf", file_type="application/pdf"
+        )
+
+        result = UploadEventService.ingest(
+            [
+                object_created_record("temps/public/generic/my report.pdf"),
+                object_created_record("temps/public/generic/setup.pdf"),
+            ],
+            promote=True,
+        )
+
+        self.assertEqual(
+            result, {"completed": 1, "promoted": 1, "rejected": 1, "unmatched": 0}
+        )
+        self.report.refresh_from_db()
+        self.assertEqual(
+            self.report.file_path.name, "uploaded/public/generic/my report.pdf"
+        )
+        self.assertEqual(self.report.upload_status, UploadStatus.COMPLETED)
+        spoofed.refresh_from_db()
+        self.assertEqual(spoofed.upload_status, UploadStatus.QUARANTINED)
+        self.assertEqual(
+            sorted(self.bucket.objects),
+            [
+                "quarantine/public/generic/setup.pdf",
+                "uploaded/public/generic/my report.pdf",
+            ],
+        )
+
+
+class UploadBatchRegistrationTest(FakeBucketTestCase):
+    """
+    Uploads made with a presigned POST policy get their rows from the batch whose
+    prefix they were uploaded under, once even when the event is redelivered.
+    """
+
+    def test_batch_uploads_are_registered_from_their_events(self):
+        response = self.client.post(
+            reverse("file_storage_generate_presigned_post"),
+            {"ref_type": "report", "ref_id": 7, "hr_employee": 1},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        key_prefix = response.data["key_prefix"]
+        self.assertTrue(key_prefix.startswith("temps/"))
+        self.assertEqual(response.data["fields"]["key"], f"{key_prefix}${{filename}}")
+
+        records = [
+            object_created_record(f"{key_prefix}a.pdf", size=10),
+            object_created_record(f"{key_prefix}nested/b.png", size=20),
+            object_created_record("temps/public/generic/other/c.pdf", size=30),
+        ]
+        result = UploadEventService.ingest(records, promote=False)
+        UploadEventService.ingest(records, promote=False)
+
+        self.assertEqual(result["completed"], 2)
+        self.assertEqual(result["unmatched"], 1)
+        rows = FileStorageModel.objects.order_by("file_path")
+        self.assertEqual(
+            [(row.file_path.name, row.file_type, row.ref_type, row.ref_id) for row in rows],
+            [
+                (f"{key_prefix}a.pdf", "application/pdf", "report", "7"),
+                (f"{key_prefix}nested/b.png", "image/png", "report", "7"),
+            ],
+        )
+        self.assertTrue(
+            all(row.upload_status == UploadStatus.COMPLETED for row in rows)
+        )
+
+
+class BucketReconcileServiceTest(FakeBucketTestCase):
+    """
+    The merge join of the sorted rows and the bucket listing reports each
+    discrepancy once, in key order.
+    """
+
+    objects = {
+        "uploaded/A.pdf": b"12345",
+        "uploaded/b.pdf": OBJECT_BODY,
+        "uploaded/deleted.pdf": OBJECT_BODY,
+        "uploaded/orphan.pdf": OBJECT_BODY,
+        "uploaded/z_folder/": b"",
+    }
+
+    def test_discrepancies_are_reported_in_key_order(self):
+        for file_path, file_size, deleted in (
+            ("uploaded/A.pdf", "5", False),
+            ("uploaded/b.pdf", "1", False),
+            ("uploaded/deleted.pdf", "1", True),
+            ("uploaded/gone.pdf", "1", True),
+            ("uploaded/missing.pdf", "9", False),
+        ):
+            FileStorageModel.objects.create(
+                file_path=file_path, file_size=file_size, deleted=deleted
+            )
+        missing = FileStorageModel.objects.get(file_path="uploaded/missing.pdf")
+        mismatch = FileStorageModel.objects.get(file_path="uploaded/b.pdf")
+
+        discrepancies = list(
+            BucketReconcileService.reconcile(prefix="uploaded/", chunk_size=2)
+        )
+
+        self.assertEqual(
+            discrepancies,
+            [
+                {
+                    "type": Discrepancy.SIZE_MISMATCH,
+                    "key": "uploaded/b.pdf",
+                    "id": str(mismatch.id),
+                    "db_size": "1",
+                    "s3_size": len(OBJECT_BODY),
+                },
+                {
+                    "type": Discrepancy.MISSING_OBJECT,
+                    "key": "uploaded/missing.pdf",
+                    "id": str(missing.id),
+                    "db_size": "9",
+                },
+                {
+                    "type": Discrepancy.ORPHAN_OBJECT,
+                    "key": "uploaded/orphan.pdf",
+                    "s3_size": len(OBJECT_BODY),
+                },
+            ],
+        )
+        self.assertEqual(self.bucket.calls["HeadObject"], 0)
+
+
+class ContentValidatorTest(SimpleTestCase):
+    """
+    Uploads are checked by their magic bytes, not by the type the client declared.
+    """
+
+    def test_sniffing_recognises_signatures_and_text(self):
+        self.assertEqual(sniff_content_type(OBJECT_BODY), "application/pdf")
+        self.assertEqual(sniff_content_type(b"\x89PNG\r\n\x1a\n...."), "image/png")
+        self.assertEqual(
+            sniff_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "image/webp"
+        )
+        self.assertEqual(
+            sniff_content_type(b"MZ\x90\x00\x03\x00"), "application/x-msdownload"
+        )
+        # Short signatures also start ordinary text
+        self.assertEqual(sniff_content_type(b"MZ is a plain note"), "text/plain")
+        self.assertIsNone(sniff_content_type(b"\x00\x01\x02\x03binary"))
+
+    def test_declared_type_must_match_the_content(self):
+        self.assertIsNone(validate_file_content(OBJECT_BODY, 22, "application/pdf")[1])
+        self.assertIsNone(validate_file_content(b"a,b\n1,2\n", 8, "text/csv")[1])
+        self.assertIsNone(
+            validate_file_content(b"PK\x03\x04....", 8, f"{OFFICE_OPEN_XML_PREFIX}x")[1]
+        )
+        self.assertIsNotNone(
+            validate_file_content(b"\x89PNG\r\n\x1a\n", 8, "image/jpeg")[1]
+        )
+
+    @override_settings(
+        FILE_VALIDATION_POLICIES={
+            "generic": {"allowed_types": None, "max_size": 100},
+            "avatar": {"allowed_types": ["image/*"], "max_size": 100},
+        }
+    )
+    def test_module_policies_and_blocked_types(self):
+        self.assertIsNotNone(validate_file_content(b"MZ\x90\x00\x03\x00", 6)[1])
+        self.assertIsNotNone(validate_file_content(OBJECT_BODY, 22, module="avatar")[1])
+        self.assertIsNone(
+            validate_file_content(b"\x89PNG\r\n\x1a\n", 8, module="avatar")[1]
+        )
+        self.assertIsNotNone(validate_file_content(OBJECT_BODY, 101)[1])
+
+
+@override_settings(S3_COMPRESSION_ENABLED=True)
+class CompressionTest(FakeBucketTestCase):
+    """
+    Compressible uploads are stored compressed and served decompressed to clients
+    that do not accept their encoding.
+    """
+
+    TEXT = b"a,b,c\n" * 10000
+
+    def test_encoding_follows_the_longest_matching_prefix(self):
+        self.assertEqual(get_content_encoding("text/plain; charset=utf-8"), "gzip")
+        self.assertIsNone(get_content_encoding("application/pdf"))
+        with mock.patch(
+            "s3_file_storage.utils.compression.zstd_available", return_value=False
+        ):
+            self.assertEqual(get_content_encoding("text/csv"), "gzip")
+
+    def test_gzip_round_trip(self):
+        compressed, original_size = compress_stream(io.BytesIO(self.TEXT), "gzip", 4096)
+        with compressed:
+            chunks = iter(lambda: compressed.read(1000), b"")
+            self.assertEqual(b"".join(decompress_chunks(chunks, "gzip")), self.TEXT)
+        self.assertEqual(original_size, len(self.TEXT))
+
+    @skipUnless(zstd_available(), "zstandard is not installed.")
+    def test_zstd_round_trip(self):
+        compressed, _ = compress_stream(io.BytesIO(self.TEXT), "zstd", 4096)
+        with compressed:
+            chunks = iter(lambda: compressed.read(1000), b"")
+            self.assertEqual(b"".join(decompress_chunks(chunks, "zstd")), self.TEXT)
+
+    def test_accepts_encoding(self):
+        factory = RequestFactory()
+        for header, accepted in (
+            ("gzip, deflate, br", True),
+            ("br;q=1.0, gzip;q=0.5", True),
+            ("*", True),
+            ("gzip;q=0", False),
+            ("br", False),
+            (None, False),
+        ):
+            headers = {"Accept-Encoding": header} if header else {}
+            request = factory.get("/", headers=headers)
+            self.assertEqual(accepts_encoding(request, "gzip"), accepted, header)
+
+    def test_compressed_object_is_served_to_any_client(self):
+        key = "uploaded/public/generic/data.txt"
+        saved = S3Client().save_file_in_bucket(
+            "fake-bucket", key, io.BytesIO(self.TEXT), content_type="text/plain"
+        )
+        self.assertEqual(saved["content_encoding"], "gzip")
+        self.assertEqual(saved["original_file_size"], len(self.TEXT))
+        self.assertLess(len(self.bucket.objects[key]), len(self.TEXT))
+        row = FileStorageModel.objects.create(
+            file_path=key,
+            file_name="data.txt",
+            file_type="text/plain",
+            content_encoding=saved["content_encoding"],
+        )
+
+        def preview(headers=None):
+            response = self.client.generic(
+                "GET",
+                reverse("file_storage_preview"),
+                data=json.dumps({"id": str(row.id), "file_name": "data.txt"}),
+                content_type="application/json",
+                headers=headers,
+            )
+            return response, b"".join(response.streaming_content)
+
+        response, body = preview()
+        self.assertEqual(body, self.TEXT)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+        response, body = preview({"Accept-Encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(body, self.bucket.objects[key])
+
+
+class BulkIngestServiceTest(FakeBucketTestCase):
+    """
+    A run started again with the same manifest skips what it lists and saves the
+    rows of uploads made after its last checkpoint without uploading them again.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, "nested"))
+        for name in ("a.pdf", "b.pdf", "nested/c.pdf"):
+            with open(os.path.join(self.root, name), "wb") as file_obj:
+                file_obj.write(OBJECT_BODY)
+        self.manifest_path = os.path.join(self.root, "manifest.ndjson")
+
+    def ingest(self):
+        return BulkIngestService.ingest(
+            self.root, self.manifest_path, workers=2, chunk_size=2
+        )
+
+    def test_finished_run_is_not_repeated(self):
+        first = self.ingest()
+        second = self.ingest()
+
+        self.assertEqual(first, {"uploaded": 3, "skipped": 0, "failed": 0, "saved": 3})
+        self.assertEqual(second, {"uploaded": 0, "skipped": 3, "failed": 0, "saved": 0})
+        self.assertEqual(self.bucket.calls["PutObject"], 3)
+        self.assertEqual(
+            sorted(FileStorageModel.objects.values_list("original_file_name", flat=True)),
+            ["a.pdf", "b.pdf", "c.pdf"],
+        )
+        self.assertEqual(
+            FileStorageModel.objects.exclude(checksum_sha256=None).count(), 3
+        )
+
+    def write_manifest(self, *lines):
+        with open(self.manifest_path, "w") as manifest:
+            manifest.write("".join(lines))
+
+    def manifest_entry(self, path: str, key: str) -> str:
+        self.bucket.objects[key] = OBJECT_BODY
+        entry = {
+            "path": path,
+            "file_id": str(uuid.uuid4()),
+            "file_key": key,
+            "bucket_name": "fake-bucket",
+            "file_name": key.rsplit("/", 1)[1],
+            "original_file_name": os.path.basename(path),
+        }
+        return json.dumps(entry) + "\n"
+
+    def test_uploads_after_the_last_checkpoint_get_their_rows(self):
+        # A run uploaded a.pdf and stopped before its row was saved, its last line
+        # was cut by the interruption
+        key = "uploaded/public/generic/a_1.pdf"
+        self.write_manifest(self.manifest_entry("a.pdf", key), '{"path": "b.pd')
+
+        result = self.ingest()
+
+        self.assertEqual(result, {"uploaded": 2, "skipped": 1, "failed": 0, "saved": 3})
+        self.assertEqual(self.bucket.calls["PutObject"], 2)
+        self.assertTrue(FileStorageModel.objects.filter(file_path=key).exists())
+        self.assertEqual(FileStorageModel.objects.count(), 3)
+
+    def test_entries_appended_after_a_cut_line_are_kept(self):
+        self.write_manifest(
+            self.manifest_entry("a.pdf", "uploaded/public/generic/a_1.pdf"),
+            json.dumps({"checkpoint": 1}) + "\n",
+            '{"path": "b.pd',
+        )
+        self.ingest()
+
+        result = self.ingest()
+
+        self.assertEqual(result, {"uploaded": 0, "skipped": 3, "failed": 0, "saved": 0})
+
+
+class BucketMirrorServiceTest(FakeBucketTestCase):
+    """
+    Repeated mirror runs only download the objects that changed since the last one.
+    """
+
+    objects = {
+        "uploaded/public/a.pdf": OBJECT_BODY,
+        "uploaded/public/nested/b.pdf": OBJECT_BODY * 2,
+        "uploaded/public/folder/": b"",
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.destination = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.destination)
+
+    def mirror(self, **kwargs):
+        return BucketMirrorService.mirror(
+            "uploaded/public/", self.destination, workers=2, **kwargs
+        )
+
+    def read(self, relative_path: str) -> bytes:
+        with open(os.path.join(self.destination, relative_path), "rb") as file_obj:
+            return file_obj.read()
+
+    def test_unchanged_objects_are_skipped(self):
+        first = self.mirror()
+        gets = self.bucket.calls["GetObject"]
+        second = self.mirror()
+
+        self.assertEqual(first, {"downloaded": 2, "unchanged": 0, "failed": 0, "deleted": 0})
+        self.assertEqual(second, {"downloaded": 0, "unchanged": 2, "failed": 0, "deleted": 0})
+        self.assertEqual(self.bucket.calls["GetObject"], gets)
+        self.assertEqual(self.read("nested/b.pdf"), OBJECT_BODY * 2)
+
+    def test_changed_missing_and_removed_objects_are_synced(self):
+        self.mirror()
+        self.bucket.objects["uploaded/public/a.pdf"] = b"%PDF-1.4 changed"
+        os.remove(os.path.join(self.destination, "nested", "b.pdf"))
+        self.bucket.objects["uploaded/public/c.pdf"] = OBJECT_BODY
+        self.bucket.objects.pop("uploaded/public/folder/")
+        del self.bucket.objects["uploaded/public/nested/b.pdf"]
+
+        result = self.mirror(delete=True)
+
+        self.assertEqual(result, {"downloaded": 2, "unchanged": 0, "failed": 0, "deleted": 1})
+        self.assertEqual(self.read("a.pdf"), b"%PDF-1.4 changed")
+        self.assertEqual(self.read("c.pdf"), OBJECT_BODY)
+        self.assertFalse(os.path.exists(os.path.join(self.destination, "nested", "b.pdf")))
@@ -2,14 +2,20 @@ from django.urls import include, path
 from rest_framework import routers
 
 from s3_file_storage.views.file_storage_view import (
+    FileStorageBatchDeleteView,
     FileStorageByRefView,
     FileStorageCreateView,
     FileStorageDeleteView,
+    FileStorageExportView,
     FileStoragePreviewView,
+    FileStorageSearchView,
     FileStorageView,
     GenerateDeletePresignedUrlView,
     GenerateDownloadPresignedUrlView,
+    GenerateUploadPresignedPostView,
     GenerateUploadPresignedUrlView,
+    LocalFileServeView,
+    ObjectCreatedEventView,
     UploadFileByPreSignedURLView,
 )
 
@@ -23,6 +29,11 @@ urlpatterns = [
         GenerateUploadPresignedUrlView.as_view(),
         name="file_storage_generate_presigned_url",
     ),
+    path(
+        "file-storage/generate-upload-presigned-post",
+        GenerateUploadPresignedPostView.as_view(),
+        name="file_storage_generate_presigned_post",
+    ),
     path(
         "file-storage/generate-download-presigned-url",
         GenerateDownloadPresignedUrlView.as_view(),
@@ -33,6 +44,21 @@ urlpatterns = [
         GenerateDeletePresignedUrlView.as_view(),
         name="file-storage_generate_delete_presigned_url",
     ),
+    path(
+        "file-storage/local/<path:file_key>",
+        LocalFileServeView.as_view(),
+        name="file_storage_local_serve",
+    ),
+    path(
+        "file-storage/search",
+        FileStorageSearchView.as_view(),
+        name="file_storage_search",
+    ),
+    path(
+        "file-storage/export",
+        FileStorageExportView.as_view(),
+        name="file_storage_export",
+    ),
     path(
         "file-storage/by-ref",
         FileStorageByRefView.as_view(),
@@ -55,11 +81,21 @@ urlpatterns = [
         FileStorageDeleteView.as_view(),
         name="file_storage_delete",
     ),
+    path(
+        "file-storage/batch-delete",
+        FileStorageBatchDeleteView.as_view(),
+        name="file_storage_batch_delete",
+    ),
     path(
         "file-storage/put-direct-upload",
         UploadFileByPreSignedURLView.as_view(),
         name="file_storage_connection_upload",
     ),
+    path(
+        "file-storage/events/object-created",
+        ObjectCreatedEventView.as_view(),
+        name="file_storage_object_created_event",
+    ),
     
     path("", include(router.urls)),
     
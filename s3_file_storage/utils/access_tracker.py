@@ -0,0 +1,156 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from s3_file_storage.models.file_access_stat_model import FileAccessStatModel
+
+logger = logging.getLogger(__name__)
+
+UPSERT_BATCH_SIZE = 1000
+
+
+class AccessTracker:
+    """
+    In-process counter of file reads, flushed to ``file_access_stat`` in batches.
+
+    Hits are aggregated per object key in memory and written with one upsert per
+    flush interval instead of one UPDATE per read. Flushes run on a daemon thread,
+    a request only touches the buffer. When a flush fails the counts are
+    kept for the next attempt, but the buffer never holds more than
+    ``ACCESS_STATS_MAX_KEYS`` keys: hits for new keys are dropped once it is full.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, flush_interval: int, max_keys: int):
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self._buffer = {}
+        self._buffer_lock = threading.Lock()
+        self._dropped = 0
+        self._stopped = threading.Event()
+        self._flusher = None
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Return the process wide tracker, or None when tracking is disabled.
+        """
+        if not settings.ACCESS_STATS_ENABLED:
+            return None
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = cls(
+                        flush_interval=settings.ACCESS_STATS_FLUSH_INTERVAL,
+                        max_keys=settings.ACCESS_STATS_MAX_KEYS,
+                    )
+                    cls._instance.start()
+                    atexit.register(cls._instance.stop)
+        return cls._instance
+
+    def start(self):
+        """
+        Start the thread flushing the buffer every ``flush_interval`` seconds.
+        """
+        self._flusher = threading.Thread(
+            target=self._run, name="access-stats-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def stop(self):
+        """
+        Stop the flush thread and write what is left in the buffer.
+        """
+        self._stopped.set()
+        if self._flusher:
+            self._flusher.join(timeout=self.flush_interval)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                # The thread keeps its own connection, drop it when it is stale
+                close_old_connections()
+
+    @classmethod
+    def record_access(cls, file_key: str):
+        tracker = cls.get_instance()
+        if tracker and file_key:
+            tracker.record(file_key)
+
+    def record(self, file_key: str):
+        now = timezone.now()
+        with self._buffer_lock:
+            entry = self._buffer.get(file_key)
+            if entry:
+                entry[0] += 1
+                entry[1] = now
+            elif len(self._buffer) < self.max_keys:
+                self._buffer[file_key] = [1, now]
+            else:
+                self._dropped += 1
+
+    def flush(self):
+        """
+        Write the buffered counts with one upsert, re-buffering them on failure.
+        """
+        with self._buffer_lock:
+            pending, self._buffer = self._buffer, {}
+            dropped, self._dropped = self._dropped, 0
+
+        if dropped:
+            logger.warning(f"Access stats buffer full, dropped {dropped} hits.")
+        if not pending:
+            return
+
+        try:
+            self._upsert(pending)
+        except Exception as e:
+            logger.error(f"Failed to flush access stats: {e}")
+            self._restore(pending)
+
+    def _restore(self, pending: dict):
+        with self._buffer_lock:
+            for file_key, (count, last_access) in pending.items():
+                entry = self._buffer.get(file_key)
+                if entry:
+                    entry[0] += count
+                    entry[1] = max(entry[1], last_access)
+                elif len(self._buffer) < self.max_keys:
+                    self._buffer[file_key] = [count, last_access]
+                else:
+                    self._dropped += count
+
+    @staticmethod
+    def _upsert(pending: dict):
+        table = FileAccessStatModel._meta.db_table
+        rows = list(pending.items())
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                chunk = rows[start : start + UPSERT_BATCH_SIZE]
+                values = ", ".join(["(%s, %s, %s)"] * len(chunk))
+                params = [
+                    value
+                    for file_key, (count, last_access) in chunk
+                    for value in (file_key, count, last_access)
+                ]
+                cursor.execute(
+                    f"INSERT INTO {table} (file_key, access_count, last_access_date) "
+                    f"VALUES {values} "
+                    f"ON CONFLICT (file_key) DO UPDATE SET "
+                    f"access_count = {table}.access_count + EXCLUDED.access_count, "
+                    f"last_access_date = CASE "
+                    f"WHEN {table}.last_access_date IS NULL "
+                    f"OR EXCLUDED.last_access_date > {table}.last_access_date "
+                    f"THEN EXCLUDED.last_access_date ELSE {table}.last_access_date END",
+                    params,
+                )
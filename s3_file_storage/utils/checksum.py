@@ -0,0 +1,87 @@
+import base64
+import binascii
+import hashlib
+import io
+import zlib
+
+
+class ChecksumReader(io.RawIOBase):
+    """
+    Read-through wrapper computing SHA-256 and CRC32 of a stream as it is consumed.
+
+    The digests are updated by the same ``read`` calls that send the data, so an
+    upload never reads its source twice. Seeking back to the start (botocore does it
+    before sending and on retries) resets the digests.
+
+    :param fileobj: Readable binary file object or bytes
+    :param seekable: Report the stream as seekable. Managed multipart uploads read the
+        parts of a seekable stream concurrently, pass False there to keep reads in order.
+    """
+
+    def __init__(self, fileobj, seekable: bool = True):
+        if isinstance(fileobj, (bytes, bytearray, memoryview)):
+            fileobj = io.BytesIO(fileobj)
+        self._fileobj = fileobj
+        self._seekable = seekable and fileobj.seekable()
+        self._reset()
+
+    def _reset(self):
+        self._sha256 = hashlib.sha256()
+        self._crc32 = 0
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._seekable
+
+    def read(self, size=-1):
+        data = self._fileobj.read(size)
+        if data:
+            self._sha256.update(data)
+            self._crc32 = zlib.crc32(data, self._crc32)
+            self.size += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if not self._seekable:
+            raise io.UnsupportedOperation("seek")
+        position = self._fileobj.seek(offset, whence)
+        if position == 0:
+            self._reset()
+        return position
+
+    def tell(self):
+        return self._fileobj.tell()
+
+    @property
+    def sha256_hex(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def crc32_base64(self) -> str:
+        # S3 reports CRC32 checksums as the base64 of the big-endian 4 bytes
+        return base64.b64encode(self._crc32.to_bytes(4, "big")).decode()
+
+    def checksums(self) -> dict:
+        return {
+            "checksum_sha256": self.sha256_hex,
+            "checksum_crc32": self.crc32_base64,
+            "size": self.size,
+        }
+
+
+def sha256_hex_to_base64(checksum_sha256: str) -> str:
+    """
+    Convert a hex SHA-256 digest to the base64 form used by x-amz-checksum-sha256.
+    """
+    try:
+        return base64.b64encode(binascii.unhexlify(checksum_sha256)).decode()
+    except (binascii.Error, TypeError):
+        raise ValueError("Invalid SHA-256 checksum.")
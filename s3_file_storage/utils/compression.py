@@ -0,0 +1,130 @@
+import logging
+import tempfile
+import zlib
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+ZSTD = "zstd"
+# zlib window bits producing and reading the gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_content_encoding(content_type: str):
+    """
+    Return the encoding to store a content type with, None to store it as is.
+
+    The longest prefix of S3_COMPRESSION_TYPES matching the content type decides,
+    zstd falls back to gzip when the optional ``zstandard`` package is not installed.
+    """
+    if not settings.S3_COMPRESSION_ENABLED or not content_type:
+        return None
+
+    content_type = content_type.split(";")[0].strip().lower()
+    matches = [
+        prefix for prefix in settings.S3_COMPRESSION_TYPES if content_type.startswith(prefix)
+    ]
+    if not matches:
+        return None
+
+    encoding = settings.S3_COMPRESSION_TYPES[max(matches, key=len)]
+    if encoding == ZSTD and not zstd_available():
+        return GZIP
+    return encoding
+
+
+def _compressor(encoding: str):
+    if encoding == ZSTD:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=settings.S3_COMPRESSION_ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(settings.S3_COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+
+def _decompressor(encoding: str):
+    if encoding == ZSTD:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(GZIP_WBITS)
+
+
+def compress_stream(fileobj, encoding: str, chunk_size: int = 1024 * 1024):
+    """
+    Compress a readable stream chunk by chunk into a spooled temporary file.
+
+    Only one chunk of the source is in memory at a time, the output stays in memory
+    up to S3_COMPRESSION_SPOOL_BYTES and goes to disk past it.
+    :return: Tuple (compressed file positioned at its start, original size)
+    """
+    compressor = _compressor(encoding)
+    output = tempfile.SpooledTemporaryFile(max_size=settings.S3_COMPRESSION_SPOOL_BYTES)
+    original_size = 0
+
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        original_size += len(chunk)
+        output.write(compressor.compress(chunk))
+    output.write(compressor.flush())
+
+    output.seek(0)
+    return output, original_size
+
+
+def iter_file_chunks(file_obj, chunk_size: int = 1024 * 1024):
+    """
+    Iterate a file object by chunks and close it once consumed or abandoned.
+    """
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def decompress_chunks(chunks, encoding: str):
+    """
+    Decompress an iterable of compressed chunks on the fly.
+    """
+    decompressor = _decompressor(encoding)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    if encoding != ZSTD:
+        data = decompressor.flush()
+        if data:
+            yield data
+
+
+def accepts_encoding(request, encoding: str) -> bool:
+    """
+    Whether the Accept-Encoding header of a request allows a content encoding.
+    """
+    for value in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = value.strip().partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class IdempotencyStore:
+    """
+    Stores the first response of a request sent with an ``Idempotency-Key`` header
+    so a retry of it is answered from the cache instead of being processed again.
+
+    Entries are scoped (endpoint and tenant) and remember a fingerprint of the body,
+    reusing a key with a different body is rejected. While the first request is still
+    being processed its key is locked and concurrent retries are told to try again.
+    """
+
+    @staticmethod
+    def get_key(request):
+        """
+        Return the idempotency key of the request, None when the header is absent.
+        :raises ValueError: If the key is empty or too long.
+        """
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return None
+        key = key.strip()
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise ValueError(f"Invalid {IDEMPOTENCY_HEADER} header.")
+        return key
+
+    @staticmethod
+    def fingerprint(data) -> str:
+        payload = json.dumps(data, sort_keys=True, default=str).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+    @staticmethod
+    def _cache_key(scope: str, key: str) -> str:
+        # Hashed so any header value makes a valid cache key
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f"idempotency:{scope}:{digest}"
+
+    @classmethod
+    def get(cls, scope: str, key: str):
+        """
+        Return the stored ``{"fingerprint", "status", "data"}`` entry, or None.
+        """
+        return cache.get(cls._cache_key(scope, key))
+
+    @classmethod
+    def lock(cls, scope: str, key: str) -> bool:
+        """
+        Mark the key as being processed, False if another request already holds it.
+        """
+        return cache.add(
+            f"{cls._cache_key(scope, key)}:lock",
+            True,
+            timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+        )
+
+    @classmethod
+    def unlock(cls, scope: str, key: str):
+        cache.delete(f"{cls._cache_key(scope, key)}:lock")
+
+    @classmethod
+    def save(cls, scope: str, key: str, fingerprint: str, status_code: int, data):
+        cache.set(
+            cls._cache_key(scope, key),
+            {"fingerprint": fingerprint, "status": status_code, "data": data},
+            timeout=settings.IDEMPOTENCY_KEY_TTL,
+        )
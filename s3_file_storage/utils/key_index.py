@@ -0,0 +1,237 @@
+import bisect
+import hashlib
+import heapq
+import logging
+import math
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Key hashes sorted at once while building an index, bounds the Python ints alive
+SORT_RUN_SIZE = 1 << 20
+
+
+def key_hash(key: str) -> int:
+    """
+    64-bit hash of an object key, a collision only costs a HEAD.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit key hashes, the bit positions are derived from the two
+    halves of the hash (double hashing) so no key is hashed twice.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, hashed: int):
+        low, high = hashed & 0xFFFFFFFF, hashed >> 32
+        return ((low + i * high) % self.size for i in range(self.hash_count))
+
+    def add(self, hashed: int):
+        for position in self._positions(hashed):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hashed: int) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(hashed)
+        )
+
+
+class KeyExistenceIndex:
+    """
+    Compact in-memory index of the keys of a bucket under a prefix.
+
+    Built from a listing: the key hashes are kept as a sorted array of 8 bytes per
+    key plus a Bloom filter in front of it, about 9.2 bytes per key at 1% false
+    positives. ``might_exist`` False means the key was not in the bucket at the last
+    listing and was not written by this process since. True means it may exist and
+    must be confirmed with a HEAD.
+    """
+
+    def __init__(self, prefix: str, hashes: array, bloom: BloomFilter):
+        self.prefix = prefix
+        self.hashes = hashes
+        self.bloom = bloom
+        self.built_at = time.monotonic()
+        # Writes and deletes of this process after the listing
+        self.added = set()
+        self.removed = set()
+
+    @classmethod
+    def build(cls, pages, prefix: str = "", error_rate: float = 0.01):
+        """
+        The hashes are sorted in runs of SORT_RUN_SIZE kept as 8 byte arrays and
+        merged, the peak is about twice the final array plus one run.
+
+        Args:
+            pages (Iterable[list]): listing pages of {"Key", ...} dicts
+            prefix (str): prefix the listing covers
+            error_rate (float): false positive rate of the Bloom filter
+
+        Returns:
+            KeyExistenceIndex
+        """
+        runs, run = [], []
+        for page in pages:
+            run.extend(key_hash(obj["Key"]) for obj in page)
+            if len(run) >= SORT_RUN_SIZE:
+                run.sort()
+                runs.append(array("Q", run))
+                run = []
+        run.sort()
+        runs.append(array("Q", run))
+        del run
+
+        hashes = runs[0] if len(runs) == 1 else array("Q", heapq.merge(*runs))
+        del runs
+
+        bloom = BloomFilter(len(hashes), error_rate)
+        for hashed in hashes:
+            bloom.add(hashed)
+        return cls(prefix, hashes, bloom)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def covers(self, key: str) -> bool:
+        return key.startswith(self.prefix)
+
+    def add(self, key: str):
+        hashed = key_hash(key)
+        self.removed.discard(hashed)
+        self.added.add(hashed)
+
+    def discard(self, key: str):
+        hashed = key_hash(key)
+        self.added.discard(hashed)
+        self.removed.add(hashed)
+
+    def might_exist(self, key: str) -> bool:
+        hashed = key_hash(key)
+        if hashed in self.added:
+            return True
+        if hashed in self.removed or hashed not in self.bloom:
+            return False
+        position = bisect.bisect_left(self.hashes, hashed)
+        return position < len(self.hashes) and self.hashes[position] == hashed
+
+
+class KeyIndexRegistry:
+    """
+    Process wide existence indexes, one per bucket, enabled with S3_KEY_INDEX_ENABLED.
+
+    Indexes are built in a background thread, the first time a bucket is checked and
+    again once they are older than S3_KEY_INDEX_REFRESH, the current index keeps
+    answering meanwhile (without one every check goes to S3). Writes and deletes made
+    through S3Client during a build are replayed onto the new index before it is
+    swapped in. Objects written by others (presigned uploads) are only seen by the
+    next refresh, unless an ObjectCreated event reports them first, so its negatives
+    may be stale and only callers passing ``allow_stale`` consult it.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.indexes = {}
+        # bucket name -> changes made while its index is being rebuilt
+        self.building = {}
+        self._changes_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get(self, bucket_name: str):
+        """
+        Return the index of a bucket, None while it is not built yet.
+        """
+        if not settings.S3_KEY_INDEX_ENABLED:
+            return None
+
+        index = self.indexes.get(bucket_name)
+        if index is None or time.monotonic() - index.built_at > settings.S3_KEY_INDEX_REFRESH:
+            self.refresh(bucket_name)
+        return index
+
+    def refresh(self, bucket_name: str, wait: bool = False):
+        """
+        Rebuild the index of a bucket from a listing, unless a build is running.
+        """
+        with self._changes_lock:
+            if bucket_name in self.building:
+                return
+            self.building[bucket_name] = []
+
+        thread = threading.Thread(
+            target=self._build, args=(bucket_name,), name="s3-key-index", daemon=True
+        )
+        thread.start()
+        if wait:
+            thread.join()
+
+    def _build(self, bucket_name: str):
+        # Imported here, s3.py records its writes through this module
+        from s3_file_storage.utils.s3 import S3Client
+
+        prefix = settings.S3_KEY_INDEX_PREFIX
+        storage = S3Client(bucket_name)
+        try:
+            if storage.client is None:
+                # An empty listing would answer every key as missing
+                raise ValueError(storage.s3_client_init)
+            index = KeyExistenceIndex.build(
+                storage.list_object_pages(prefix, bucket_name=bucket_name),
+                prefix=prefix,
+                error_rate=settings.S3_KEY_INDEX_FALSE_POSITIVE_RATE,
+            )
+        except Exception as e:
+            logger.error(f"Failed to build the key index of {bucket_name}: {e}")
+            with self._changes_lock:
+                self.building.pop(bucket_name, None)
+            return
+
+        with self._changes_lock:
+            for exists, key in self.building.pop(bucket_name, []):
+                if exists:
+                    index.add(key)
+                else:
+                    index.discard(key)
+            self.indexes[bucket_name] = index
+        logger.info(f"Key index of {bucket_name} built with {len(index)} keys.")
+
+    def _record(self, bucket_name: str, keys, exists: bool):
+        if not settings.S3_KEY_INDEX_ENABLED:
+            return
+        with self._changes_lock:
+            index = self.indexes.get(bucket_name)
+            changes = self.building.get(bucket_name)
+            for key in keys:
+                if index is not None and exists:
+                    index.add(key)
+                elif index is not None:
+                    index.discard(key)
+                if changes is not None:
+                    changes.append((exists, key))
+
+    def record_write(self, bucket_name: str, keys: list):
+        self._record(bucket_name, keys, exists=True)
+
+    def record_delete(self, bucket_name: str, keys: list):
+        self._record(bucket_name, keys, exists=False)
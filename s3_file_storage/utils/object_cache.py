@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from botocore.exceptions import BotoCoreError
+from django.conf import settings
+
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import get_bucket_name
+
+logger = logging.getLogger(__name__)
+
+
+class ObjectDiskCache:
+    """
+    Byte-bounded read-through cache of S3 objects on local disk.
+
+    Entries live at ``<cache_dir>/<sha[:2]>/<sha>.<etag>`` where ``sha`` is the SHA-256
+    of the bucket and object key, so the disk itself is the index and is shared by every worker
+    process. An entry's mtime is refreshed on each hit and eviction removes the least
+    recently used entries once the cache grows over its byte budget.
+
+    Only keys under immutable prefixes (``uploaded/``) should be cached, entries are
+    never revalidated against the bucket.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir, max_bytes: int, max_object_bytes: int):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self._evict_lock = threading.Lock()
+        self._total_bytes = None
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Return the process wide cache, or None when the cache is disabled.
+        """
+        if not settings.OBJECT_CACHE_ENABLED:
+            return None
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = cls(
+                        cache_dir=settings.OBJECT_CACHE_DIR,
+                        max_bytes=settings.OBJECT_CACHE_MAX_BYTES,
+                        max_object_bytes=settings.OBJECT_CACHE_MAX_OBJECT_BYTES,
+                    )
+        return cls._instance
+
+    @staticmethod
+    def is_cacheable(file_key: str) -> bool:
+        return file_key.startswith(tuple(settings.OBJECT_CACHE_PREFIXES))
+
+    def _entry_prefix(self, file_key: str, bucket_name: str = None):
+        bucket_name = bucket_name or get_bucket_name()
+        digest = hashlib.sha256(f"{bucket_name}/{file_key}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2]), digest
+
+    def get(self, file_key: str, bucket_name: str = None):
+        """
+        Return the path of the cached object, or None on a miss.
+        """
+        directory, digest = self._entry_prefix(file_key, bucket_name)
+        try:
+            names = [
+                name
+                for name in os.listdir(directory)
+                if name.startswith(f"{digest}.") and not name.endswith(".tmp")
+            ]
+        except FileNotFoundError:
+            return None
+        if not names:
+            return None
+
+        path = os.path.join(directory, names[0])
+        try:
+            # Mark as recently used for the LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def move(self, file_key: str, new_file_key: str, bucket_name: str = None):
+        """
+        Re-key the cached copy of a moved object, dropped when the new key is not
+        cacheable.
+        """
+        path = self.get(file_key, bucket_name)
+        if not path:
+            return
+
+        try:
+            if not self.is_cacheable(new_file_key):
+                size = os.path.getsize(path)
+                os.remove(path)
+                with self._evict_lock:
+                    if self._total_bytes is not None:
+                        self._total_bytes -= size
+                return
+            directory, digest = self._entry_prefix(new_file_key, bucket_name)
+            os.makedirs(directory, exist_ok=True)
+            etag = os.path.basename(path).split(".", 1)[1]
+            os.replace(path, os.path.join(directory, f"{digest}.{etag}"))
+        except OSError as e:
+            logger.error(f"Failed to move cached object {file_key}: {e}")
+
+    def fetch(self, file_key: str, bucket_name=None):
+        """
+        Return the path of the cached object, downloading it on a miss.
+        Returns None when the object can not be cached.
+        """
+        path = self.get(file_key, bucket_name)
+        if path:
+            return path
+
+        directory, digest = self._entry_prefix(file_key, bucket_name)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            etag = S3Client(bucket_name).download(
+                file_key,
+                temp_path,
+                bucket_name=bucket_name,
+                max_size=self.max_object_bytes,
+            )
+            if not etag:
+                os.remove(temp_path)
+                return None
+
+            path = os.path.join(directory, f"{digest}.{etag}")
+            os.replace(temp_path, path)
+        except (OSError, BotoCoreError) as e:
+            # Connection errors and timeouts of a ranged GET, served uncached
+            logger.error(f"Failed to cache object {file_key}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+        self._add_bytes(os.path.getsize(path))
+        return path
+
+    def _add_bytes(self, size: int):
+        with self._evict_lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry[2] for entry in self._scan())
+            else:
+                self._total_bytes += size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for directory in os.scandir(self.cache_dir):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        # Re-scan so entries added by other worker processes are accounted for
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * 0.9
+
+        for _, path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        self._total_bytes = total
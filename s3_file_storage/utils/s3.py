@@ -1,6 +1,10 @@
-import boto3
 import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from botocore.exceptions import (
+    BotoCoreError,
     NoCredentialsError,
     ClientError,
     PartialCredentialsError,
@@ -8,10 +12,23 @@ from botocore.exceptions import (
 )
 from django.conf import settings
 
-from s3_file_storage.utils.s3_helpers import get_bucket_name
+from s3_file_storage.utils.checksum import ChecksumReader, sha256_hex_to_base64
+from s3_file_storage.utils.compression import (
+    compress_stream,
+    get_content_encoding,
+)
+from s3_file_storage.utils.key_index import KeyIndexRegistry
+from s3_file_storage.utils.s3_helpers import (
+    get_boto3_client,
+    get_bucket_endpoint,
+    get_bucket_name,
+)
 
 logger = logging.getLogger(__name__)
 
+# S3 DeleteObjects accepts at most 1000 keys per request
+DELETE_OBJECTS_MAX_KEYS = 1000
+
 
 class S3Client:
     """
@@ -26,15 +43,13 @@ class S3Client:
         and endpoint details.
     """
 
-    def __init__(self):
+    def __init__(self, bucket_name=None):
         self.s3_client_init = "S3 client is not initialized."
         self.client = None  # Initialize client as None
         try:
-            self.client = boto3.client(
-                service_name="s3",  # Specifies the AWS S3 service.
-                endpoint_url=f"https://{settings.S3_ENDPOINT_URL}",  # Custom endpoint for S3-compatible services.
-                aws_access_key_id=settings.S3_ACCESS_KEY_ID,  # Access key for authentication.
-                aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,  # Secret key for authentication.
+            # One cached client per endpoint, boto3 is only loaded by processes that talk to S3
+            self.client = get_boto3_client(
+                get_bucket_endpoint(bucket_name or get_bucket_name())
             )
         except (NoCredentialsError, PartialCredentialsError) as e:
             logger.error(f"Credentials error: {e}")
@@ -46,19 +61,64 @@ class S3Client:
             logger.error(f"An error occurred while initializing the S3 client: {e}")
             # Handle other exceptions, such as general network issues
 
-    def upload_file(self, bucket_name, file_name, file_data):
+    def upload_file(
+        self, bucket_name, file_name, file_data, content_type=None, compress=True
+    ):
         """
         Upload a file to the S3-compatible storage.
+
+        SHA-256 and CRC32 are computed while the body is streamed, S3 verifies the
+        CRC32 sent as trailing checksum and the one it reports back is compared too.
+        With S3_COMPRESSION_ENABLED compressible content types are stored gzip or zstd
+        encoded with Content-Encoding set, the checksums are then those of the
+        original bytes and S3 verifies the CRC32 of the stored ones.
+        :param content_type: Content type of the file, decides the compression
+        :param compress: Set False to store the bytes as they are
+        :return: Dict with checksum_sha256, checksum_crc32, size (stored bytes),
+            content_encoding and original_file_size (bytes before compression, None
+            when stored as is), None on failure
         """
         if self.client is None:
             logger.error(self.s3_client_init)
             return None
 
+        encoding = get_content_encoding(content_type) if compress else None
+        source = ChecksumReader(file_data)
+        params = {"Bucket": bucket_name, "Key": file_name, "ChecksumAlgorithm": "CRC32"}
+        if content_type:
+            params["ContentType"] = content_type
+        stored_size = None
+
         try:
-            self.client.put_object(Bucket=bucket_name, Key=file_name, Body=file_data)
-            logger.info(f"File {file_name} uploaded successfully to {bucket_name}.")
+            if encoding:
+                compressed, _ = compress_stream(source, encoding)
+                with compressed:
+                    stored_size = compressed.seek(0, os.SEEK_END)
+                    compressed.seek(0)
+                    response = self.client.put_object(
+                        Body=compressed, ContentEncoding=encoding, **params
+                    )
+            else:
+                response = self.client.put_object(Body=source, **params)
         except Exception as e:
             logger.error(f"Failed to upload file {file_name}: {e}")
+            return None
+
+        checksums = source.checksums()
+        stored_crc32 = response.get("ChecksumCRC32")
+        if encoding:
+            checksums["checksum_crc32"] = stored_crc32
+        elif stored_crc32 and stored_crc32 != checksums["checksum_crc32"]:
+            logger.error(f"Checksum mismatch for uploaded file {file_name}.")
+            return None
+
+        checksums["content_encoding"] = encoding
+        checksums["original_file_size"] = checksums["size"] if encoding else None
+        if encoding:
+            checksums["size"] = stored_size
+        KeyIndexRegistry.get_instance().record_write(bucket_name, [file_name])
+        logger.info(f"File {file_name} uploaded successfully to {bucket_name}.")
+        return checksums
 
     def generate_upload_presigned_url(
         self,
@@ -67,10 +127,14 @@ class S3Client:
         bucket_name=None,
         content_type=None,
         expiry: int = 3600,
+        checksum_sha256: str = None,
     ):
         """
         Generate a presigned URL for getting or uploading a file from S3.
         :param object_name: The key name for the file in the bucket.
+        :param checksum_sha256: Expected hex SHA-256 of the file. It is signed into the
+            URL, the upload must send it as x-amz-checksum-sha256 and S3 rejects a body
+            that does not match.
         :return: Presigned upload URL as a string.
         """
         if self.client is None:
@@ -80,14 +144,18 @@ class S3Client:
         try:
             bucket_name = bucket_name or get_bucket_name()
 
+            params = {
+                "Bucket": bucket_name,
+                "Key": file_key,
+                "ContentLength": file_size,
+                "ContentType": content_type,
+            }
+            if checksum_sha256:
+                params["ChecksumSHA256"] = sha256_hex_to_base64(checksum_sha256)
+
             url = self.client.generate_presigned_url(
                 ClientMethod="put_object",
-                Params={
-                    "Bucket": bucket_name,
-                    "Key": file_key,
-                    "ContentLength": file_size,
-                    "ContentType": content_type,
-                },
+                Params=params,
                 ExpiresIn=expiry,
             )
 
@@ -99,13 +167,60 @@ class S3Client:
             logger.error(f"Error generating presigned upload URL: {e}")
             raise ValueError("AWS credentials not configured properly.")
 
+    def generate_upload_presigned_post(
+        self,
+        key_prefix: str,
+        max_file_size: int,
+        content_type_prefix: str = "",
+        bucket_name=None,
+        expiry: int = 3600,
+    ):
+        """
+        Generate one presigned POST policy for uploading any number of files under a prefix.
+        The browser posts each file to the returned url with the returned fields, the
+        file name it sends replaces ``${filename}`` in the key.
+        :param key_prefix: Prefix every uploaded key must start with, ending with '/'.
+        :param max_file_size: Maximum size in bytes of each uploaded file.
+        :param content_type_prefix: Prefix the Content-Type must start with (e.g. "image/").
+        :return: Dict with the url and the form fields to send.
+        """
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return None
+
+        bucket_name = bucket_name or get_bucket_name()
+
+        try:
+            return self.client.generate_presigned_post(
+                Bucket=bucket_name,
+                Key=f"{key_prefix}${{filename}}",
+                # A key ending with ${filename} adds the starts-with $key condition
+                Conditions=[
+                    ["starts-with", "$Content-Type", content_type_prefix],
+                    ["content-length-range", 1, max_file_size],
+                ],
+                ExpiresIn=expiry,
+            )
+        except ClientError as e:
+            logger.error(f"Error generating presigned upload POST: {e}")
+            raise ValueError(f"Error generating presigned POST: {e}")
+
     def generate_download_presigned_url(
-        self, file_key: str, bucket_name=None, expiry: int = 3600
+        self,
+        file_key: str,
+        bucket_name=None,
+        expiry: int = 3600,
+        content_type: str = None,
+        content_encoding: str = None,
     ):
         """
         Generate a presigned URL to download a file from S3.
         :param file_key: Name of the file in the S3 bucket.
         :param expiry: Expiry time in seconds (default: 3600 seconds = 1 hour).
+        :param content_type: Content-Type the response is served with.
+        :param content_encoding: Content-Encoding the response is served with. Objects
+            stored compressed are served as stored, HTTP clients that honour the
+            header (browsers) decode them, other clients get the compressed bytes.
         :return: Presigned download URL as a string.
         """
 
@@ -115,13 +230,19 @@ class S3Client:
 
         bucket_name = bucket_name or get_bucket_name()
 
+        params = {
+            "Bucket": bucket_name or settings.S3_STORAGE_BUCKET_NAME,
+            "Key": file_key,
+        }
+        if content_type:
+            params["ResponseContentType"] = content_type
+        if content_encoding:
+            params["ResponseContentEncoding"] = content_encoding
+
         try:
             url = self.client.generate_presigned_url(
                 ClientMethod="get_object",
-                Params={
-                    "Bucket": bucket_name or settings.S3_STORAGE_BUCKET_NAME,
-                    "Key": file_key,
-                },
+                Params=params,
                 ExpiresIn=expiry,
             )
         except ClientError as e:
@@ -174,6 +295,7 @@ class S3Client:
         bucket_name = bucket_name or get_bucket_name()
         try:
             self.client.delete_object(Bucket=bucket_name, Key=file_name)
+            KeyIndexRegistry.get_instance().record_delete(bucket_name, [file_name])
             return True
         except ClientError as e:
             logger.error(f"Error deleting file from bucket: {e}")
@@ -182,6 +304,310 @@ class S3Client:
             logger.error(f"Endpoint connection error: {e}")
             return False
 
+    def delete_objects_by_keys(self, keys: list, bucket_name=None):
+        """
+        Delete many files from S3 bucket with batched DeleteObjects requests.
+        :param keys: List of object keys to delete
+        :param bucket_name: Name of the bucket
+        :return: Tuple of (deleted keys, dict of failed key -> error code)
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return [], {key: "ClientNotInitialized" for key in keys}
+
+        bucket_name = bucket_name or get_bucket_name()
+        deleted, failed = [], {}
+
+        for start in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+            chunk = keys[start : start + DELETE_OBJECTS_MAX_KEYS]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=bucket_name,
+                    Delete={
+                        "Objects": [{"Key": key} for key in chunk],
+                        "Quiet": True,
+                    },
+                )
+            except (ClientError, EndpointConnectionError) as e:
+                logger.error(f"Error deleting objects from bucket: {e}")
+                failed.update({key: "RequestFailed" for key in chunk})
+                continue
+
+            # Quiet mode only reports the keys that could not be deleted
+            errors = {
+                error["Key"]: error.get("Code")
+                for error in response.get("Errors", [])
+                if error.get("Code") != "NoSuchKey"
+            }
+            failed.update(errors)
+            deleted.extend(key for key in chunk if key not in errors)
+
+        KeyIndexRegistry.get_instance().record_delete(bucket_name, deleted)
+        return deleted, failed
+
+    def download(
+        self,
+        file_key: str,
+        destination,
+        bucket_name=None,
+        chunk_size: int = None,
+        max_concurrency: int = None,
+        max_size: int = None,
+    ):
+        """
+        Download an object with concurrent ranged GETs straight into its destination.
+
+        A file path is preallocated to the object size and memory mapped, every range
+        is read from the socket directly into its slice of the map (or of the given
+        buffer), so the data is never copied between buffers. All ranges are pinned to
+        the ETag of the first HEAD, an object replaced mid-download fails the download.
+        :param file_key: Name of the file in the S3 bucket.
+        :param destination: File path, or a writable buffer (bytearray, memoryview, mmap)
+            at least as large as the object.
+        :param bucket_name: Name of the bucket
+        :param chunk_size: Bytes per ranged GET (default: S3_DOWNLOAD_CHUNK_SIZE).
+        :param max_concurrency: Concurrent ranged GETs (default: S3_DOWNLOAD_CONCURRENCY).
+        :param max_size: Skip objects larger than this many bytes
+        :return: The object ETag, or None if it was not downloaded
+        """
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return None
+
+        bucket_name = bucket_name or get_bucket_name()
+        chunk_size = chunk_size or settings.S3_DOWNLOAD_CHUNK_SIZE
+        max_concurrency = max_concurrency or settings.S3_DOWNLOAD_CONCURRENCY
+
+        try:
+            head = self.client.head_object(Bucket=bucket_name, Key=file_key)
+        except ClientError as e:
+            logger.error(f"Error downloading file from bucket: {e}")
+            return None
+
+        size = head["ContentLength"]
+        etag = head["ETag"]
+        if max_size is not None and size > max_size:
+            return None
+
+        if not isinstance(destination, (str, os.PathLike)):
+            buffer = memoryview(destination).cast("B")
+            if len(buffer) < size:
+                raise ValueError(f"Buffer too small for {size} bytes.")
+            ok = self._download_ranges(
+                bucket_name, file_key, etag, buffer[:size], chunk_size, max_concurrency
+            )
+            return etag.strip('"') if ok else None
+
+        with open(destination, "wb+") as file_obj:
+            file_obj.truncate(size)
+            if size == 0:
+                return etag.strip('"')
+            with mmap.mmap(file_obj.fileno(), size) as mapped:
+                buffer = memoryview(mapped)
+                try:
+                    ok = self._download_ranges(
+                        bucket_name, file_key, etag, buffer, chunk_size, max_concurrency
+                    )
+                finally:
+                    buffer.release()
+
+        return etag.strip('"') if ok else None
+
+    def _download_ranges(
+        self, bucket_name, file_key, etag, buffer, chunk_size, max_concurrency
+    ) -> bool:
+        ranges = [
+            (start, min(start + chunk_size, len(buffer)))
+            for start in range(0, len(buffer), chunk_size)
+        ]
+
+        def fetch(byte_range):
+            start, end = byte_range
+            response = self.client.get_object(
+                Bucket=bucket_name,
+                Key=file_key,
+                Range=f"bytes={start}-{end - 1}",
+                IfMatch=etag,
+            )
+            body = response["Body"]
+            try:
+                view = buffer[start:end]
+                while len(view):
+                    read = body.readinto(view)
+                    if not read:
+                        raise ValueError(f"Range {start}-{end - 1} ended early.")
+                    view = view[read:]
+            finally:
+                body.close()
+
+        try:
+            if len(ranges) <= 1 or max_concurrency <= 1:
+                for byte_range in ranges:
+                    fetch(byte_range)
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=min(max_concurrency, len(ranges))
+                ) as executor:
+                    list(executor.map(fetch, ranges))
+        except (ClientError, ValueError) as e:
+            logger.error(f"Error downloading file {file_key} from bucket: {e}")
+            return False
+        return True
+
+    def read_object_head(self, file_key: str, length: int, bucket_name=None):
+        """
+        Read the first bytes of an object with a single ranged GET.
+        :param file_key: Name of the file in the S3 bucket.
+        :param length: Number of bytes to read
+        :param bucket_name: Name of the bucket
+        :return: Tuple (first bytes, total object size), None if the object can not be read
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return None
+
+        bucket_name = bucket_name or get_bucket_name()
+        try:
+            response = self.client.get_object(
+                Bucket=bucket_name, Key=file_key, Range=f"bytes=0-{length - 1}"
+            )
+        except ClientError as e:
+            # An empty object can not satisfy any range
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                return b"", 0
+            logger.error(f"Error reading file from bucket: {e}")
+            return None
+
+        body = response["Body"]
+        try:
+            head = body.read()
+        finally:
+            body.close()
+
+        # "bytes 0-4095/1234567", absent when the whole object was returned
+        content_range = response.get("ContentRange")
+        size = int(content_range.rsplit("/", 1)[1]) if content_range else len(head)
+        return head, size
+
+    def change_storage_class(
+        self, file_key: str, storage_class: str, bucket_name=None
+    ) -> bool:
+        """
+        Move an object to another storage class by copying it onto itself.
+        :param file_key: Name of the file in the S3 bucket.
+        :param storage_class: Target S3 storage class
+        :param bucket_name: Name of the bucket
+        :return: True if the storage class was changed, False if not
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return False
+
+        bucket_name = bucket_name or get_bucket_name()
+        try:
+            # Managed copy, switches to multipart copy for objects over 5 GB
+            self.client.copy(
+                CopySource={"Bucket": bucket_name, "Key": file_key},
+                Bucket=bucket_name,
+                Key=file_key,
+                ExtraArgs={"StorageClass": storage_class, "MetadataDirective": "COPY"},
+            )
+            return True
+        except ClientError as e:
+            logger.error(f"Error changing storage class of {file_key}: {e}")
+            return False
+
+    def restore_object(
+        self, file_key: str, days: int = 7, tier: str = "Standard", bucket_name=None
+    ):
+        """
+        Request a temporary restore of an archived object.
+        :param file_key: Name of the file in the S3 bucket.
+        :param days: Number of days the restored copy is kept
+        :param tier: Retrieval tier (Expedited, Standard or Bulk)
+        :param bucket_name: Name of the bucket
+        :return: "completed" when the restored copy is readable, "ongoing" while the
+            restore is in progress, None on error
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return None
+
+        bucket_name = bucket_name or get_bucket_name()
+        try:
+            head = self.client.head_object(Bucket=bucket_name, Key=file_key)
+            restore = head.get("Restore")
+            if restore:
+                return "ongoing" if 'ongoing-request="true"' in restore else "completed"
+
+            self.client.restore_object(
+                Bucket=bucket_name,
+                Key=file_key,
+                RestoreRequest={"Days": days, "GlacierJobParameters": {"Tier": tier}},
+            )
+            return "ongoing"
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "RestoreAlreadyInProgress":
+                return "ongoing"
+            logger.error(f"Error restoring {file_key}: {e}")
+            return None
+
+    def copy_object(
+        self, source_key: str, destination_key: str, bucket_name=None
+    ) -> bool:
+        """
+        Copy an object to another key of the same bucket.
+        :param source_key: Key of the object to copy
+        :param destination_key: Key of the copy
+        :param bucket_name: Name of the bucket
+        :return: True if the object was copied, False if not
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return False
+
+        bucket_name = bucket_name or get_bucket_name()
+        try:
+            # Managed copy, switches to multipart copy for objects over 5 GB
+            self.client.copy(
+                CopySource={"Bucket": bucket_name, "Key": source_key},
+                Bucket=bucket_name,
+                Key=destination_key,
+            )
+            KeyIndexRegistry.get_instance().record_write(bucket_name, [destination_key])
+            return True
+        except ClientError as e:
+            logger.error(f"Error copying {source_key} to {destination_key}: {e}")
+            return False
+
+    def list_object_pages(self, prefix: str, bucket_name=None, start_after=None):
+        """
+        Iterate the objects under a prefix in key order, one listing page at a time.
+        :param prefix: Key prefix to list
+        :param bucket_name: Name of the bucket
+        :param start_after: Only list keys after this one
+        :return: Generator of lists of {"Key", "Size", "ETag", ...} dicts
+        """
+
+        if self.client is None:
+            logger.error(self.s3_client_init)
+            return
+
+        bucket_name = bucket_name or get_bucket_name()
+        params = {"Bucket": bucket_name, "Prefix": prefix}
+        if start_after:
+            params["StartAfter"] = start_after
+
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(**params):
+            if page.get("Contents"):
+                yield page["Contents"]
+
     def check_file_exists_in_bucket(self, bucket_name, file_name) -> bool:
         """
         Check if a file exists in an S3 bucket.
@@ -204,21 +630,93 @@ class S3Client:
                 return False
             raise
 
-    def save_file_in_bucket(self, bucket_name, file_name, file_obj):
+    def check_files_exist_in_bucket(
+        self, bucket_name, file_names: list, workers: int = 16, allow_stale: bool = False
+    ) -> dict:
+        """
+        Check many files at once with concurrent HEADs.
+        :param bucket_name: Name of the bucket
+        :param file_names: Names of the files
+        :param workers: Number of concurrent HEAD requests
+        :param allow_stale: With S3_KEY_INDEX_ENABLED, answer the keys missing from
+            the in-memory key index without a request. Objects written by other
+            clients since the index was listed may then be reported missing.
+        :return: Dict of file name -> True if the file exists, False otherwise
+        """
+
+        bucket_name = bucket_name or get_bucket_name()
+        index = KeyIndexRegistry.get_instance().get(bucket_name) if allow_stale else None
+        result = {}
+        candidates = []
+        for file_name in file_names:
+            if index is not None and index.covers(file_name) and not index.might_exist(file_name):
+                result[file_name] = False
+            else:
+                candidates.append(file_name)
+
+        if candidates:
+            with ThreadPoolExecutor(max_workers=min(workers, len(candidates))) as executor:
+                exists = executor.map(
+                    lambda file_name: self.check_file_exists_in_bucket(bucket_name, file_name),
+                    candidates,
+                )
+                result.update(zip(candidates, exists))
+        return result
+
+    def save_file_in_bucket(
+        self, bucket_name, file_name, file_obj, content_type=None, compress=True
+    ):
         """
         Save a file in an S3 bucket.
         :param bucket_name: The name of the bucket
         :param file_name: The name of the file
         :param file_obj: The file object to save
-        :raises: Exception if the file already exists
+        :param content_type: Content type of the file, decides the compression
+        :param compress: Set False to store the bytes as they are
+        :return: Dict with checksum_sha256, checksum_crc32, size (stored bytes),
+            content_encoding and original_file_size (bytes before compression, None
+            when stored as is) of the saved file, checksums of the original bytes
+        :raises ValueError: If the upload failed
         """
+        # Loaded with the client, the transfer manager wraps part failures in it
+        from boto3.exceptions import S3UploadFailedError
+
+        if self.client is None:
+            raise ValueError(self.s3_client_init)
 
+        encoding = get_content_encoding(content_type) if compress else None
+        # Not seekable so the transfer manager reads the parts in order
+        body = ChecksumReader(file_obj, seekable=False)
+        extra_args = {"ContentType": content_type} if content_type else {}
+        stored_size = None
         try:
-            self.client.upload_fileobj(file_obj, bucket_name, file_name)
-        except ClientError as e:
-            logger.error(f"Error generating presigned URL for delete: {e}")
+            if encoding:
+                compressed, _ = compress_stream(body, encoding)
+                with compressed:
+                    stored_size = compressed.seek(0, os.SEEK_END)
+                    compressed.seek(0)
+                    self.client.upload_fileobj(
+                        compressed,
+                        bucket_name,
+                        file_name,
+                        ExtraArgs={**extra_args, "ContentEncoding": encoding},
+                    )
+            else:
+                self.client.upload_fileobj(
+                    body, bucket_name, file_name, ExtraArgs=extra_args or None
+                )
+        except (ClientError, BotoCoreError, S3UploadFailedError) as e:
+            logger.error(f"Failed to upload file {file_name}: {e}")
             raise ValueError(f"Failed to upload file: {e}")
 
+        checksums = body.checksums()
+        checksums["content_encoding"] = encoding
+        checksums["original_file_size"] = checksums["size"] if encoding else None
+        if encoding:
+            checksums["size"] = stored_size
+        KeyIndexRegistry.get_instance().record_write(bucket_name, [file_name])
+        return checksums
+
     def copy_s3_folder(self, bucket_name, source_folder, destination_folder):
         paginator = self.client.get_paginator("list_objects_v2")
 
@@ -250,6 +748,10 @@ class S3Client:
                         # To delete the source file after copying
                         self.client.delete_object(Bucket=bucket_name, Key=source_key)
 
+                        index_registry = KeyIndexRegistry.get_instance()
+                        index_registry.record_write(bucket_name, [destination_key])
+                        index_registry.record_delete(bucket_name, [source_key])
+
         except ClientError as e:
             logger.error(f"Error generating presigned URL for delete: {e}")
             raise ValueError(f"Failed to upload file: {e}")
@@ -284,6 +786,10 @@ class S3Client:
                 # Perform the delete operation
                 self.client.delete_object(Bucket=bucket_name, Key=source_key)
 
+                index_registry = KeyIndexRegistry.get_instance()
+                index_registry.record_write(bucket_name, [destination_key])
+                index_registry.record_delete(bucket_name, [source_key])
+
         except ClientError as e:
             logger.error(f"Error generating presigned URL for delete: {e}")
             raise ValueError(f"Failed to upload file: {e}")
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Error codes S3 and S3-compatible services answer with when a prefix is overloaded
+THROTTLE_ERROR_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "ServiceUnavailable",
+}
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class S3ConcurrencyGovernor:
+    """
+    Process wide cap on in-flight S3 API calls that adapts to throttling.
+
+    Every call made through a governed client holds a slot from ``before-call`` until
+    ``after-call``, retries included. The cap follows AIMD: each throttled attempt
+    (SlowDown, 503) halves it, at most once per cooldown so one burst of rejections
+    only counts once, and every ``limit`` successful calls raise it by one again up
+    to ``max_limit``. Bulk jobs running more worker threads than the cap simply wait
+    for a slot instead of piling more requests onto a throttled prefix.
+
+    Retries themselves use botocore's adaptive mode (jittered exponential backoff
+    and a client-side token bucket), see ``get_boto3_client``.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_limit: int, min_limit: int = 1, cooldown: float = 1.0):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.cooldown = cooldown
+        self.limit = max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def get_instance(cls):
+        if not cls._instance:
+            with cls._lock:
+                if not cls._instance:
+                    cls._instance = cls(
+                        max_limit=settings.S3_MAX_CONCURRENCY,
+                        min_limit=settings.S3_MIN_CONCURRENCY,
+                        cooldown=settings.S3_THROTTLE_COOLDOWN,
+                    )
+        return cls._instance
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            if self.limit >= self.max_limit:
+                return
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self.limit += 1
+                self._condition.notify()
+
+    def on_throttle(self):
+        with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            self.limit = max(self.min_limit, self.limit // 2)
+        logger.warning(f"S3 throttling, concurrency limit lowered to {self.limit}.")
+
+    # botocore event handlers, they must return None to leave the call unchanged
+
+    def _before_call(self, context, **kwargs):
+        self.acquire()
+        context["s3_governor_slot"] = True
+
+    def _after_call(self, http_response, context, **kwargs):
+        if not context.pop("s3_governor_slot", False):
+            return
+        self.release()
+        if http_response.status_code < 300:
+            self.on_success()
+
+    def _after_call_error(self, context, **kwargs):
+        if context.pop("s3_governor_slot", False):
+            self.release()
+
+    def _needs_retry(self, response=None, **kwargs):
+        if response is None:
+            return
+        http_response, parsed = response
+        error_code = (parsed or {}).get("Error", {}).get("Code")
+        if (
+            http_response.status_code in THROTTLE_STATUS_CODES
+            or error_code in THROTTLE_ERROR_CODES
+        ):
+            self.on_throttle()
+
+    def register(self, client):
+        """
+        Govern every API call of a boto3 S3 client.
+        """
+        events = client.meta.events
+        events.register("before-call.s3", self._before_call, "s3-governor-before")
+        events.register("after-call.s3", self._after_call, "s3-governor-after")
+        events.register(
+            "after-call-error.s3", self._after_call_error, "s3-governor-error"
+        )
+        # First so the retry handler answering the event can not hide the attempt
+        events.register_first("needs-retry.s3", self._needs_retry, "s3-governor-retry")
+        return client
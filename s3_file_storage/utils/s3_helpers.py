@@ -1,6 +1,8 @@
+import functools
+import hashlib
 import logging
+import re
 
-import boto3
 from botocore.exceptions import (
     EndpointConnectionError,
     NoCredentialsError,
@@ -11,16 +13,131 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
-def get_bucket_name(default_bucket=True):
+TENANT_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+def get_tenant_name(request=None) -> str:
+    """
+    Returns the tenant of the request, only taken from trusted sources: the schema of
+    ``request.tenant`` when a tenant middleware sets one, else the authenticated
+    principal (a ``tenant`` claim of the token, else ``request.user.tenant``), else
+    the default tenant. Anonymous requests always get the default tenant.
+    :raises ValueError: If the tenant name is not a valid key segment.
+    """
+    tenant = None
+    if request is not None:
+        tenant = getattr(getattr(request, "tenant", None), "schema_name", None)
+
+        user = getattr(request, "user", None)
+        if not tenant and user is not None and user.is_authenticated:
+            auth = getattr(request, "auth", None)
+            if hasattr(auth, "get"):
+                tenant = auth.get("tenant")
+            tenant = tenant or getattr(user, "tenant", None)
+            tenant = getattr(tenant, "schema_name", tenant)
+
+    if not tenant:
+        return settings.DEFAULT_TENANT
+    if not isinstance(tenant, str) or not TENANT_NAME_PATTERN.match(tenant):
+        raise ValueError(f"Invalid tenant: {tenant}")
+    return tenant
+
+
+def get_company_id(request) -> str:
+    """
+    Returns the company of the authenticated principal: a ``company_id`` claim of the
+    token, else ``request.user.base_company``, else ``request.user.company_id``.
+    Never read from the request parameters, None when the principal has no company.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+
+    company = None
+    auth = getattr(request, "auth", None)
+    if hasattr(auth, "get"):
+        company = auth.get("company_id")
+    if company is None:
+        company = getattr(user, "base_company", None)
+        company = getattr(company, "id", company)
+    if company is None:
+        company = getattr(user, "company_id", None)
+    return None if company is None else str(company)
+
+
+def get_bucket_name(tenant: str = None):
     """
     Returns the bucket name based on the current tenant or the default bucket name.
     """
-    if default_bucket is True:
-        return settings.S3_STORAGE_BUCKET_NAME
+    if tenant:
+        return settings.S3_TENANT_BUCKETS.get(tenant, settings.S3_STORAGE_BUCKET_NAME)
 
     return settings.S3_STORAGE_BUCKET_NAME
 
 
+def get_bucket_endpoint(bucket_name: str = None) -> str:
+    """
+    Returns the endpoint serving a bucket, S3_ENDPOINT_URL unless overridden.
+    """
+    return settings.S3_BUCKET_ENDPOINTS.get(bucket_name, settings.S3_ENDPOINT_URL)
+
+
+@functools.lru_cache(maxsize=None)
+def get_boto3_client(endpoint_url: str):
+    """
+    Returns the boto3 S3 client of an endpoint, created once per process.
+    Clients are thread safe and keep their connection pool between requests.
+
+    Throttled calls are retried in botocore's adaptive mode (jittered backoff plus
+    client-side rate limiting) and in-flight calls are capped by the process wide
+    S3ConcurrencyGovernor.
+    """
+    import boto3
+    from botocore.config import Config
+
+    from s3_file_storage.utils.s3_governor import S3ConcurrencyGovernor
+
+    client = boto3.client(
+        service_name="s3",
+        endpoint_url=f"https://{endpoint_url}",
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        config=Config(
+            retries={"mode": "adaptive", "max_attempts": settings.S3_MAX_ATTEMPTS},
+            max_pool_connections=settings.S3_MAX_CONCURRENCY,
+        ),
+    )
+    return S3ConcurrencyGovernor.get_instance().register(client)
+
+
+def build_object_key(classify: str, tenant: str, module: str, file_name: str) -> str:
+    """
+    Builds the object key ``<classify>/<tenant>/<module>/<file_name>``.
+
+    With S3_HASHED_KEY_PREFIX two levels of hash are inserted after the classify
+    (``temps/ab/cd/<tenant>/...``) so the keys spread over many S3 partitions
+    instead of one hot prefix per tenant.
+    """
+    parts = [classify.strip("/")]
+    if settings.S3_HASHED_KEY_PREFIX:
+        digest = hashlib.sha256(file_name.encode()).hexdigest()
+        parts += [digest[:2], digest[2:4]]
+    parts += [tenant, module, file_name]
+    return "/".join(part for part in parts if part)
+
+
+def get_key_module(key: str):
+    """
+    Returns the module of an object key built by ``build_object_key``, None for keys
+    saved without one (``<classify>/<tenant>/<file_name>``).
+    """
+    parts = key.split("/")
+    # Skip the classify and, with S3_HASHED_KEY_PREFIX, the two hash levels
+    parts = parts[3:] if settings.S3_HASHED_KEY_PREFIX else parts[1:]
+    # Tenant, module and at least one segment of file name
+    return parts[1] if len(parts) >= 3 else None
+
+
 # For connection testing
 def get_s3_client() -> bool:
     """
@@ -34,6 +151,8 @@ def get_s3_client() -> bool:
     :return: A boto3 client instance for the specified service.
     """
     try:
+        import boto3
+
         client = boto3.client(
             service_name="s3",
             endpoint_url=f"https://{settings.S3_ENDPOINT_URL}",
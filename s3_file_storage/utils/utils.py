@@ -2,7 +2,6 @@ import os
 import uuid
 
 from django.core.files.storage import default_storage
-from s3_file_storage.backends.storages import S3MediaStorage
 from django.core.files.storage import FileSystemStorage
 # from django.core.files.storage import get_storage_class
 from django.core.files.storage import default_storage
@@ -33,6 +32,8 @@ def get_storage(provider=None):
     :return: Storage backend instance.
     """
     if provider == "s3":
+        from s3_file_storage.backends.s3_media_storage import S3MediaStorage
+
         return S3MediaStorage()
     else:
         return FileSystemStorage()
@@ -0,0 +1,150 @@
+from django.conf import settings
+
+from s3_file_storage.constants import StorageModule
+
+# (offset, magic bytes, content type), checked in order
+MAGIC_SIGNATURES = [
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"BM", "image/bmp"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (8, b"WEBP", "image/webp"),
+    (8, b"WAVE", "audio/wav"),
+    (4, b"ftyp", "video/mp4"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"PK\x05\x06", "application/zip"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (0, b"Rar!\x1a\x07", "application/vnd.rar"),
+    (0, b"MZ", "application/x-msdownload"),
+    (0, b"\x7fELF", "application/x-executable"),
+    (0, b"\xcf\xfa\xed\xfe", "application/x-mach-binary"),
+    (0, b"\xfe\xed\xfa\xcf", "application/x-mach-binary"),
+]
+
+TEXT_CONTENT_TYPE = "text/plain"
+# Sent by clients that do not know the type, it matches any content
+GENERIC_CONTENT_TYPE = "application/octet-stream"
+
+# Declared types whose content sniffs as a container or as plain text
+COMPATIBLE_CONTENT_TYPES = {
+    "application/zip": {"application/x-zip-compressed"},
+    "application/x-ole-storage": {
+        "application/msword",
+        "application/vnd.ms-excel",
+        "application/vnd.ms-powerpoint",
+    },
+    "video/mp4": {"video/quicktime", "audio/mp4", "image/heic", "image/avif"},
+    "audio/wav": {"audio/x-wav", "audio/wave"},
+    "application/gzip": {"application/x-gzip"},
+    "application/vnd.rar": {"application/x-rar-compressed"},
+    TEXT_CONTENT_TYPE: {
+        "text/csv",
+        "text/html",
+        "text/markdown",
+        "application/json",
+        "application/xml",
+        "text/xml",
+        "image/svg+xml",
+    },
+}
+OFFICE_OPEN_XML_PREFIX = "application/vnd.openxmlformats-officedocument."
+
+
+def is_text(head: bytes) -> bool:
+    if b"\x00" in head:
+        return False
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # The range may end in the middle of a multi-byte character
+        return e.start >= len(head) - 3
+    return True
+
+
+def sniff_content_type(head: bytes):
+    """
+    Detect the type of a file from its first bytes.
+
+    Args:
+        head (bytes): the first bytes of the file
+
+    Returns:
+        str: the detected content type, None when it is not recognised
+    """
+    text = is_text(head)
+    for offset, magic, content_type in MAGIC_SIGNATURES:
+        if head[offset : offset + len(magic)] != magic:
+            continue
+        # Short signatures ("BM", "MZ", "ID3") also start ordinary text files
+        if len(magic) < 4 and text:
+            break
+        return content_type
+
+    return TEXT_CONTENT_TYPE if text else None
+
+
+def is_compatible(declared_type: str, sniffed_type: str) -> bool:
+    declared_type = (declared_type or "").split(";")[0].strip().lower()
+    if declared_type in ("", GENERIC_CONTENT_TYPE) or declared_type == sniffed_type:
+        return True
+    # Wildcards such as "image/*" in the allowed types of a policy
+    if declared_type.endswith("/*") and sniffed_type.startswith(declared_type[:-1]):
+        return True
+    if sniffed_type == "application/zip" and declared_type.startswith(
+        OFFICE_OPEN_XML_PREFIX
+    ):
+        return True
+    return declared_type in COMPATIBLE_CONTENT_TYPES.get(sniffed_type, ())
+
+
+def get_module_policy(module: str = None) -> dict:
+    policies = settings.FILE_VALIDATION_POLICIES
+    return policies.get(module) or policies[StorageModule.GENERIC]
+
+
+def validate_file_content(
+    head: bytes, size: int, declared_type: str = None, module: str = None
+):
+    """
+    Check the real content of an upload against the policy of its module.
+
+    Args:
+        head (bytes): the first bytes of the file
+        size (int): the size of the file
+        declared_type (str): the content type sent by the client
+        module (str): the module the file was uploaded for
+
+    Returns:
+        tuple: (sniffed content type, error message or None when the file is valid)
+    """
+    policy = get_module_policy(module)
+    sniffed_type = sniff_content_type(head)
+
+    if policy.get("max_size") and size > policy["max_size"]:
+        return sniffed_type, f"File is larger than {policy['max_size']} bytes."
+    allowed_types = policy.get("allowed_types")
+    if sniffed_type is None:
+        # Formats without a known signature are only refused by restricted modules
+        if allowed_types:
+            return sniffed_type, "File type could not be recognised."
+        return sniffed_type, None
+    if sniffed_type in settings.FILE_VALIDATION_BLOCKED_TYPES:
+        return sniffed_type, f"File type {sniffed_type} is not allowed."
+
+    if allowed_types and not any(
+        is_compatible(allowed_type, sniffed_type) for allowed_type in allowed_types
+    ):
+        return sniffed_type, f"File type {sniffed_type} is not allowed for this module."
+    if declared_type and not is_compatible(declared_type, sniffed_type):
+        return (
+            sniffed_type,
+            f"File content ({sniffed_type}) does not match its type ({declared_type}).",
+        )
+    return sniffed_type, None
@@ -2,32 +2,67 @@ from datetime import datetime
 import logging
 from pathlib import Path
 from django.conf import settings
-from django.http import FileResponse
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from rest_framework import viewsets, status
-from django.db import transaction
+from django.db import router, transaction
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from s3_file_storage.backends.storages import S3MediaStorage
-from s3_file_storage.constants import StorageClassify, StorageModule, StorageProvider
+from base_wdg_file_storage.pagination import DEFAULT_PAGE_SIZE
+from s3_file_storage.constants import (
+    ExportFormat,
+    StorageClassify,
+    StorageModule,
+    StorageProvider,
+    UploadStatus,
+)
 from s3_file_storage.models.file_storage_model import FileStorageModel
+from s3_file_storage.models.upload_batch_model import UploadBatchModel
 from s3_file_storage.serializers.file_storage_serializer import (
     DeletePreSignedSerializer,
     DownloadPreSignedSerializer,
+    FileStorageBatchDeleteSerializer,
     FileStorageCreateValidateSerializer,
+    FileStorageExportValidateSerializer,
+    FileStorageSearchValidateSerializer,
     FileStorageSerializer,
     FileStorageValidateByRefSerializer,
+    PreSignedPostUploadSerializer,
     PreSingedUploadSerializer,
 )
+from s3_file_storage.selectors.file_storage_selector import search_files
+from s3_file_storage.services.file_export_service import FileExportService
+from s3_file_storage.services.purge_deleted_file_service import PurgeDeletedFileService
 from s3_file_storage.services.save_file_meta_service import SaveFileMetaService
+from s3_file_storage.services.upload_event_service import (
+    EVENT_TOKEN_HEADER,
+    UploadEventService,
+)
+from s3_file_storage.services.upload_validation_service import UploadValidationService
 from s3_file_storage.utils.utils import (
     add_slash,
-    get_last_part,
     split_first_path,
     unique_file_name_by_original,
 )
-from wdg_file_storage.backends.s3 import S3Client
+from s3_file_storage.utils.access_tracker import AccessTracker
+from s3_file_storage.utils.compression import (
+    accepts_encoding,
+    decompress_chunks,
+    iter_file_chunks,
+)
+from s3_file_storage.utils.idempotency import IDEMPOTENCY_HEADER, IdempotencyStore
+from s3_file_storage.utils.local_storage import LocalStorageClient
+from s3_file_storage.utils.object_cache import ObjectDiskCache
+from s3_file_storage.utils.s3 import S3Client
+from s3_file_storage.utils.s3_helpers import (
+    build_object_key,
+    get_bucket_name,
+    get_company_id,
+    get_tenant_name,
+)
 import requests
 import uuid
 
@@ -36,6 +71,7 @@ logger = logging.getLogger(__name__)
 
 class FileStorageView(viewsets.ModelViewSet):
     permission_classes = []  # No Permission
+    use_read_replica = True
 
     model = FileStorageModel
     queryset = FileStorageModel.objects.all()
@@ -44,6 +80,7 @@ class FileStorageView(viewsets.ModelViewSet):
 
 class FileStoragePreviewView(APIView):
     permission_classes = []
+    use_read_replica = True
 
     def get(self, request, *args, **kwargs):
         file_name = request.data.get("file_name")
@@ -64,17 +101,50 @@ class FileStoragePreviewView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             
-            storage = S3MediaStorage()
-            
-            # Open the file from S3 storage(Base storage config in settings)
-            file_obj = storage.open(file_instance.file_path.name, "rb")
+            file_key = file_instance.file_path.name
+            AccessTracker.record_access(file_key)
+
+            cache = ObjectDiskCache.get_instance()
+            cached_path = (
+                cache.fetch(file_key, bucket_name=file_instance.bucket_name)
+                if cache and cache.is_cacheable(file_key)
+                else None
+            )
+
+            if cached_path:
+                # Hot object served from the local disk cache (sendfile)
+                file_obj = open(cached_path, "rb")
+            else:
+                from s3_file_storage.backends.s3_media_storage import S3MediaStorage
+
+                storage = S3MediaStorage(bucket_name=file_instance.bucket_name)
+
+                # Open the file from S3 storage(Base storage config in settings)
+                file_obj = storage.open(file_key, "rb")
+
+            filename = file_instance.file_name.split("/")[-1]
+            encoding = file_instance.content_encoding
+
+            if encoding and not accepts_encoding(request, encoding):
+                # Stored compressed, decompressed on the fly for this client
+                response = StreamingHttpResponse(
+                    decompress_chunks(iter_file_chunks(file_obj), encoding),
+                    content_type=file_instance.file_type or "application/octet-stream",
+                )
+                response["Content-Disposition"] = f'attachment; filename="{filename}"'
+                response["Vary"] = "Accept-Encoding"
+                return response
 
             # Return the file as a response
-            return FileResponse(
+            response = FileResponse(
                 file_obj,
                 as_attachment=True,
-                filename=file_instance.file_name.split("/")[-1],
+                filename=filename,
             )
+            if encoding:
+                response["Content-Encoding"] = encoding
+                response["Vary"] = "Accept-Encoding"
+            return response
 
         except Exception as e:
             return Response(
@@ -86,9 +156,62 @@ class FileStoragePreviewView(APIView):
 class GenerateUploadPresignedUrlView(APIView):
     permission_classes = []
     serializer_class = PreSingedUploadSerializer
+    idempotency_scope = "presign-upload"
 
-    # To be generate presigned URL for upload to s3 direct
     def post(self, request, *args, **kwargs):
+        """
+        Requests sent with an Idempotency-Key header are processed once, retries with
+        the same key and body replay the stored response without any work.
+        """
+        try:
+            idempotency_key = IdempotencyStore.get_key(request)
+            tenant = get_tenant_name(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not idempotency_key:
+            return self.create_presigned_urls(request)
+
+        scope = f"{self.idempotency_scope}:{tenant}"
+        fingerprint = IdempotencyStore.fingerprint(request.data)
+        stored = IdempotencyStore.get(scope, idempotency_key)
+
+        if stored is None:
+            if not IdempotencyStore.lock(scope, idempotency_key):
+                return Response(
+                    {"error": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            try:
+                # The first request may have finished between the lookup and the lock
+                stored = IdempotencyStore.get(scope, idempotency_key)
+                if stored is None:
+                    response = self.create_presigned_urls(request)
+                    # Server errors are not stored so the client can retry them
+                    if response.status_code < 500:
+                        IdempotencyStore.save(
+                            scope,
+                            idempotency_key,
+                            fingerprint,
+                            response.status_code,
+                            response.data,
+                        )
+                    return response
+            finally:
+                IdempotencyStore.unlock(scope, idempotency_key)
+
+        if stored["fingerprint"] != fingerprint:
+            return Response(
+                {"error": f"{IDEMPOTENCY_HEADER} was already used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        response = Response(stored["data"], status=stored["status"])
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    # To be generate presigned URL for upload to s3 direct
+    def create_presigned_urls(self, request):
         # Validate input using the serializer
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -109,28 +232,38 @@ class GenerateUploadPresignedUrlView(APIView):
 
         presigned_urls = []
 
+        try:
+            tenant = get_tenant_name(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        bucket_name = get_bucket_name(tenant)
+        storage = S3Client(bucket_name)
+
         try:
             with transaction.atomic():
                 for file_meta in files_metadata:
                     original_file_name = file_meta["original_file_name"]
                     file_size = file_meta["file_size"]
                     content_type = file_meta["content_type"]
-                    tenant = 'public'
+                    checksum_sha256 = file_meta.get("checksum_sha256")
 
                     # Generate presigned URL for "put_object"
                     file_name = unique_file_name_by_original(original_file_name)
 
                     if classify and module:
-                        new_obj_key = f"{add_slash(classify)}{add_slash(tenant)}{add_slash(module)}{file_name}"
+                        new_obj_key = build_object_key(classify, tenant, module, file_name)
                     else:
-                        new_obj_key = f"{add_slash(StorageClassify.TEMPS)}{add_slash(tenant)}{file_name}"
+                        new_obj_key = build_object_key(
+                            StorageClassify.TEMPS, tenant, None, file_name
+                        )
 
-                    storage = S3Client()
                     presigned_url = storage.generate_upload_presigned_url(
                         file_key=new_obj_key,
+                        bucket_name=bucket_name,
                         file_size=file_size,
                         content_type=content_type,
                         expiry=expiry,
+                        checksum_sha256=checksum_sha256,
                     )
 
                     # To append file meta
@@ -146,8 +279,10 @@ class GenerateUploadPresignedUrlView(APIView):
                             "original_file_name": original_file_name,
                             "file_name": file_name,
                             "file_key": f"{new_obj_key}",  # as File url
+                            "bucket_name": bucket_name,
                             "file_size": file_size,
                             "content_type": content_type,
+                            "checksum_sha256": checksum_sha256,
                             "presigned_url": presigned_url,
                         }
                     )
@@ -166,6 +301,76 @@ class GenerateUploadPresignedUrlView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+class GenerateUploadPresignedPostView(APIView):
+    permission_classes = []
+    serializer_class = PreSignedPostUploadSerializer
+
+    # One presigned POST policy for a batch of browser uploads
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        module = serializer.validated_data.get("module", StorageModule.GENERIC)
+        content_type_prefix = serializer.validated_data.get("content_type_prefix", "")
+        max_file_size = serializer.validated_data.get(
+            "max_file_size", settings.S3_PRESIGNED_POST_MAX_FILE_SIZE
+        )
+        expiry = serializer.validated_data.get("expiry", settings.S3_PRESIGNED_EXPIRE)
+
+        try:
+            tenant = get_tenant_name(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        bucket_name = get_bucket_name(tenant)
+
+        # Every batch gets its own prefix, the policy only allows keys below it
+        batch_id = uuid.uuid4()
+        key_prefix = (
+            build_object_key(StorageClassify.TEMPS, tenant, module, str(batch_id)) + "/"
+        )
+
+        try:
+            storage = S3Client(bucket_name)
+            presigned_post = storage.generate_upload_presigned_post(
+                key_prefix=key_prefix,
+                max_file_size=max_file_size,
+                content_type_prefix=content_type_prefix,
+                bucket_name=bucket_name,
+                expiry=expiry,
+            )
+        except ValueError as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        # Rows of the batch are created by the ObjectCreated events of its keys
+        UploadBatchModel.objects.create(
+            id=batch_id,
+            bucket_name=bucket_name,
+            key_prefix=key_prefix,
+            module=module,
+            ref_type=serializer.validated_data["ref_type"],
+            ref_id=serializer.validated_data.get("ref_id"),
+            create_uid=request.user.id if request.user.is_authenticated else None,
+        )
+
+        return Response(
+            {
+                "batch_id": batch_id,
+                "storage_provider": StorageProvider.S3,
+                "ref_type": serializer.validated_data["ref_type"],
+                "ref_id": serializer.validated_data.get("ref_id"),
+                "module": module,
+                "hr_employee": serializer.validated_data["hr_employee"],
+                "key_prefix": key_prefix,
+                "max_file_size": max_file_size,
+                "url": presigned_post["url"],
+                "fields": presigned_post["fields"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 # ! Deprecated Soon.
 class FileStorageCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -186,18 +391,32 @@ class FileStorageCreateView(APIView):
         ref_type = request.data.get("ref_type")
         ref_id = request.data.get("ref_id")
         module = request.data.get("module", StorageModule.GENERIC)
+        try:
+            bucket_name = get_bucket_name(get_tenant_name(request))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            with transaction.atomic():
-                employee = None
-                if "hr_employee" in request.data and request.data["hr_employee"]:
-                    employee = Employee.objects.filter(
-                        id=request.data["hr_employee"]
-                    ).first()
-                hr_employee_onbehalf = HrUtil.get_current_employee(
-                    self.request.user, self.request.user.base_company
+            # Check the real content of the uploads before they are promoted
+            rejected = UploadValidationService.validate_uploads(
+                files=[
+                    {
+                        "file_key": file.get("file_key"),
+                        "content_type": file.get("content_type"),
+                    }
+                    for file in file_info
+                ],
+                module=module,
+                bucket_name=bucket_name,
+            )
+            if rejected:
+                return Response(
+                    {"error": "Invalid file content.", "files": rejected},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            company_id = get_company_id(request)
+            with transaction.atomic():
                 for file in file_info:
                     original_file_name = file.get("original_file_name", None)
                     file_name = file.get("file_name", None)
@@ -211,7 +430,7 @@ class FileStorageCreateView(APIView):
 
                     new_file_url = f"{StorageClassify.UPLOADED}/{remaining_path}"
 
-                    object_keys.append(file_name)
+                    object_keys.append(remaining_path)
 
                     # Create a record in FileStorageModel
                     file_record = FileStorageModel.objects.create(
@@ -221,15 +440,13 @@ class FileStorageCreateView(APIView):
                         file_type=content_type,
                         ref_type=ref_type,
                         ref_id=ref_id,
-                        file=new_file_url,
+                        file_path=new_file_url,
+                        bucket_name=bucket_name,
                         description=description,
+                        upload_status=UploadStatus.COMPLETED,
                         create_date=datetime.now(),
                         create_uid=self.request.user.id,
-                        company=self.request.user.base_company,
-                        hr_employee_id=employee.id if employee else None,
-                        hr_employee_onbehalf_id=(
-                            hr_employee_onbehalf.id if hr_employee_onbehalf else None
-                        ),
+                        company_id=company_id,
                     )
 
                     # Append the created file record to the list
@@ -242,25 +459,21 @@ class FileStorageCreateView(APIView):
                             "file_type": file_record.file_type,
                             "ref_type": file_record.ref_type,
                             "ref_id": file_record.ref_id,
-                            "file": file_record.file.url,
+                            "file_key": file_record.file_path.name,
                             "description": file_record.description,
                             "create_date": file_record.create_date,
                             "create_uid": file_record.create_uid,
-                            "company": file_record.company.id,
-                            "hr_employee_id": file_record.hr_employee_id,
-                            "hr_employee_onbehalf_id": file_record.hr_employee_onbehalf_id,
+                            "company_id": file_record.company_id,
                         }
                     )
 
                 # copy object to new folder and delete object from temps
-                tenant = 'public'
-                bucket_name = settings.S3_STORAGE_BUCKET_NAME
-                source_folder = f"{StorageClassify.TEMPS}/{tenant}/{module}/"
-                destination_folder = f"{StorageClassify.UPLOADED}/{tenant}/{module}/"
+                source_folder = f"{StorageClassify.TEMPS}/"
+                destination_folder = f"{StorageClassify.UPLOADED}/"
 
                 keys_to_copy = object_keys
 
-                storage = S3Client()
+                storage = S3Client(bucket_name)
                 storage.copy_objects_and_delete_by_key(
                     bucket_name, source_folder, destination_folder, keys_to_copy
                 )
@@ -291,13 +504,51 @@ class GenerateDownloadPresignedUrlView(APIView):
         serializer.is_valid(raise_exception=True)
 
         file_key = request.data.get("file_key", None)
-        bucket_name = request.data.get("bucket_name", settings.S3_STORAGE_BUCKET_NAME)
+        try:
+            bucket_name = request.data.get("bucket_name") or get_bucket_name(
+                get_tenant_name(request)
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         expiry = request.data.get("expiry", settings.S3_PRESIGNED_EXPIRE)
+        storage_provider = request.data.get("storage_provider", StorageProvider.S3)
+
+        if storage_provider == StorageProvider.LOCAL:
+            bucket_name = None
+            # Only keys of saved files are tracked, not whatever the client sent
+            tracked_key = (
+                FileStorageModel.objects.filter(
+                    storage_provider=StorageProvider.LOCAL, file_path=file_key
+                )
+                .values_list("file_path", flat=True)
+                .first()
+            )
+            storage = LocalStorageClient()
+            download_presigned_url = storage.generate_download_presigned_url(
+                file_key=file_key, bucket_name=bucket_name, expiry=expiry
+            )
+        else:
+            # Compressed objects are served with their encoding and original type
+            tracked_key, file_type, content_encoding = (
+                FileStorageModel.objects.filter(
+                    FileStorageModel.bucket_filter(bucket_name), file_path=file_key
+                )
+                .values_list("file_path", "file_type", "content_encoding")
+                .first()
+            ) or (None, None, None)
+            storage = S3Client(bucket_name)
+            download_presigned_url = storage.generate_download_presigned_url(
+                file_key=file_key,
+                bucket_name=bucket_name,
+                expiry=expiry,
+                content_type=file_type if content_encoding else None,
+                content_encoding=content_encoding,
+            )
 
-        storage = S3Client()
-        download_presigned_url = storage.generate_download_presigned_url(
-            file_key=file_key, bucket_name=bucket_name, expiry=expiry
-        )
+        if storage_provider == StorageProvider.LOCAL:
+            download_presigned_url = request.build_absolute_uri(download_presigned_url)
+
+        AccessTracker.record_access(tracked_key)
 
         presigned_url = {
             "file_key": file_key,
@@ -308,6 +559,29 @@ class GenerateDownloadPresignedUrlView(APIView):
         return Response(presigned_url, status=status.HTTP_200_OK)
 
 
+class LocalFileServeView(APIView):
+    permission_classes = []  # Access is granted by the signed URL
+
+    def get(self, request, file_key):
+        expires = request.query_params.get("expires")
+        signature = request.query_params.get("signature")
+        as_attachment = request.query_params.get("download") in ["true", "True"]
+
+        storage = LocalStorageClient()
+        if not storage.verify_presigned_url(file_key, expires, signature):
+            return Response(
+                {"error": "Invalid or expired signature."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            return storage.serve_file(file_key, as_attachment=as_attachment)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            return Response(
+                {"error": "File not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+
 class GenerateDeletePresignedUrlView(APIView):
     permission_classes = []
     serializer_class = DeletePreSignedSerializer
@@ -327,9 +601,13 @@ class GenerateDeletePresignedUrlView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        storage = S3Client()
+        try:
+            bucket_name = bucket_name or get_bucket_name(get_tenant_name(request))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        storage = S3Client(bucket_name)
         download_presigned_url = storage.generate_delete_presigned_url(
-            file_key=file_key
+            file_key=file_key, bucket_name=bucket_name
         )
 
         presigned_url = {
@@ -343,6 +621,7 @@ class GenerateDeletePresignedUrlView(APIView):
 
 class FileStorageByRefView(APIView):
     permission_classes = [IsAuthenticated]
+    use_read_replica = True
     serializer_class = FileStorageValidateByRefSerializer
 
     def get(self, request):
@@ -368,6 +647,87 @@ class FileStorageByRefView(APIView):
             return Response([], status=status.HTTP_200_OK)
 
 
+class FileStorageSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+    serializer_class = FileStorageSearchValidateSerializer
+
+    def get(self, request):
+        # Validate input using query parameters
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        # Always scoped to the caller's company
+        company_id = get_company_id(request)
+        if company_id is None:
+            return Response(
+                {"error": "No company for the current user."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            files, next_cursor = search_files(
+                query=params["q"],
+                company_id=company_id,
+                ref_type=params.get("ref_type"),
+                page_size=params.get("page_size", DEFAULT_PAGE_SIZE),
+                cursor=params.get("cursor"),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = FileStorageSerializer(files, many=True).data
+        for result, file in zip(results, files):
+            result["rank"] = file.rank
+
+        return Response(
+            {"next_cursor": next_cursor, "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+
+class FileStorageExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+    serializer_class = FileStorageExportValidateSerializer
+
+    def get(self, request):
+        # Validate input using query parameters
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        export_format = params["export_format"]
+
+        # Always scoped to the caller's company
+        company_id = get_company_id(request)
+        if company_id is None:
+            return Response(
+                {"error": "No company for the current user."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        queryset = FileExportService.get_queryset(
+            company_id=company_id,
+            ref_type=params.get("ref_type"),
+            ref_id=params.get("ref_id"),
+            date_from=params.get("date_from"),
+            date_to=params.get("date_to"),
+            include_deleted=params["include_deleted"],
+        )
+        # The rows are read while streaming, after the routing middleware returned,
+        # so the database is picked now
+        queryset = queryset.using(router.db_for_read(FileStorageModel))
+
+        response = StreamingHttpResponse(
+            FileExportService.stream(queryset, export_format),
+            content_type=ExportFormat.CONTENT_TYPES[export_format],
+        )
+        file_name = f"file_storage_{datetime.now():%Y%m%d%H%M%S}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+        return response
+
+
 class FileStorageDeleteView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -382,12 +742,13 @@ class FileStorageDeleteView(APIView):
 
         try:
             # Fetch the file object from the database
-            file_object = FileStorageModel.objects.get(id=uuid, file=file_path)
+            file_object = FileStorageModel.objects.get(id=uuid, file_path=file_path)
 
-            storage = S3Client()
+            storage = S3Client(file_object.bucket_name)
             # Delete the file from the S3 bucket
             is_deleted = storage.delete_file_from_bucket(
-                file_name=file_object.file.name
+                bucket_name=file_object.bucket_name,
+                file_name=file_object.file_path.name,
             )
 
             if is_deleted:
@@ -409,6 +770,27 @@ class FileStorageDeleteView(APIView):
             )
 
 
+class FileStorageBatchDeleteView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = FileStorageBatchDeleteSerializer
+
+    def post(self, request):
+        """Soft delete many files at once, objects are purged in the background."""
+
+        # Validate input using the serializer
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        deleted_count = PurgeDeletedFileService.soft_delete_files(
+            ids=serializer.validated_data["ids"]
+        )
+
+        return Response(
+            {"message": "Files deleted successfully", "deleted": deleted_count},
+            status=status.HTTP_200_OK,
+        )
+
+
 class UploadFileByPreSignedURLView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -428,7 +810,8 @@ class UploadFileByPreSignedURLView(APIView):
             )
 
         try:
-            storage = S3Client()
+            bucket_name = get_bucket_name(get_tenant_name(request))
+            storage = S3Client(bucket_name)
             if pre_signed_url:
                 presigned_url = pre_signed_url
             else:
@@ -436,6 +819,7 @@ class UploadFileByPreSignedURLView(APIView):
                     file_key=file_key,
                     file_size=file_size,
                     content_type=content_type,
+                    bucket_name=bucket_name,
                 )
 
             with open(file_path, "rb") as file_data:
@@ -448,11 +832,21 @@ class UploadFileByPreSignedURLView(APIView):
                 if response.status_code == 200:
                     logger.error("File uploaded successfully.")
 
-                    bucket_name = settings.S3_STORAGE_BUCKET_NAME
-                    source_folder = f"temps/public/{module}/"
-                    destination_folder = f"uploaded/public/{module}/"
+                    rejected = UploadValidationService.validate_uploads(
+                        files=[{"file_key": file_key, "content_type": content_type}],
+                        module=module,
+                        bucket_name=bucket_name,
+                    )
+                    if rejected:
+                        return Response(
+                            {"error": rejected[0]["reason"]},
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
 
-                    keys_to_copy = [get_last_part(file_key)]
+                    source_folder = f"{StorageClassify.TEMPS}/"
+                    destination_folder = f"{StorageClassify.UPLOADED}/"
+
+                    keys_to_copy = [split_first_path(file_key)]
 
                     storage.copy_objects_and_delete_by_key(
                         bucket_name, source_folder, destination_folder, keys_to_copy
@@ -469,3 +863,36 @@ class UploadFileByPreSignedURLView(APIView):
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+
+class ObjectCreatedEventView(APIView):
+    """
+    Receive the ObjectCreated notifications of the bucket (S3 or MinIO webhook
+    target) and complete the matching uploads, no polling or client callback needed.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        token = settings.S3_EVENT_WEBHOOK_TOKEN
+        if not token or not constant_time_compare(
+            request.headers.get(EVENT_TOKEN_HEADER, ""), token
+        ):
+            return Response(
+                {"error": "Invalid event token."}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        records = request.data.get("Records") if isinstance(request.data, dict) else None
+        if not isinstance(records, list):
+            # MinIO sends a test event without records when the target is added
+            return Response({"message": "No records."}, status=status.HTTP_200_OK)
+
+        try:
+            result = UploadEventService.ingest(records)
+            return Response(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception("Failed to ingest ObjectCreated events.")
+            return Response(
+                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )